@@ -7,7 +7,10 @@ from eidaws.federator.eidaws_wfcatalog.json import SERVICE_ID, create_app
 from eidaws.federator.settings import (
     FED_DEFAULT_TMPDIR,
     FED_DEFAULT_BUFFER_ROLLOVER_SIZE,
+    FED_DEFAULT_BUFFER_FLUSH_SIZE,
     FED_DEFAULT_SPLITTING_FACTOR,
+    FED_DEFAULT_SPLITTING_CONCURRENCY,
+    FED_DEFAULT_PRESPLITTING_TTL,
 )
 from eidaws.federator.utils.app import _main
 from eidaws.federator.utils.cli import (
@@ -17,6 +20,7 @@ from eidaws.federator.utils.cli import (
 from eidaws.utils.cli import (
     between,
     positive_int,
+    positive_int_exclusive,
     InterpolatingYAMLConfigFileParser,
 )
 
@@ -50,6 +54,16 @@ def build_parser(config_file_parser_class=InterpolatingYAMLConfigFileParser):
         "(https://docs.python.org/3/library/tempfile.html#tempfile."
         "SpooledTemporaryFile) (default: %(default)s).",
     )
+    parser.add_argument(
+        "--buffer-flush-size",
+        dest="buffer_flush_size",
+        type=positive_int_exclusive,
+        default=FED_DEFAULT_BUFFER_FLUSH_SIZE,
+        metavar="BYTES",
+        help="Size of chunks buffered data is written to the response with. "
+        "The size is aligned with the size of the chunks data is buffered "
+        "with (default: %(default)s).",
+    )
     parser.add_argument(
         "--splitting-factor",
         dest="splitting_factor",
@@ -59,6 +73,28 @@ def build_parser(config_file_parser_class=InterpolatingYAMLConfigFileParser):
         help="Splitting factor when performing splitting and aligning for "
         "large requests (default: %(default)s).",
     )
+    parser.add_argument(
+        "--splitting-concurrency",
+        dest="splitting_concurrency",
+        metavar="NUM",
+        type=positive_int_exclusive,
+        default=FED_DEFAULT_SPLITTING_CONCURRENCY,
+        help="Maximum number of stream epochs downloaded concurrently after "
+        "splitting. The stream epochs are buffered separately and aligned "
+        "afterwards. If 1, stream epochs are downloaded sequentially "
+        "(default: %(default)s).",
+    )
+    parser.add_argument(
+        "--presplitting-ttl",
+        dest="presplitting_ttl",
+        metavar="SEC",
+        type=positive_int,
+        default=FED_DEFAULT_PRESPLITTING_TTL,
+        help="Time in seconds the maximum stream epoch durations learned "
+        "from HTTP status code 413 responses are kept per endpoint. Stream "
+        "epochs exceeding the duration learned are split before being "
+        "requested. If 0, pre-splitting is disabled (default: %(default)s).",
+    )
 
     return parser
 
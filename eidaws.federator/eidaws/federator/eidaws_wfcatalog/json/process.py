@@ -3,6 +3,7 @@
 import datetime
 import errno
 import json
+import re
 
 from eidaws.federator.eidaws_wfcatalog.json.parser import WFCatalogSchema
 from eidaws.federator.settings import (
@@ -18,14 +19,71 @@ _JSON_ARRAY_END = b"]"
 _JSON_SEP = b","
 
 
+class _SeparatorScanner:
+    """
+    Incrementally locates the separators in between the top-level values of
+    a JSON array, fed chunk by chunk (without the opening bracket).
+    """
+
+    _STRUCTURAL = re.compile(rb'[{}\[\]",]')
+    _STRING = re.compile(rb'["\\]')
+
+    def __init__(self):
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk):
+        """
+        Return the indices of the top-level separators within ``chunk``.
+        """
+        retval = []
+        pos = 0
+        while pos < len(chunk):
+            if self._escaped:
+                self._escaped = False
+                pos += 1
+            elif self._in_string:
+                m = self._STRING.search(chunk, pos)
+                if m is None:
+                    break
+
+                pos = m.end()
+                if m.group() == b'"':
+                    self._in_string = False
+                else:
+                    self._escaped = True
+            else:
+                m = self._STRUCTURAL.search(chunk, pos)
+                if m is None:
+                    break
+
+                pos = m.end()
+                c = m.group()
+                if c == b'"':
+                    self._in_string = True
+                elif c in (b"{", b"["):
+                    self._depth += 1
+                elif c in (b"}", b"]"):
+                    self._depth -= 1
+                elif not self._depth:
+                    retval.append(m.start())
+
+        return retval
+
+
 class _WFCatalogWorker(BaseSplitAlignWorker):
     """
     A worker task implementation for ``eidaws-wfcatalog`` ``format=json``.
     The worker implements splitting and aligning facilities.
 
     When splitting and aligning (i.e. merging potentially occurring overlaps)
-    data is downloaded sequentially. Note, that a worker assumes JSON
-    objects to be shipped ordered within the array.
+    data is downloaded sequentially, unless a splitting concurrency is
+    configured. Note, that a worker assumes JSON objects to be shipped ordered
+    within the array.
+
+    The separators in between JSON objects are marked as boundaries such that
+    buffers flushed concurrently are interleaved object-wise.
     """
 
     SERVICE_ID = FED_WFCATALOG_JSON_SERVICE_ID
@@ -34,6 +92,9 @@ class _WFCatalogWorker(BaseSplitAlignWorker):
     LOGGER = ".".join([FED_BASE_ID, SERVICE_ID, "worker"])
 
     _CHUNK_SIZE = 8192
+    _RESPONSE_PREFIX = _JSON_ARRAY_START
+    _RESPONSE_SUFFIX = _JSON_ARRAY_END
+    _FLUSH_SEPARATOR = _JSON_SEP
 
     async def _buffer_response(self, resp, buf, context, **kwargs):
         chunk_size = context["chunk_size"]
@@ -69,13 +130,18 @@ class _WFCatalogWorker(BaseSplitAlignWorker):
 
             last_obj = json.loads(chunk[-last_obj_length:])
 
+        scanner = _SeparatorScanner()
         first_chunk = True
         while True:
 
             chunk = await resp.content.read(chunk_size)
             if not chunk:
                 # chop off b']'
-                await buf.truncate(await buf.tell() - 1)
+                offset = await buf.tell() - 1
+                await buf.truncate(offset)
+                # the buffer may be sliced in between JSON objects, i.e.
+                # slices following start with the JSON separator
+                self._mark_boundary(context, offset)
                 break
 
             if first_chunk:
@@ -100,21 +166,12 @@ class _WFCatalogWorker(BaseSplitAlignWorker):
 
                 first_chunk = False
 
-            await buf.write(chunk)
-
-    async def _flush(self, buf, drain, context, append=True):
-        await buf.seek(0)
-
-        if append:
-            await drain.drain(_JSON_SEP)
-
-        while True:
-            chunk = await buf.read(context.get("chunk_size", -1))
+            offset = await buf.tell()
+            for idx in scanner.feed(chunk):
+                # slices following start with the JSON separator
+                self._mark_boundary(context, offset + idx)
 
-            if not chunk:
-                break
-
-            await drain.drain(chunk)
+            await buf.write(chunk)
 
 
 class WFCatalogRequestProcessor(UnsortedResponse):
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+WFCatalog worker related test facilities.
+"""
+
+import asyncio
+import io
+import json
+import pytest
+
+from eidaws.federator.eidaws_wfcatalog.json.process import (
+    _SeparatorScanner,
+    _WFCatalogWorker,
+)
+from eidaws.federator.utils.tempfile import AioSpooledTemporaryFile
+from eidaws.federator.utils.worker import Drain
+
+
+class FakeDrain(Drain):
+    def __init__(self):
+        self.chunks = []
+
+    @property
+    def prepared(self):
+        return bool(self.chunks)
+
+    async def drain(self, chunk):
+        self.chunks.append(bytes(chunk))
+        # yield control such that flushing buffers may interleave
+        await asyncio.sleep(0)
+
+
+class _Content:
+    def __init__(self, data):
+        self._buf = io.BytesIO(data)
+
+    async def read(self, n=-1):
+        return self._buf.read(n)
+
+
+class _Response:
+    def __init__(self, data):
+        self.content = _Content(data)
+
+
+class _Request(dict):
+    def __init__(self, config_dict):
+        super().__init__()
+        self.app = {}
+        self.config_dict = config_dict
+
+
+def _make_worker(lock, flush_size):
+    worker = _WFCatalogWorker.__new__(_WFCatalogWorker)
+    worker.request = _Request(
+        {
+            "config": {
+                _WFCatalogWorker.SERVICE_ID: {
+                    "buffer_flush_size": flush_size
+                }
+            }
+        }
+    )
+    worker._lock = lock
+    return worker
+
+
+def test_separator_scanner():
+    data = (
+        b'{"a": "},{", "b": [{"c": 1}, {"d": "\\""}]},'
+        b'{"e": "\\\\"},{"f": 2}]'
+    )
+    expected = [
+        data.index(b'},{"e"') + 1,
+        data.index(b'},{"f"') + 1,
+    ]
+
+    assert _SeparatorScanner().feed(data) == expected
+
+    # fed byte by byte
+    scanner = _SeparatorScanner()
+    assert [
+        i for i in range(len(data)) if scanner.feed(data[i : i + 1])
+    ] == expected
+
+
+@pytest.mark.asyncio
+async def test_flush_interleaved():
+    lock = asyncio.Lock()
+    drain = FakeDrain()
+
+    async def buffer(buf, objs):
+        worker = _make_worker(lock, 16)
+        context = {"url": "http://eida.ethz.ch", "chunk_size": 16}
+        await worker._buffer_response(
+            _Response(json.dumps(objs).encode()), buf, context
+        )
+        return worker, context
+
+    objs_a = [{"a": i, "s": "},{"} for i in range(3)]
+    objs_b = [{"b": i, "s": "},{"} for i in range(3)]
+    async with AioSpooledTemporaryFile() as buf_a:
+        async with AioSpooledTemporaryFile() as buf_b:
+            worker_a, context_a = await buffer(buf_a, objs_a)
+            worker_b, context_b = await buffer(buf_b, objs_b)
+            # both flushes wait for the lock before any slice is written
+            async with lock:
+                flushes = asyncio.gather(
+                    worker_a._flush(buf_a, drain, context_a),
+                    worker_b._flush(buf_b, drain, context_b),
+                )
+                await asyncio.sleep(0.1)
+            await flushes
+
+    # object-wise interleaved
+    objs = json.loads(b"[" + b"".join(drain.chunks) + b"]")
+    assert objs in (
+        [obj for pair in zip(objs_a, objs_b) for obj in pair],
+        [obj for pair in zip(objs_b, objs_a) for obj in pair],
+    )
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
 import datetime
 import functools
 import json
@@ -515,6 +516,93 @@ class TestEIDAWFCatalogServer(
             expected,
         )
 
+    @pytest.mark.parametrize(
+        "method,params_or_data",
+        [
+            (
+                "GET",
+                {
+                    "net": "CH",
+                    "sta": "HASLI",
+                    "loc": "--",
+                    "cha": "BHZ",
+                    "start": "2020-01-01",
+                    "end": "2020-01-10",
+                },
+            ),
+            ("POST", b"CH HASLI -- BHZ 2020-01-01 2020-01-10",),
+        ],
+    )
+    async def test_split_concurrently(
+        self,
+        server_config,
+        tester,
+        eidaws_routing_path_query,
+        eidaws_wfcatalog_content_type,
+        load_data,
+        method,
+        params_or_data,
+    ):
+        mocked_routing = {
+            "localhost": [
+                (
+                    eidaws_routing_path_query,
+                    method,
+                    web.Response(
+                        status=200,
+                        text=(
+                            "http://eida.ethz.ch/eidaws/wfcatalog/1/query\n"
+                            "CH HASLI -- BHZ 2020-01-01T00:00:00 2020-01-10T00:00:00\n"
+                        ),
+                    ),
+                )
+            ]
+        }
+
+        async def respond(request):
+            # the request for the first stream epoch is answered last
+            if "2020-01-01" in request.query_string + await request.text():
+                await asyncio.sleep(0.1)
+                return web.Response(
+                    status=200,
+                    body=load_data("CH.HASLI..BHZ.2020-01-01.2020-01-06"),
+                )
+            return web.Response(
+                status=200,
+                body=load_data("CH.HASLI..BHZ.2020-01-05.2020-01-10"),
+            )
+
+        config_dict = server_config(self.get_config, splitting_concurrency=2)
+        endpoint_request_method = self.lookup_config(
+            "endpoint_request_method", config_dict
+        )
+        mocked_endpoints = {
+            "eida.ethz.ch": [
+                (
+                    self.PATH_RESOURCE,
+                    endpoint_request_method,
+                    web.Response(status=413),
+                ),
+                (self.PATH_RESOURCE, endpoint_request_method, respond),
+                (self.PATH_RESOURCE, endpoint_request_method, respond),
+            ]
+        }
+
+        expected = {
+            "status": 200,
+            "content_type": eidaws_wfcatalog_content_type,
+            "result": "CH.HASLI..BHZ.2020-01-01.2020-01-10",
+        }
+        await tester(
+            self.FED_PATH_RESOURCE,
+            method,
+            params_or_data,
+            self.create_app(config_dict=config_dict),
+            mocked_routing,
+            mocked_endpoints,
+            expected,
+        )
+
     @pytest.mark.parametrize(
         "method,params_or_data",
         [
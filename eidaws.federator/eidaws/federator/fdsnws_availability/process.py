@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import asyncio
+from eidaws.federator.utils.concurrency import make_endpoint_key
 from eidaws.federator.utils.httperror import FDSNHTTPError
 from eidaws.federator.utils.process import group_routes_by, SortedResponse
 from eidaws.federator.version import __version__
@@ -157,5 +158,6 @@ class AvailabilityRequestProcessor(SortedResponse):
                 priority,
                 req_method=req_method,
                 context=ctx,
+                key=make_endpoint_key(*(r.url for r in _routes)),
                 **req_kwargs,
             )
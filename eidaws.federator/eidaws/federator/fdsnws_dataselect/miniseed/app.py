@@ -8,8 +8,14 @@ from eidaws.federator.fdsnws_dataselect.miniseed import SERVICE_ID, create_app
 from eidaws.federator.settings import (
     FED_DEFAULT_TMPDIR,
     FED_DEFAULT_BUFFER_ROLLOVER_SIZE,
+    FED_DEFAULT_BUFFER_FLUSH_SIZE,
     FED_DEFAULT_SPLITTING_FACTOR,
+    FED_DEFAULT_SPLITTING_CONCURRENCY,
+    FED_DEFAULT_PRESPLITTING_TTL,
     FED_DEFAULT_FALLBACK_MSEED_RECORD_SIZE,
+    FED_DEFAULT_MSEED_MERGE_WINDOW,
+    FED_DEFAULT_MSEED_DEDUP_INDEX_SIZE,
+    FED_DEFAULT_PASS_THROUGH,
 )
 from eidaws.federator.utils.app import _main
 from eidaws.federator.utils.cli import (
@@ -19,6 +25,7 @@ from eidaws.federator.utils.cli import (
 from eidaws.utils.cli import (
     between,
     positive_int,
+    positive_int_exclusive,
     InterpolatingYAMLConfigFileParser,
 )
 
@@ -58,6 +65,16 @@ def build_parser(config_file_parser_class=InterpolatingYAMLConfigFileParser):
         "(https://docs.python.org/3/library/tempfile.html#tempfile."
         "SpooledTemporaryFile) (default: %(default)s).",
     )
+    parser.add_argument(
+        "--buffer-flush-size",
+        dest="buffer_flush_size",
+        type=positive_int_exclusive,
+        default=FED_DEFAULT_BUFFER_FLUSH_SIZE,
+        metavar="BYTES",
+        help="Size of chunks buffered data is written to the response with. "
+        "The size is aligned with the size of the chunks data is buffered "
+        "with (default: %(default)s).",
+    )
     parser.add_argument(
         "--splitting-factor",
         dest="splitting_factor",
@@ -67,6 +84,28 @@ def build_parser(config_file_parser_class=InterpolatingYAMLConfigFileParser):
         help="Splitting factor when performing splitting and aligning for "
         "large requests (default: %(default)s).",
     )
+    parser.add_argument(
+        "--splitting-concurrency",
+        dest="splitting_concurrency",
+        metavar="NUM",
+        type=positive_int_exclusive,
+        default=FED_DEFAULT_SPLITTING_CONCURRENCY,
+        help="Maximum number of stream epochs downloaded concurrently after "
+        "splitting. The stream epochs are buffered separately and aligned "
+        "afterwards. If 1, stream epochs are downloaded sequentially "
+        "(default: %(default)s).",
+    )
+    parser.add_argument(
+        "--presplitting-ttl",
+        dest="presplitting_ttl",
+        metavar="SEC",
+        type=positive_int,
+        default=FED_DEFAULT_PRESPLITTING_TTL,
+        help="Time in seconds the maximum stream epoch durations learned "
+        "from HTTP status code 413 responses are kept per endpoint. Stream "
+        "epochs exceeding the duration learned are split before being "
+        "requested. If 0, pre-splitting is disabled (default: %(default)s).",
+    )
     parser.add_argument(
         "--fallback-miniseed-record-size",
         dest="fallback_mseed_record_size",
@@ -78,6 +117,37 @@ def build_parser(config_file_parser_class=InterpolatingYAMLConfigFileParser):
         "in case of blockette 1000 missing. Valid values are a multiple of 64 "
         "bytes (default: %(default)s).",
     )
+    parser.add_argument(
+        "--miniseed-merge-window",
+        dest="mseed_merge_window",
+        type=positive_int,
+        metavar="NUM",
+        default=FED_DEFAULT_MSEED_MERGE_WINDOW,
+        help="Number of miniseed records per stream reordered by start time "
+        "before being emitted. Duplicate records are dropped, regardless. If "
+        "0, records are not reordered (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--miniseed-dedup-index-size",
+        dest="mseed_dedup_index_size",
+        type=positive_int_exclusive,
+        metavar="NUM",
+        default=FED_DEFAULT_MSEED_DEDUP_INDEX_SIZE,
+        help="Number of miniseed records emitted last per request taken into "
+        "account for deduplication. The index is shared by all endpoint "
+        "requests of a request such that duplicates received from different "
+        "endpoints are dropped, as well (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--pass-through",
+        dest="pass_through",
+        action="store_true",
+        default=FED_DEFAULT_PASS_THROUGH,
+        help="Stream the data of a single job at a time directly to the "
+        "response instead of buffering, while the remaining jobs are "
+        "buffered. Reduces the time to first byte for large downloads "
+        "(default: %(default)s).",
+    )
 
     return parser
 
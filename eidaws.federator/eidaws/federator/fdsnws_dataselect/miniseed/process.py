@@ -1,12 +1,16 @@
 # -*- coding: utf-8 -*-
 
-import asyncio
 import datetime
-import errno
-import io
-import struct
+import time
 
 from eidaws.federator.fdsnws_dataselect.miniseed.parser import DataselectSchema
+from eidaws.federator.fdsnws_dataselect.miniseed.record import (
+    MINIMUM_RECORD_LENGTH,
+    MiniseedParsingError,
+    RecordIndex,
+    RecordMerger,
+    RecordReader,
+)
 from eidaws.federator.settings import (
     FED_BASE_ID,
     FED_DATASELECT_MINISEED_SERVICE_ID,
@@ -15,113 +19,26 @@ from eidaws.federator.utils.process import UnsortedResponse
 from eidaws.federator.utils.worker import (
     with_exception_handling,
     BaseSplitAlignWorker,
-    WorkerError,
+    _BufferedResponse,
 )
 
 
-FIXED_DATA_HEADER_SIZE = 48
-MINIMUM_RECORD_LENGTH = 256
-DATA_ONLY_BLOCKETTE_NUMBER = 1000
-
-
-class MiniseedParsingError(WorkerError):
-    """Error while parsing miniseed data: {}"""
-
-
-def _get_mseed_record_size(fd):
-    """
-    Extract the *MiniSEED* record length from a file-like object.
-
-    .. note::
-        Taken from `fdsnws_fetch <https://github.com/andres-h/fdsnws_scripts>_`.
-    """
-
-    # read fixed header
-    buf = fd.read(FIXED_DATA_HEADER_SIZE)
-    if not buf:
-        raise MiniseedParsingError("Missing data.")
-
-    # get offset of data (value before last, 2 bytes, unsigned short)
-    data_offset_idx = FIXED_DATA_HEADER_SIZE - 4
-    try:
-        (data_offset,) = struct.unpack(
-            b"!H", buf[data_offset_idx : data_offset_idx + 2]
-        )
-    except struct.error as err:
-        raise MiniseedParsingError(f"Error while reading data offset: {err}")
-
-    if data_offset >= FIXED_DATA_HEADER_SIZE:
-        remaining_header_size = data_offset - FIXED_DATA_HEADER_SIZE
-
-    elif data_offset == 0:
-        # This means that blockettes can follow, but no data samples. Use
-        # minimum record size to read following blockettes. This can still fail
-        # if blockette 1000 is after position 256
-        remaining_header_size = MINIMUM_RECORD_LENGTH - FIXED_DATA_HEADER_SIZE
-
-    else:
-        # Full header size cannot be smaller than fixed header size. This is an
-        # error.
-        raise MiniseedParsingError(
-            f"Data offset smaller than fixed header length: {data_offset}"
-        )
-
-    buf = fd.read(remaining_header_size)
-    if not buf:
-        raise MiniseedParsingError("Remaining header corrupt in record")
-
-    # scan variable header for blockette 1000
-    blockette_start = 0
-    b1000_found = False
-    try:
-        while blockette_start < remaining_header_size:
-
-            # 2 bytes, unsigned short
-            (blockette_id,) = struct.unpack(
-                b"!H", buf[blockette_start : blockette_start + 2]
-            )
-
-            # get start of next blockette (second value, 2 bytes, unsigned short)
-            (next_blockette_start,) = struct.unpack(
-                b"!H", buf[blockette_start + 2 : blockette_start + 4]
-            )
-
-            if blockette_id == DATA_ONLY_BLOCKETTE_NUMBER:
-
-                b1000_found = True
-                break
-
-            elif next_blockette_start == 0:
-                # no blockettes follow
-                break
-
-            else:
-                blockette_start = next_blockette_start
-    except struct.error:
-        pass
-
-    # blockette 1000 not found
-    if not b1000_found:
-        raise MiniseedParsingError("Blockette 1000 not found")
-
-    # get record size (1 byte, unsigned char)
-    record_size_exponent_idx = blockette_start + 6
-    (record_size_exponent,) = struct.unpack(
-        b"!B", buf[record_size_exponent_idx : record_size_exponent_idx + 1]
-    )
-
-    return 2 ** record_size_exponent
-
-
 class _DataselectWorker(BaseSplitAlignWorker):
     """
     A worker task implementation for ``fdsnws-dataselect`` ``format=miniseed``.
     The worker implements splitting and aligning facilities.
 
     When splitting and aligning (i.e. merging potentially occurring overlaps)
-    data is downloaded sequentially. Note, that a worker assumes the MiniSEED
-    data to be shipped with a uniform record length (with respect to a stream
-    epoch initially requested).
+    data is downloaded sequentially, unless a splitting concurrency is
+    configured. Records are framed individually, i.e. MiniSEED data may be
+    shipped with varying record lengths. Duplicate records (e.g. due to
+    overlapping stream epochs or endpoints) are detected by means of
+    comparing record headers and dropped. The index of records emitted is
+    shared by the jobs of a request. Optionally, records are reordered by
+    start time within a window of records (see also
+    :py:class:`.record.RecordMerger`).
+    The data received is accounted per endpoint (see also
+    :py:class:`~eidaws.federator.utils.metrics.TransferStats`).
 
     .. note::
 
@@ -136,94 +53,187 @@ class _DataselectWorker(BaseSplitAlignWorker):
 
     LOGGER = ".".join([FED_BASE_ID, SERVICE_ID, "worker"])
 
-    # minimum chunk size; the chunk size must be aligned with the mseed
-    # record_size
+    # minimum chunk size
     _CHUNK_SIZE = MINIMUM_RECORD_LENGTH
 
+    _KEY_RECORD_INDEX = "mseed_record_index"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        # context of the job streaming directly to the response
+        self._pass_through = None
+
     @with_exception_handling(ignore_runtime_exception=True)
     async def run(self, route, req_method="GET", context=None, **req_kwargs):
         context = context or {}
         context.setdefault("mseed_record_size", None)
-
-        await super().run(
-            route, req_method=req_method, context=context, **req_kwargs
+        context.setdefault(
+            "record_merger", self._create_record_merger(self.record_index)
         )
+        context.setdefault("pass_through", self.config["pass_through"])
 
-    async def _buffer_response(self, resp, buf, context, **kwargs):
-        logger = context.get("logger", self.logger)
-
-        async def _read(resp, chunk_size):
-            try:
-                chunk = await resp.content.readexactly(chunk_size)
-            except asyncio.IncompleteReadError as err:
-                if 0 != (len(err.partial) % chunk_size):
-                    logger.info(
-                        f"Chunk not a multiple of {chunk_size} bytes: {err}"
-                    )
+        try:
+            await super().run(
+                route, req_method=req_method, context=context, **req_kwargs
+            )
+        finally:
+            if self._pass_through is context:
+                self._pass_through = None
 
-                chunk = err.partial
+    @property
+    def record_index(self):
+        """
+        Return the index of records emitted shared by the jobs of a request.
+        """
+        try:
+            return self.request[self._KEY_RECORD_INDEX]
+        except KeyError:
+            index = RecordIndex(
+                max(
+                    self.config["mseed_dedup_index_size"],
+                    self.config["mseed_merge_window"],
+                )
+            )
+            self.request[self._KEY_RECORD_INDEX] = index
+            return index
+
+    def _create_record_merger(self, index=None):
+        return RecordMerger(
+            window_size=self.config["mseed_merge_window"],
+            index_size=self.config["mseed_dedup_index_size"],
+            index=index,
+        )
 
-            return chunk
+    def _create_piece_context(self, context):
+        piece_context = super()._create_piece_context(context)
+        # records are deduplicated across pieces (by means of the index
+        # shared) when being aligned; hence, pieces use an index of their own
+        piece_context["record_merger"] = self._create_record_merger()
+        # pieces are always buffered
+        piece_context["pass_through"] = False
+        return piece_context
+
+    def _acquire_pass_through(self, context, offset):
+        """
+        Return whether the job ``context`` refers to may stream directly to
+        the response. A single job at a time may do so, given that it hasn't
+        buffered any data, yet.
+        """
+        if not context["pass_through"] or offset:
+            return False
+
+        if self._pass_through is None:
+            logger = context.get("logger", self.logger)
+            logger.debug("Streaming directly (pass-through) ...")
+            self._pass_through = context
+
+        return self._pass_through is context
+
+    async def _pass(self, data, context):
+        start = time.monotonic()
+        async with self._lock:
+            await self._drain.drain(data)
+
+        self.account_transfer(
+            context["url"],
+            flushed_bytes=len(data),
+            flush_duration=time.monotonic() - start,
+        )
 
-        last_record = None
-        await buf.seek(0, 2)
-        if await buf.tell():
+    async def _buffer_response(self, resp, buf, context, **kwargs):
+        logger = context.get("logger", self.logger)
+        merger = context["record_merger"]
+        duplicates = merger.duplicates
+
+        start = time.monotonic()
+        nbytes = nrecords = 0
+
+        offset = await buf.seek(0, 2)
+        pass_through = self._acquire_pass_through(context, offset)
+        flush_size = self._get_flush_size(context)
+        pending = bytearray()
+
+        async def write(record):
+            nonlocal offset, pending
+            if pass_through:
+                pending += record
+                # pass data before waiting for data to be received
+                if len(pending) >= flush_size or not reader.buffered:
+                    await self._pass(pending, context)
+                    pending = bytearray()
+                return
+
+            await buf.write(record)
+            offset += len(record)
+            # records are boundaries the buffer may be sliced at
+            self._mark_boundary(context, offset)
+
+        fallback = self.config["fallback_mseed_record_size"]
+        reader = RecordReader(
+            resp.content,
+            chunk_size=flush_size,
+            default_record_size=context["mseed_record_size"] or fallback,
+        )
+        while True:
             try:
-                await buf.seek(-context["mseed_record_size"], 2)
-            except OSError as err:
-                if err.errno == errno.EINVAL:
-                    await buf.seek(0)
-                else:
-                    raise
-
-            last_record = await buf.read()
+                record = await reader.read()
+            except MiniseedParsingError as err:
+                logger.warning(f"{err}; stop reading")
+                break
 
-        while True:
+            if not record:
+                break
 
-            chunk = await _read(resp, context["chunk_size"])
-            if not chunk:
+            nbytes += len(record)
+            nrecords += 1
+
+            if reader.incomplete:
+                # incomplete records are neither deduplicated nor reordered
+                logger.info(
+                    f"Incomplete record ({len(record)} bytes); "
+                    "writing as is"
+                )
+                for r in merger.flush():
+                    await write(r)
+                await write(record)
                 break
 
-            if not context["mseed_record_size"]:
-                try:
-                    context["mseed_record_size"] = _get_mseed_record_size(
-                        io.BytesIO(chunk)
-                    )
-                except MiniseedParsingError as err:
-                    fallback = self.config["fallback_mseed_record_size"]
-                    if not fallback:
-                        logger.warning(f"{err}; stop reading")
-                        break
-
-                    logger.info(
-                        f"{err}; using fallback miniseed record size: "
-                        f"{fallback} bytes"
-                    )
-                    context["mseed_record_size"] = fallback
-                finally:
-                    if context["mseed_record_size"]:
-                        # read remaining part of record
-                        remaining = (
-                            context["mseed_record_size"]
-                            - context["chunk_size"]
-                        )
-                        logger.debug(
-                            f"Reading remaining {remaining} bytes of record "
-                            "(miniseed record size "
-                            f"{context['mseed_record_size']} bytes) ..."
-                        )
-                        if 0 < remaining:
-                            chunk += await _read(resp, remaining)
-
-                        # align chunk_size with mseed record_size
-                        context["chunk_size"] = context["mseed_record_size"]
-
-            if last_record is not None:
-                if last_record in chunk:
-                    chunk = chunk[context["mseed_record_size"] :]
-                last_record = None
-
-            await buf.write(chunk)
+            if reader.defaulted and not context["mseed_record_size"]:
+                logger.info(
+                    "Blockette 1000 not found; using fallback miniseed "
+                    f"record size: {fallback} bytes"
+                )
+
+            for r in merger.push(record):
+                await write(r)
+
+            context["mseed_record_size"] = len(record)
+            reader.default_record_size = len(record)
+            # align chunk_size with mseed record_size
+            context["chunk_size"] = max(context["chunk_size"], len(record))
+
+        for r in merger.flush():
+            await write(r)
+
+        if pending:
+            await self._pass(pending, context)
+
+        # buffered pieces (i.e. when aligning) were accounted when downloaded
+        if not isinstance(resp, _BufferedResponse):
+            self.account_transfer(
+                context["url"],
+                responses=1,
+                bytes=nbytes,
+                records=nrecords,
+                duration=time.monotonic() - start,
+            )
+
+        if merger.duplicates > duplicates:
+            logger.debug(
+                f"Dropped {merger.duplicates - duplicates} duplicate "
+                "record(s)"
+            )
 
 
 class DataselectRequestProcessor(UnsortedResponse):
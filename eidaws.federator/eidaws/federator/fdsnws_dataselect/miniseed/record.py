@@ -0,0 +1,368 @@
+# -*- coding: utf-8 -*-
+"""
+*MiniSEED* record framing facilities.
+
+For additional information with regard to the *MiniSEED* data format see
+also the `SEED Reference Manual
+<http://www.fdsn.org/pdf/SEEDManual_V2.4.pdf>`_.
+"""
+
+import collections
+import heapq
+import struct
+
+from eidaws.federator.utils.worker import WorkerError
+
+
+FIXED_DATA_HEADER_SIZE = 48
+MINIMUM_RECORD_LENGTH = 256
+DATA_ONLY_BLOCKETTE_NUMBER = 1000
+
+# fields of the fixed section of data header identifying a record, i.e.
+# sequence number; station, location, channel and network code, start time,
+# number of samples and sample rate factor/multiplier
+_SEQUENCE_NUMBER_SLICE = slice(0, 6)
+_RECORD_KEY_SLICE = slice(8, 36)
+_STREAM_ID_SLICE = slice(8, 20)
+# record start time (BTIME)
+_START_TIME = struct.Struct("!HHBBBxH")
+_START_TIME_IDX = 20
+# beginning of data and first blockette offsets
+_OFFSETS = struct.Struct("!HH")
+_OFFSETS_IDX = 44
+# blockette type and next blockette's offset
+_BLOCKETTE_HEADER = struct.Struct("!HH")
+_RECORD_LENGTH_EXPONENT_IDX = 6
+
+
+class MiniseedParsingError(WorkerError):
+    """Error while parsing miniseed data: {}"""
+
+
+def get_header_size(header):
+    """
+    Return the size of the header (i.e. the fixed section of data header
+    including the blockettes) of the record ``header`` refers to.
+
+    :param header: Bytes-like object containing (at least) the fixed section
+        of data header
+    """
+    if len(header) < FIXED_DATA_HEADER_SIZE:
+        raise MiniseedParsingError("Missing data.")
+
+    data_offset, _ = _OFFSETS.unpack_from(header, _OFFSETS_IDX)
+    if data_offset >= FIXED_DATA_HEADER_SIZE:
+        return data_offset
+    elif data_offset == 0:
+        # This means that blockettes can follow, but no data samples. Use
+        # minimum record size to read following blockettes. This can still
+        # fail if blockette 1000 is after position 256
+        return MINIMUM_RECORD_LENGTH
+
+    # Full header size cannot be smaller than fixed header size. This is an
+    # error.
+    raise MiniseedParsingError(
+        f"Data offset smaller than fixed header length: {data_offset}"
+    )
+
+
+def get_record_size(header):
+    """
+    Extract the record length from blockette 1000 (i.e. data only miniseed
+    blockette) of the record ``header`` refers to. The header is parsed in
+    place.
+
+    :param header: Bytes-like object (e.g. a :py:class:`memoryview`)
+        containing the record's header
+    :returns: Record length in bytes
+    :rtype: int
+    :raises MiniseedParsingError: If the record length cannot be determined
+    """
+    header_size = min(get_header_size(header), len(header))
+
+    _, offset = _OFFSETS.unpack_from(header, _OFFSETS_IDX)
+    while (
+        offset >= FIXED_DATA_HEADER_SIZE
+        and offset + _BLOCKETTE_HEADER.size <= header_size
+    ):
+        blockette_id, next_offset = _BLOCKETTE_HEADER.unpack_from(
+            header, offset
+        )
+        if blockette_id == DATA_ONLY_BLOCKETTE_NUMBER:
+            idx = offset + _RECORD_LENGTH_EXPONENT_IDX
+            if idx >= header_size:
+                break
+
+            record_size = 2 ** header[idx]
+            if record_size < FIXED_DATA_HEADER_SIZE:
+                raise MiniseedParsingError(
+                    f"Invalid record length: {record_size}"
+                )
+            return record_size
+
+        # offsets are absolute; prevent from looping infinitely
+        if next_offset <= offset:
+            break
+        offset = next_offset
+
+    raise MiniseedParsingError("Blockette 1000 not found")
+
+
+def get_record_key(record):
+    """
+    Return a key identifying ``record``. Records with equal keys are
+    considered as duplicates.
+    """
+    return bytes(record[_SEQUENCE_NUMBER_SLICE]) + bytes(
+        record[_RECORD_KEY_SLICE]
+    )
+
+
+def get_record_sort_key(record):
+    """
+    Return a key ordering records by stream and start time.
+
+    .. note::
+
+        The start time is assumed to be encoded big-endian.
+    """
+    return (
+        bytes(record[_STREAM_ID_SLICE]),
+        _START_TIME.unpack_from(record, _START_TIME_IDX),
+    )
+
+
+class RecordIndex:
+    """
+    Index of the keys of the ``size`` records added last.
+    """
+
+    def __init__(self, size=1024):
+        self.size = size
+
+        self._keys = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, record_key):
+        return record_key in self._keys
+
+    def add(self, record_key):
+        self._keys[record_key] = None
+        if len(self._keys) > self.size:
+            self._keys.popitem(last=False)
+
+
+class RecordMerger:
+    """
+    Deduplicates records and emits them time-ordered per stream.
+
+    Records are deduplicated by means of an index of the ``index_size``
+    records emitted last. The index may be shared by multiple mergers (e.g.
+    by the jobs of a request) such that records emitted by any of them are
+    deduplicated. Within a window of ``window_size`` records, records are
+    reordered by start time. Records emitted are not reordered anymore, i.e.
+    records arriving late are emitted as they are. Both the index and the
+    window are bounded such that memory consumption is bounded, too.
+    """
+
+    def __init__(self, window_size=0, index_size=1024, index=None):
+        """
+        :param int window_size: Number of records reordered at once. If 0,
+            records are emitted as they are pushed (without copying).
+        :param int index_size: Number of records taken into account for
+            deduplication
+        :param index: Index shared with other mergers. If ``None`` the
+            merger uses an index of its own with ``index_size`` entries.
+        :type index: :py:class:`RecordIndex`
+        """
+        self.window_size = window_size
+        if index is None:
+            index = RecordIndex(max(index_size, window_size))
+        self.index_size = index.size
+
+        self.duplicates = 0
+
+        self._index = index
+        # (sort key, insertion count, record key, record) tuples
+        self._window = []
+        self._pending = set()
+        self._count = 0
+
+    def __len__(self):
+        return len(self._window)
+
+    def __contains__(self, record_key):
+        return record_key in self._index or record_key in self._pending
+
+    def _emit(self, record_key):
+        self._index.add(record_key)
+
+    def push(self, record):
+        """
+        Push ``record``.
+
+        :returns: List of records to be emitted
+        """
+        record_key = get_record_key(record)
+        if record_key in self:
+            self.duplicates += 1
+            return []
+
+        if not self.window_size:
+            self._emit(record_key)
+            return [record]
+
+        self._count += 1
+        heapq.heappush(
+            self._window,
+            (
+                get_record_sort_key(record),
+                self._count,
+                record_key,
+                bytes(record),
+            ),
+        )
+        self._pending.add(record_key)
+
+        retval = []
+        while len(self._window) > self.window_size:
+            retval.append(self._pop())
+        return retval
+
+    def flush(self):
+        """
+        Return the records pending, time-ordered.
+        """
+        retval = []
+        while self._window:
+            retval.append(self._pop())
+        return retval
+
+    def _pop(self):
+        _, _, record_key, record = heapq.heappop(self._window)
+        self._pending.discard(record_key)
+        self._emit(record_key)
+        return record
+
+
+class RecordReader:
+    """
+    Frames *MiniSEED* records read from a :py:class:`aiohttp.StreamReader`
+    like object.
+
+    Data read is buffered within a :py:class:`bytearray` and records are
+    returned as :py:class:`memoryview` objects, i.e. without copying. The
+    record length is determined per record such that records of varying
+    length are supported.
+    """
+
+    def __init__(self, stream, chunk_size=4096, default_record_size=None):
+        """
+        :param stream: Stream to be read from
+        :param int chunk_size: Minimum number of bytes read at once
+        :param default_record_size: Record length used in case a record
+            doesn't provide blockette 1000. If ``None``, such records are
+            considered as invalid.
+        """
+        self.default_record_size = default_record_size
+
+        # the record returned last is incomplete
+        self.incomplete = False
+        # the length of the record returned last is the default record
+        # length
+        self.defaulted = False
+
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._buf = bytearray()
+        self._pos = 0
+        self._view = None
+        self._eof = False
+
+    @property
+    def buffered(self):
+        """
+        Number of bytes buffered but not returned, yet.
+        """
+        return self._available()
+
+    def _available(self):
+        return len(self._buf) - self._pos
+
+    def _release(self):
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+
+    async def _fill(self, n):
+        """
+        Make sure at least ``n`` bytes are buffered.
+
+        :returns: Whether ``n`` bytes are available.
+        """
+        while self._available() < n and not self._eof:
+            # reclaim space of records consumed
+            if self._pos and self._pos >= len(self._buf) // 2:
+                del self._buf[: self._pos]
+                self._pos = 0
+
+            chunk = await self._stream.read(
+                max(self._chunk_size, n - self._available())
+            )
+            if not chunk:
+                self._eof = True
+                break
+
+            self._buf += chunk
+
+        return self._available() >= n
+
+    def _consume(self, n):
+        self._view = memoryview(self._buf)[self._pos : self._pos + n]
+        self._pos += n
+        return self._view
+
+    async def read(self):
+        """
+        Return the next record. A record returned is valid until the next
+        record is read. At EOF an empty :py:class:`memoryview` is returned.
+        If data ends with an incomplete record, the remaining data is
+        returned and :py:attr:`incomplete` is set.
+
+        :rtype: :py:class:`memoryview`
+        :raises MiniseedParsingError: If a record's length cannot be
+            determined
+        """
+        self._release()
+        self.incomplete = False
+        self.defaulted = False
+
+        if not await self._fill(FIXED_DATA_HEADER_SIZE):
+            self.incomplete = self._available() > 0
+            return self._consume(self._available())
+
+        header = memoryview(self._buf)[self._pos :]
+        try:
+            header_size = get_header_size(header)
+        finally:
+            header.release()
+
+        await self._fill(header_size)
+        header = memoryview(self._buf)[self._pos :]
+        try:
+            record_size = get_record_size(header)
+        except MiniseedParsingError:
+            if not self.default_record_size:
+                raise
+            record_size = self.default_record_size
+            self.defaulted = True
+        finally:
+            header.release()
+
+        if not await self._fill(record_size):
+            self.incomplete = True
+            return self._consume(self._available())
+
+        return self._consume(record_size)
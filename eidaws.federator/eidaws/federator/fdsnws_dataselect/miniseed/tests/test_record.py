@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+MiniSEED record framing related test facilities.
+"""
+
+import io
+import pathlib
+import pytest
+
+from eidaws.federator.fdsnws_dataselect.miniseed.record import (
+    MiniseedParsingError,
+    RecordIndex,
+    RecordMerger,
+    RecordReader,
+    get_record_key,
+    get_record_size,
+)
+
+
+PATH_DATA = pathlib.Path(__file__).parent / "data"
+
+
+class FakeStream:
+    """
+    Stream returning at most ``max_chunk_size`` bytes per read.
+    """
+
+    def __init__(self, data, max_chunk_size=100):
+        self._fd = io.BytesIO(data)
+        self._max_chunk_size = max_chunk_size
+
+    async def read(self, n=-1):
+        return self._fd.read(min(n, self._max_chunk_size))
+
+
+def _load_data(fname):
+    return (PATH_DATA / fname).read_bytes()
+
+
+def _make_record_256(record):
+    # adjust record length exponent of blockette 1000
+    record = bytearray(record[:256])
+    record[54] = 8
+    return bytes(record)
+
+
+@pytest.fixture
+def records():
+    data = _load_data("CH.HASLI..LHZ.2019-01-01.2019-01-01T00:10:00")
+    return [data[:512], data[512:]]
+
+
+class TestGetRecordSize:
+    def test_b1000(self, records):
+        assert get_record_size(memoryview(records[0])) == 512
+
+    def test_b1000_chained(self):
+        # blockette 1001 precedes blockette 1000
+        data = _load_data(
+            "GR.BFO..HHZ.2020-02-01T06:30:00.2020-02-01T06:35:00"
+        )
+        assert get_record_size(memoryview(data)[:64]) == 512
+
+    def test_b1000_missing(self):
+        data = _load_data(
+            "GR.BFO..HHZ.2020-02-01T06:30:00.2020-02-01T06:35:00.no-b1000"
+        )
+        with pytest.raises(MiniseedParsingError):
+            get_record_size(memoryview(data)[:64])
+
+    def test_missing_data(self):
+        with pytest.raises(MiniseedParsingError):
+            get_record_size(b"\x00" * 47)
+
+
+class TestRecordReader:
+    @staticmethod
+    async def _read_all(reader):
+        retval = []
+        while True:
+            record = await reader.read()
+            if not record:
+                break
+            retval.append((bytes(record), reader.incomplete))
+
+        return retval
+
+    @pytest.mark.asyncio
+    async def test_read(self, records):
+        reader = RecordReader(FakeStream(b"".join(records)), chunk_size=64)
+
+        assert await self._read_all(reader) == [(r, False) for r in records]
+
+    @pytest.mark.asyncio
+    async def test_mixed_record_lengths(self, records):
+        records = [records[0], _make_record_256(records[1]), records[0]]
+        reader = RecordReader(FakeStream(b"".join(records)))
+
+        assert await self._read_all(reader) == [(r, False) for r in records]
+
+    @pytest.mark.asyncio
+    async def test_incomplete(self, records):
+        reader = RecordReader(FakeStream(records[0] + records[1][:100]))
+
+        assert await self._read_all(reader) == [
+            (records[0], False),
+            (records[1][:100], True),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_default_record_size(self):
+        data = _load_data(
+            "GR.BFO..HHZ.2020-02-01T06:30:00.2020-02-01T06:35:00.no-b1000"
+        )
+        reader = RecordReader(FakeStream(data))
+        with pytest.raises(MiniseedParsingError):
+            await reader.read()
+
+        reader = RecordReader(FakeStream(data), default_record_size=512)
+        record = await reader.read()
+        assert len(record) == 512
+        assert reader.defaulted
+
+
+def test_record_key(records):
+    assert get_record_key(records[0]) == get_record_key(
+        memoryview(bytearray(records[0]))
+    )
+    assert get_record_key(records[0]) != get_record_key(records[1])
+
+
+class TestRecordMerger:
+    def test_deduplicate(self, records):
+        merger = RecordMerger()
+
+        assert merger.push(records[0]) == [records[0]]
+        assert merger.push(records[0]) == []
+        assert merger.push(memoryview(records[1])) == [records[1]]
+        assert merger.flush() == []
+        assert merger.duplicates == 1
+
+    def test_index_size(self, records):
+        merger = RecordMerger(index_size=1)
+
+        merger.push(records[0])
+        merger.push(records[1])
+        # evicted from the index
+        assert merger.push(records[0]) == [records[0]]
+
+    def test_shared_index(self, records):
+        index = RecordIndex()
+        merger = RecordMerger(index=index)
+        other = RecordMerger(index=index)
+
+        assert merger.push(records[0]) == [records[0]]
+        assert other.push(records[0]) == []
+        assert other.push(records[1]) == [records[1]]
+        assert merger.push(records[1]) == []
+        assert len(index) == 2
+
+    def test_reorder(self, records):
+        merger = RecordMerger(window_size=2)
+
+        assert merger.push(records[1]) == []
+        assert merger.push(records[1]) == []
+        assert merger.push(records[0]) == []
+        assert len(merger) == 2
+        assert merger.flush() == records
+        assert merger.duplicates == 1
+
+    def test_window_size(self, records):
+        merger = RecordMerger(window_size=1)
+
+        assert merger.push(records[1]) == []
+        assert merger.push(records[0]) == [records[0]]
+        assert merger.flush() == [records[1]]
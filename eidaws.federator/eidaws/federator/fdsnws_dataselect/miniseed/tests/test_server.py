@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
 import functools
 import pytest
 
@@ -447,6 +448,112 @@ class TestFDSNDataselectServer(
             expected,
         )
 
+    @pytest.mark.parametrize(
+        "method,params_or_data",
+        [
+            (
+                "GET",
+                {
+                    "net": "CH",
+                    "sta": "HASLI",
+                    "loc": "--",
+                    "cha": "LHZ",
+                    "start": "2019-01-01",
+                    "end": "2019-01-10",
+                },
+            ),
+            ("POST", b"CH HASLI -- LHZ 2019-01-01 2019-01-10",),
+        ],
+    )
+    @pytest.mark.parametrize(
+        "limits",
+        [
+            {},
+            # the job's slots are lent to the split stream epochs
+            {"task_budget_per_request": 1},
+            {
+                "endpoint_concurrency": "aimd",
+                "endpoint_connection_limit_per_host": 1,
+            },
+        ],
+        ids=["unlimited", "task-budget", "aimd"],
+    )
+    async def test_split_concurrently(
+        self,
+        server_config,
+        tester,
+        eidaws_routing_path_query,
+        fdsnws_dataselect_content_type,
+        load_data,
+        method,
+        params_or_data,
+        limits,
+    ):
+        mocked_routing = {
+            "localhost": [
+                (
+                    eidaws_routing_path_query,
+                    method,
+                    web.Response(
+                        status=200,
+                        text=(
+                            "http://eida.ethz.ch/fdsnws/dataselect/1/query\n"
+                            "CH HASLI -- LHZ "
+                            "2019-01-01T00:00:00 2019-01-10T00:00:00\n"
+                        ),
+                    ),
+                )
+            ]
+        }
+
+        async def respond(request):
+            # the request for the first stream epoch is answered last
+            if "2019-01-01" in request.query_string + await request.text():
+                await asyncio.sleep(0.1)
+                return web.Response(
+                    status=200,
+                    body=load_data(
+                        "CH.HASLI..LHZ.2019-01-01.2019-01-05T00:05:45"
+                    ),
+                )
+            return web.Response(
+                status=200,
+                body=load_data("CH.HASLI..LHZ.2019-01-05.2019-01-10"),
+            )
+
+        config_dict = server_config(
+            self.get_config, splitting_concurrency=2, **limits
+        )
+        endpoint_request_method = self.lookup_config(
+            "endpoint_request_method", config_dict
+        )
+        mocked_endpoints = {
+            "eida.ethz.ch": [
+                (
+                    self.PATH_RESOURCE,
+                    endpoint_request_method,
+                    web.Response(status=413),
+                ),
+                (self.PATH_RESOURCE, endpoint_request_method, respond),
+                (self.PATH_RESOURCE, endpoint_request_method, respond),
+            ]
+        }
+
+        expected = {
+            "status": 200,
+            "content_type": fdsnws_dataselect_content_type,
+            "result": "CH.HASLI..LHZ.2019-01-01.2019-01-10",
+        }
+        await tester(
+            self.FED_PATH_RESOURCE,
+            method,
+            params_or_data,
+            self.create_app(config_dict=config_dict),
+            mocked_routing,
+            mocked_endpoints,
+            expected,
+        )
+
     @pytest.mark.parametrize(
         "method,params_or_data",
         [
@@ -541,6 +648,376 @@ class TestFDSNDataselectServer(
             expected,
         )
 
+    @pytest.mark.parametrize(
+        "method,params_or_data",
+        [
+            (
+                "GET",
+                {
+                    "net": "CH",
+                    "sta": "HASLI",
+                    "loc": "--",
+                    "cha": "LHZ",
+                    "start": "2019-01-01",
+                    "end": "2019-01-01T00:10:00",
+                },
+            ),
+            ("POST", b"CH HASLI -- LHZ 2019-01-01 2019-01-01T00:10:00",),
+        ],
+    )
+    async def test_merge_records(
+        self,
+        server_config,
+        tester,
+        eidaws_routing_path_query,
+        fdsnws_dataselect_content_type,
+        load_data,
+        method,
+        params_or_data,
+    ):
+        mocked_routing = {
+            "localhost": [
+                (
+                    eidaws_routing_path_query,
+                    method,
+                    web.Response(
+                        status=200,
+                        text=(
+                            "http://eida.ethz.ch/fdsnws/dataselect/1/query\n"
+                            "CH HASLI -- LHZ "
+                            "2019-01-01T00:00:00 2019-01-01T00:10:00\n"
+                        ),
+                    ),
+                )
+            ]
+        }
+
+        config_dict = server_config(self.get_config, mseed_merge_window=2)
+        data = load_data("CH.HASLI..LHZ.2019-01-01.2019-01-01T00:10:00")
+        # unordered records including a duplicate
+        mocked_endpoints = {
+            "eida.ethz.ch": [
+                (
+                    self.PATH_RESOURCE,
+                    self.lookup_config("endpoint_request_method", config_dict),
+                    web.Response(
+                        status=200,
+                        body=data[512:] + data[:512] + data[512:],
+                    ),
+                ),
+            ]
+        }
+
+        expected = {
+            "status": 200,
+            "content_type": fdsnws_dataselect_content_type,
+            "result": "CH.HASLI..LHZ.2019-01-01.2019-01-01T00:10:00",
+        }
+        await tester(
+            self.FED_PATH_RESOURCE,
+            method,
+            params_or_data,
+            self.create_app(config_dict=config_dict),
+            mocked_routing,
+            mocked_endpoints,
+            expected,
+        )
+
+    @pytest.mark.parametrize(
+        "method,params_or_data",
+        [
+            (
+                "GET",
+                {
+                    "net": "CH",
+                    "sta": "HASLI",
+                    "loc": "--",
+                    "cha": "LHZ",
+                    "start": "2019-01-01",
+                    "end": "2019-01-01T00:10:00",
+                },
+            ),
+            ("POST", b"CH HASLI -- LHZ 2019-01-01 2019-01-01T00:10:00",),
+        ],
+    )
+    async def test_deduplicate_across_endpoints(
+        self,
+        server_config,
+        tester,
+        eidaws_routing_path_query,
+        fdsnws_dataselect_content_type,
+        load_data,
+        method,
+        params_or_data,
+    ):
+        mocked_routing = {
+            "localhost": [
+                (
+                    eidaws_routing_path_query,
+                    method,
+                    web.Response(
+                        status=200,
+                        text=(
+                            "http://eida.ethz.ch/fdsnws/dataselect/1/query\n"
+                            "CH HASLI -- LHZ "
+                            "2019-01-01T00:00:00 2019-01-01T00:10:00\n"
+                            "\n"
+                            "http://www.orfeus-eu.org/fdsnws/dataselect/1/"
+                            "query\n"
+                            "CH HASLI -- LHZ "
+                            "2019-01-01T00:00:00 2019-01-01T00:10:00\n"
+                        ),
+                    ),
+                )
+            ]
+        }
+
+        config_dict = server_config(self.get_config)
+        endpoint_request_method = self.lookup_config(
+            "endpoint_request_method", config_dict
+        )
+        data = load_data("CH.HASLI..LHZ.2019-01-01.2019-01-01T00:10:00")
+        # both endpoints serve the same records
+        mocked_endpoints = {
+            host: [
+                (
+                    self.PATH_RESOURCE,
+                    endpoint_request_method,
+                    web.Response(status=200, body=data),
+                ),
+            ]
+            for host in ("eida.ethz.ch", "www.orfeus-eu.org")
+        }
+
+        expected = {
+            "status": 200,
+            "content_type": fdsnws_dataselect_content_type,
+            "result": "CH.HASLI..LHZ.2019-01-01.2019-01-01T00:10:00",
+        }
+        await tester(
+            self.FED_PATH_RESOURCE,
+            method,
+            params_or_data,
+            self.create_app(config_dict=config_dict),
+            mocked_routing,
+            mocked_endpoints,
+            expected,
+        )
+
+    async def test_pass_through(
+        self, make_federated_eida, eidaws_routing_path_query, load_data,
+    ):
+        mocked_routing = {
+            "localhost": [
+                (
+                    eidaws_routing_path_query,
+                    "GET",
+                    web.Response(
+                        status=200,
+                        text=(
+                            "http://eida.ethz.ch/fdsnws/dataselect/1/query\n"
+                            "CH HASLI -- LHZ "
+                            "2019-01-01T00:00:00 2019-01-01T00:10:00\n"
+                        ),
+                    ),
+                )
+            ]
+        }
+
+        data = load_data("CH.HASLI..LHZ.2019-01-01.2019-01-01T00:10:00")
+        received = asyncio.Event()
+
+        async def stream(request):
+            response = web.StreamResponse()
+            await response.prepare(request)
+            await response.write(data[:512])
+            # the first record is received by the client before the
+            # endpoint completes its response
+            await asyncio.wait_for(received.wait(), 5)
+            await response.write(data[512:])
+            await response.write_eof()
+            return response
+
+        mocked_endpoints = {
+            "eida.ethz.ch": [(self.PATH_RESOURCE, "GET", stream)]
+        }
+
+        config_dict = self.get_config(pass_through=True)
+        client, faked_routing, faked_endpoints = await make_federated_eida(
+            self.create_app(config_dict=config_dict)(),
+            mocked_routing_config=mocked_routing,
+            mocked_endpoint_config=mocked_endpoints,
+        )
+
+        params = {
+            "net": "CH",
+            "sta": "HASLI",
+            "loc": "--",
+            "cha": "LHZ",
+            "start": "2019-01-01",
+            "end": "2019-01-01T00:10:00",
+        }
+        resp = await client.get(self.FED_PATH_RESOURCE, params=params)
+        assert resp.status == 200
+        assert await resp.content.readexactly(512) == data[:512]
+        received.set()
+        assert await resp.read() == data[512:]
+
+        faked_routing.assert_no_unused_routes()
+        faked_endpoints.assert_no_unused_routes()
+
+    async def test_transfer_stats(
+        self, make_federated_eida, eidaws_routing_path_query, load_data,
+    ):
+        mocked_routing = {
+            "localhost": [
+                (
+                    eidaws_routing_path_query,
+                    "GET",
+                    web.Response(
+                        status=200,
+                        text=(
+                            "http://eida.ethz.ch/fdsnws/dataselect/1/query\n"
+                            "CH HASLI -- LHZ "
+                            "2019-01-01T00:00:00 2019-01-01T00:10:00\n"
+                        ),
+                    ),
+                )
+            ]
+        }
+
+        data = load_data("CH.HASLI..LHZ.2019-01-01.2019-01-01T00:10:00")
+        # including a duplicate record
+        mocked_endpoints = {
+            "eida.ethz.ch": [
+                (
+                    self.PATH_RESOURCE,
+                    "GET",
+                    web.Response(status=200, body=data[:512] + data),
+                ),
+            ]
+        }
+
+        config_dict = self.get_config(metrics_path="/metrics")
+        client, faked_routing, faked_endpoints = await make_federated_eida(
+            self.create_app(config_dict=config_dict)(),
+            mocked_routing_config=mocked_routing,
+            mocked_endpoint_config=mocked_endpoints,
+        )
+
+        params = {
+            "net": "CH",
+            "sta": "HASLI",
+            "loc": "--",
+            "cha": "LHZ",
+            "start": "2019-01-01",
+            "end": "2019-01-01T00:10:00",
+        }
+        resp = await client.get(self.FED_PATH_RESOURCE, params=params)
+        assert resp.status == 200
+        assert await resp.read() == data
+
+        resp = await client.get("/metrics")
+        assert resp.status == 200
+        stats = (await resp.json())["transfers"]["eida.ethz.ch"]
+        assert stats["responses"] == 1
+        assert stats["bytes"] == len(data) + 512
+        assert stats["records"] == len(data) // 512 + 1
+        assert stats["flushed_bytes"] == len(data)
+        assert stats["throughput"] > 0
+
+        faked_routing.assert_no_unused_routes()
+        faked_endpoints.assert_no_unused_routes()
+
+    async def test_presplit(
+        self,
+        make_federated_eida,
+        eidaws_routing_path_query,
+        load_data,
+    ):
+        mocked_routing = {
+            "localhost": [
+                (
+                    eidaws_routing_path_query,
+                    "GET",
+                    web.Response(
+                        status=200,
+                        text=(
+                            "http://eida.ethz.ch/fdsnws/dataselect/1/query\n"
+                            "CH HASLI -- LHZ "
+                            "2019-01-01T00:00:00 2019-01-10T00:00:00\n"
+                        ),
+                    ),
+                )
+                for _ in range(2)
+            ]
+        }
+
+        def mocked_pieces():
+            return [
+                (
+                    self.PATH_RESOURCE,
+                    "GET",
+                    web.Response(
+                        status=200,
+                        body=load_data(
+                            "CH.HASLI..LHZ.2019-01-01.2019-01-05T00:05:45"
+                        ),
+                    ),
+                ),
+                (
+                    self.PATH_RESOURCE,
+                    "GET",
+                    web.Response(
+                        status=200,
+                        body=load_data("CH.HASLI..LHZ.2019-01-05.2019-01-10"),
+                    ),
+                ),
+            ]
+
+        # the stream epoch is split without requesting it as a whole, once
+        # the HTTP status code 413 was learned
+        mocked_endpoints = {
+            "eida.ethz.ch": [
+                (self.PATH_RESOURCE, "GET", web.Response(status=413)),
+                *mocked_pieces(),
+                *mocked_pieces(),
+            ]
+        }
+
+        config_dict = self.get_config(
+            presplitting_ttl=3600, metrics_path="/metrics"
+        )
+        client, faked_routing, faked_endpoints = await make_federated_eida(
+            self.create_app(config_dict=config_dict)(),
+            mocked_routing_config=mocked_routing,
+            mocked_endpoint_config=mocked_endpoints,
+        )
+
+        params = {
+            "net": "CH",
+            "sta": "HASLI",
+            "loc": "--",
+            "cha": "LHZ",
+            "start": "2019-01-01",
+            "end": "2019-01-10",
+        }
+        for _ in range(2):
+            resp = await client.get(self.FED_PATH_RESOURCE, params=params)
+            assert resp.status == 200
+            assert await resp.read() == load_data(
+                "CH.HASLI..LHZ.2019-01-01.2019-01-10"
+            )
+
+        resp = await client.get("/metrics")
+        assert resp.status == 200
+        stats = (await resp.json())["presplitting"]
+        assert stats["learned"] == 1
+        assert stats["presplit"] == 1
+
+        faked_routing.assert_no_unused_routes()
+        faked_endpoints.assert_no_unused_routes()
+
     @pytest.mark.parametrize(
         "method,params_or_data",
         [
@@ -794,9 +1271,10 @@ class TestFDSNDataselectServer(
                     self.lookup_config("endpoint_request_method", config_dict),
                     web.Response(
                         status=200,
+                        # blockette 1000 not linked
                         body=load_data(
                             "GR.BFO..HHZ."
-                            "2020-02-01T06:30:00.2020-02-01T06:35:00"
+                            "2020-02-01T06:30:00.2020-02-01T06:35:00.no-b1000"
                         ),
                     ),
                 ),
@@ -806,7 +1284,10 @@ class TestFDSNDataselectServer(
             expected = {
                 "status": 200,
                 "content_type": fdsnws_dataselect_content_type,
-                "result": "GR.BFO..HHZ.2020-02-01T06:30:00.2020-02-01T06:35:00",
+                "result": (
+                    "GR.BFO..HHZ."
+                    "2020-02-01T06:30:00.2020-02-01T06:35:00.no-b1000"
+                ),
             }
         else:
             # disabled fallback
@@ -2,6 +2,7 @@
 
 import asyncio
 import aiohttp
+import time
 
 from eidaws.federator.fdsnws_station.text.parser import StationTextSchema
 from eidaws.federator.settings import (
@@ -20,7 +21,7 @@ from eidaws.utils.settings import FDSNWS_NO_CONTENT_CODES
 class _StationTextWorker(BaseWorker):
     """
     A worker task which fetches data and writes the results to the ``response``
-    object.
+    object. Data is streamed while being received.
     """
 
     SERVICE_ID = FED_STATION_TEXT_SERVICE_ID
@@ -28,6 +29,8 @@ class _StationTextWorker(BaseWorker):
 
     LOGGER = ".".join([FED_BASE_ID, SERVICE_ID, "worker"])
 
+    _CHUNK_SIZE = 64 * 1024
+
     @with_exception_handling(ignore_runtime_exception=True)
     async def run(self, route, req_method="GET", context=None, **req_kwargs):
         # context logging
@@ -45,66 +48,100 @@ class _StationTextWorker(BaseWorker):
         )
 
         req_handler.format = self.format
-        req = getattr(req_handler, req_method.lower())(self._session)
-
-        self._log_request(req_handler, req_method, logger=logger)
-        resp_status = None
-        try:
-            async with req(**req_kwargs) as resp:
-                resp.raise_for_status()
+        req = self.hedge(
+            getattr(req_handler, req_method.lower())(self._session),
+            req_handler.url,
+        )
 
-                resp_status = resp.status
+        async with self.acquire_task_budget(req_handler.url):
+            self._log_request(req_handler, req_method, logger=logger)
+            resp_status = None
+            latency = None
+            started = time.monotonic()
+            sent_at = time.time()
+            try:
+                async with req(**req_kwargs) as resp:
+                    latency = time.monotonic() - started
+                    resp.raise_for_status()
+
+                    resp_status = resp.status
+                    msg = (
+                        f"Response: {resp.reason}: resp.status={resp_status}, "
+                        f"resp.request_info={resp.request_info}, "
+                        f"resp.url={resp.url}, resp.headers={resp.headers}"
+                    )
+                    if resp_status == 200:
+                        logger.debug(msg)
+                        await self._drain_response(resp)
+
+                    elif resp_status in FDSNWS_NO_CONTENT_CODES:
+                        logger.info(msg)
+                    else:
+                        await self.handle_error(msg=msg, context=context)
+
+            except aiohttp.ClientResponseError as err:
+                resp_status = err.status
                 msg = (
-                    f"Response: {resp.reason}: resp.status={resp_status}, "
-                    f"resp.request_info={resp.request_info}, "
-                    f"resp.url={resp.url}, resp.headers={resp.headers}"
+                    f"Error while executing request: {err.message}: "
+                    f"error={type(err)}, resp.status={resp_status}, "
+                    f"resp.request_info={err.request_info}, "
+                    f"resp.headers={err.headers}"
                 )
-                if resp_status == 200:
-                    logger.debug(msg)
-                    # XXX(damb): Read the entire response into memory
-                    text = await resp.read()
-                    # strip header
-                    data = text[(text.find(b"\n") + 1) :]
-                    if data:
-                        async with self._lock:
-                            await self._drain.drain(data)
 
+                if resp_status == 413:
+                    await self.handle_413()
                 elif resp_status in FDSNWS_NO_CONTENT_CODES:
                     logger.info(msg)
                 else:
                     await self.handle_error(msg=msg, context=context)
 
-        except aiohttp.ClientResponseError as err:
-            resp_status = err.status
-            msg = (
-                f"Error while executing request: {err.message}: "
-                f"error={type(err)}, resp.status={resp_status}, "
-                f"resp.request_info={err.request_info}, "
-                f"resp.headers={err.headers}"
-            )
-
-            if resp_status == 413:
-                await self.handle_413()
-            elif resp_status in FDSNWS_NO_CONTENT_CODES:
-                logger.info(msg)
-            else:
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                resp_status = 503
+                msg = (
+                    f"Error while executing request: error={type(err)}, "
+                    f"req_handler={req_handler!r}, method={req_method}"
+                )
+                if isinstance(err, aiohttp.ClientOSError):
+                    msg += f", errno={err.errno}"
                 await self.handle_error(msg=msg, context=context)
 
-        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
-            resp_status = 503
-            msg = (
-                f"Error while executing request: error={type(err)}, "
-                f"req_handler={req_handler!r}, method={req_method}"
-            )
-            if isinstance(err, aiohttp.ClientOSError):
-                msg += f", errno={err.errno}"
-            await self.handle_error(msg=msg, context=context)
-
-        finally:
-            if resp_status is not None:
-                await self.update_cretry_budget(req_handler.url, resp_status)
-
-            await self.finalize()
+            finally:
+                if resp_status is not None:
+                    await self.update_cretry_budget(
+                        req_handler.url, resp_status, sent_at=sent_at
+                    )
+                    if latency is None:
+                        latency = time.monotonic() - started
+                    self.observe_endpoint(
+                        req_handler.url, latency, resp_status
+                    )
+
+                await self.finalize()
+
+    async def _drain_response(self, resp):
+        """
+        Drain the data of ``resp`` while being received, stripping the header
+        line. Data is drained in chunks made up of complete lines, only, such
+        that lines of concurrent jobs are never interleaved.
+        """
+        # strip header
+        await resp.content.readline()
+
+        buf = bytearray()
+        async for chunk in resp.content.iter_chunked(self._CHUNK_SIZE):
+            buf += chunk
+            end = buf.rfind(b"\n") + 1
+            if not end:
+                continue
+
+            data = bytes(buf[:end])
+            del buf[:end]
+            async with self._lock:
+                await self._drain.drain(data)
+
+        if buf:
+            async with self._lock:
+                await self._drain.drain(bytes(buf))
 
 
 class StationTextRequestProcessor(UnsortedResponse):
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
 import functools
 import pytest
 
@@ -13,6 +14,7 @@ from eidaws.federator.fdsnws_station.text.app import build_parser
 from eidaws.federator.fdsnws_station.text.route import (
     FED_STATION_TEXT_PATH_QUERY,
 )
+from eidaws.federator.utils.coalesce import Flight
 from eidaws.federator.utils.pytest_plugin import (
     eidaws_routing_path_query,
     fdsnws_error_content_type,
@@ -678,3 +680,467 @@ class TestFDSNStationTextServer(
             expected,
             test_cached=True,
         )
+
+    async def test_streamed(
+        self,
+        make_federated_eida,
+        eidaws_routing_path_query,
+        fdsnws_station_text_content_type,
+        load_data,
+    ):
+        mocked_routing = {
+            "localhost": [
+                (
+                    eidaws_routing_path_query,
+                    "GET",
+                    web.Response(
+                        status=200,
+                        text=(
+                            "http://www.orfeus-eu.org/fdsnws/station/1/query\n"
+                            "NL DBN,HGN * BHZ "
+                            "2013-11-10T00:00:00 2013-11-11T00:00:00\n"
+                        ),
+                    ),
+                )
+            ]
+        }
+
+        data = load_data("NL.DBN,HGN..BHZ.2013-11-10.2013-11-11.channel")
+        header, first, second = data.splitlines(keepends=True)
+        received = asyncio.Event()
+
+        async def stream(request):
+            response = web.StreamResponse()
+            await response.prepare(request)
+            # split a line across chunks
+            await response.write(header + first + second[:10])
+            # the first line is received by the client before the endpoint
+            # completes its response
+            await asyncio.wait_for(received.wait(), 5)
+            await response.write(second[10:])
+            await response.write_eof()
+            return response
+
+        mocked_endpoints = {
+            "www.orfeus-eu.org": [(self.PATH_RESOURCE, "GET", stream)]
+        }
+
+        client, faked_routing, faked_endpoints = await make_federated_eida(
+            self.create_app(config_dict=self.get_config())(),
+            mocked_routing_config=mocked_routing,
+            mocked_endpoint_config=mocked_endpoints,
+        )
+
+        params = {
+            "net": "NL",
+            "sta": "DBN,HGN",
+            "cha": "BHZ",
+            "start": "2013-11-10",
+            "end": "2013-11-11",
+            "level": "channel",
+            "format": "text",
+        }
+        resp = await client.get(self.FED_PATH_RESOURCE, params=params)
+        assert resp.status == 200
+        assert resp.headers["Content-Type"] == fdsnws_station_text_content_type
+        assert await resp.content.readline() == header
+        assert await resp.content.readline() == first
+        received.set()
+        assert await resp.read() == second
+
+        faked_routing.assert_no_unused_routes()
+        faked_endpoints.assert_no_unused_routes()
+
+    @pytest.mark.parametrize(
+        "request_coalescing", ["local", "redis"],
+    )
+    async def test_coalesced(
+        self,
+        make_federated_eida,
+        eidaws_routing_path_query,
+        fdsnws_station_text_content_type,
+        load_data,
+        cache_config,
+        request_coalescing,
+    ):
+        # NOTE(damb): Both routing and endpoint responses are mocked once,
+        # only.
+        mocked_routing = {
+            "localhost": [
+                (
+                    eidaws_routing_path_query,
+                    "GET",
+                    web.Response(
+                        status=200,
+                        text=(
+                            "http://www.orfeus-eu.org/fdsnws/station/1/query\n"
+                            "NL * * * "
+                            "2013-11-10T00:00:00 2013-11-11T00:00:00\n"
+                        ),
+                    ),
+                )
+            ]
+        }
+        mocked_endpoints = {
+            "www.orfeus-eu.org": [
+                (
+                    self.PATH_RESOURCE,
+                    "GET",
+                    web.Response(
+                        status=200,
+                        text=load_data(
+                            "NL....2013-11-10.2013-11-11.network",
+                            reader="read_text",
+                        ),
+                    ),
+                )
+            ]
+        }
+
+        config_dict = self.get_config(
+            request_coalescing=request_coalescing, **cache_config
+        )
+        client, faked_routing, faked_endpoints = await make_federated_eida(
+            self.create_app(config_dict=config_dict)(),
+            mocked_routing_config=mocked_routing,
+            mocked_endpoint_config=mocked_endpoints,
+        )
+
+        params = {
+            "net": "NL",
+            "start": "2013-11-10",
+            "end": "2013-11-11",
+            "level": "network",
+            "format": "text",
+        }
+        resps = await asyncio.gather(
+            *[
+                client.get(self.FED_PATH_RESOURCE, params=params)
+                for _ in range(3)
+            ]
+        )
+
+        faked_routing.assert_no_unused_routes()
+        faked_endpoints.assert_no_unused_routes()
+
+        expected = load_data(
+            "NL....2013-11-10.2013-11-11.network", reader="read_text"
+        )
+        for resp in resps:
+            assert resp.status == 200
+            assert (
+                resp.headers["Content-Type"]
+                == fdsnws_station_text_content_type
+            )
+            assert await resp.text() == expected
+
+    @pytest.mark.parametrize(
+        "request_coalescing,cached",
+        [("local", True), ("redis", True), ("local", False)],
+        ids=["local", "redis", "local-not-cached"],
+    )
+    async def test_coalesced_slow_follower(
+        self,
+        make_federated_eida,
+        eidaws_routing_path_query,
+        fdsnws_station_text_content_type,
+        load_data,
+        cache_config,
+        request_coalescing,
+        cached,
+        monkeypatch,
+    ):
+        # NOTE(damb): Both routing and endpoint responses are mocked once,
+        # only.
+        mocked_routing = {
+            "localhost": [
+                (
+                    eidaws_routing_path_query,
+                    "GET",
+                    web.Response(
+                        status=200,
+                        text=(
+                            "http://www.orfeus-eu.org/fdsnws/station/1/query\n"
+                            "NL * * * "
+                            "2013-11-10T00:00:00 2013-11-11T00:00:00\n"
+                        ),
+                    ),
+                )
+            ]
+        }
+        mocked_endpoints = {
+            "www.orfeus-eu.org": [
+                (
+                    self.PATH_RESOURCE,
+                    "GET",
+                    web.Response(
+                        status=200,
+                        text=load_data(
+                            "NL....2013-11-10.2013-11-11.network",
+                            reader="read_text",
+                        ),
+                    ),
+                )
+            ]
+        }
+
+        feed = Flight.feed
+
+        def feed_and_overflow(flight, data, headers=None, detach=True):
+            started = flight.started
+            feed(flight, data, headers=headers, detach=detach)
+            # followers don't keep up with the leader after the first chunk,
+            # i.e. they resume from the cache; if not cached, followers must
+            # not be detached
+            if started and detach:
+                for queue in list(flight._queues):
+                    flight._overflow(queue)
+
+        monkeypatch.setattr(Flight, "feed", feed_and_overflow)
+
+        config_dict = self.get_config(
+            request_coalescing=request_coalescing,
+            **(cache_config if cached else {}),
+        )
+        client, faked_routing, faked_endpoints = await make_federated_eida(
+            self.create_app(config_dict=config_dict)(),
+            mocked_routing_config=mocked_routing,
+            mocked_endpoint_config=mocked_endpoints,
+        )
+
+        params = {
+            "net": "NL",
+            "start": "2013-11-10",
+            "end": "2013-11-11",
+            "level": "network",
+            "format": "text",
+        }
+        resps = await asyncio.gather(
+            *[
+                client.get(self.FED_PATH_RESOURCE, params=params)
+                for _ in range(3)
+            ]
+        )
+
+        faked_routing.assert_no_unused_routes()
+        faked_endpoints.assert_no_unused_routes()
+
+        expected = load_data(
+            "NL....2013-11-10.2013-11-11.network", reader="read_text"
+        )
+        for resp in resps:
+            assert resp.status == 200
+            assert (
+                resp.headers["Content-Type"]
+                == fdsnws_station_text_content_type
+            )
+            assert await resp.text() == expected
+
+    async def test_routing_cached(
+        self,
+        make_federated_eida,
+        eidaws_routing_path_query,
+        fdsnws_station_text_content_type,
+        load_data,
+    ):
+        # routing is mocked once, only
+        mocked_routing = {
+            "localhost": [
+                (
+                    eidaws_routing_path_query,
+                    "GET",
+                    web.Response(
+                        status=200,
+                        text=(
+                            "http://www.orfeus-eu.org/fdsnws/station/1/query\n"
+                            "NL * * * "
+                            "2013-11-10T00:00:00 2013-11-11T00:00:00\n"
+                        ),
+                    ),
+                )
+            ]
+        }
+        mocked_endpoints = {
+            "www.orfeus-eu.org": [
+                (
+                    self.PATH_RESOURCE,
+                    "GET",
+                    web.Response(
+                        status=200,
+                        text=load_data(
+                            "NL....2013-11-10.2013-11-11.network",
+                            reader="read_text",
+                        ),
+                    ),
+                )
+                for _ in range(2)
+            ]
+        }
+
+        config_dict = self.get_config(
+            routing_cache_ttl=60, routing_cache_check_interval=0
+        )
+        client, faked_routing, faked_endpoints = await make_federated_eida(
+            self.create_app(config_dict=config_dict)(),
+            mocked_routing_config=mocked_routing,
+            mocked_endpoint_config=mocked_endpoints,
+        )
+
+        params = {
+            "net": "NL",
+            "start": "2013-11-10",
+            "end": "2013-11-11",
+            "level": "network",
+            "format": "text",
+        }
+        expected = load_data(
+            "NL....2013-11-10.2013-11-11.network", reader="read_text"
+        )
+        for _ in range(2):
+            resp = await client.get(self.FED_PATH_RESOURCE, params=params)
+
+            assert resp.status == 200
+            assert (
+                resp.headers["Content-Type"]
+                == fdsnws_station_text_content_type
+            )
+            assert await resp.text() == expected
+
+        faked_routing.assert_no_unused_routes()
+        faked_endpoints.assert_no_unused_routes()
+
+    async def test_endpoint_concurrency_metrics(
+        self,
+        make_federated_eida,
+        eidaws_routing_path_query,
+        load_data,
+    ):
+        mocked_routing = {
+            "localhost": [
+                (
+                    eidaws_routing_path_query,
+                    "GET",
+                    web.Response(
+                        status=200,
+                        text=(
+                            "http://www.orfeus-eu.org/fdsnws/station/1/query\n"
+                            "NL * * * "
+                            "2013-11-10T00:00:00 2013-11-11T00:00:00\n"
+                        ),
+                    ),
+                )
+            ]
+        }
+        mocked_endpoints = {
+            "www.orfeus-eu.org": [
+                (self.PATH_RESOURCE, "GET", web.Response(status=503))
+            ]
+        }
+
+        config_dict = self.get_config(
+            endpoint_concurrency="aimd", metrics_path="/metrics"
+        )
+        client, faked_routing, faked_endpoints = await make_federated_eida(
+            self.create_app(config_dict=config_dict)(),
+            mocked_routing_config=mocked_routing,
+            mocked_endpoint_config=mocked_endpoints,
+        )
+
+        params = {
+            "net": "NL",
+            "start": "2013-11-10",
+            "end": "2013-11-11",
+            "level": "network",
+            "format": "text",
+        }
+        resp = await client.get(self.FED_PATH_RESOURCE, params=params)
+        assert resp.status == 204
+
+        resp = await client.get("/metrics")
+        assert resp.status == 200
+        stats = (await resp.json())["endpoint_concurrency"]
+        assert stats["www.orfeus-eu.org"] == {
+            "limit": 5,
+            "inflight": 0,
+            "waiting": 0,
+            "successes": 0,
+            "errors": 1,
+            "decreases": 1,
+        }
+
+        faked_routing.assert_no_unused_routes()
+        faked_endpoints.assert_no_unused_routes()
+
+    async def test_task_budget(
+        self,
+        make_federated_eida,
+        eidaws_routing_path_query,
+        load_data,
+    ):
+        mocked_routing = {
+            "localhost": [
+                (
+                    eidaws_routing_path_query,
+                    "GET",
+                    web.Response(
+                        status=200,
+                        text=(
+                            "http://www.orfeus-eu.org/fdsnws/station/1/query\n"
+                            "NL * * * "
+                            "2013-11-10T00:00:00 2013-11-11T00:00:00\n"
+                        ),
+                    ),
+                )
+            ]
+        }
+        mocked_endpoints = {
+            "www.orfeus-eu.org": [
+                (
+                    self.PATH_RESOURCE,
+                    "GET",
+                    web.Response(
+                        status=200,
+                        text=load_data(
+                            "NL....2013-11-10.2013-11-11.network",
+                            reader="read_text",
+                        ),
+                    ),
+                )
+            ]
+        }
+
+        config_dict = self.get_config(
+            task_budget=1,
+            task_budget_per_host=1,
+            task_budget_per_request=1,
+            metrics_path="/metrics",
+        )
+        client, faked_routing, faked_endpoints = await make_federated_eida(
+            self.create_app(config_dict=config_dict)(),
+            mocked_routing_config=mocked_routing,
+            mocked_endpoint_config=mocked_endpoints,
+        )
+
+        params = {
+            "net": "NL",
+            "start": "2013-11-10",
+            "end": "2013-11-11",
+            "level": "network",
+            "format": "text",
+        }
+        resp = await client.get(self.FED_PATH_RESOURCE, params=params)
+        assert resp.status == 200
+        assert await resp.text() == load_data(
+            "NL....2013-11-10.2013-11-11.network", reader="read_text"
+        )
+
+        resp = await client.get("/metrics")
+        assert resp.status == 200
+        assert (await resp.json())["task_budget"] == {
+            "limit": 1,
+            "in_flight": 0,
+            "hosts": {"www.orfeus-eu.org": {"limit": 1, "in_flight": 0}},
+        }
+
+        faked_routing.assert_no_unused_routes()
+        faked_endpoints.assert_no_unused_routes()
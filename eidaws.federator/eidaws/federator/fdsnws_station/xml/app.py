@@ -3,17 +3,60 @@
 import sys
 
 from eidaws.federator.fdsnws_station.xml import SERVICE_ID, create_app
+from eidaws.federator.settings import (
+    FED_DEFAULT_TMPDIR,
+    FED_DEFAULT_BUFFER_ROLLOVER_SIZE,
+    FED_DEFAULT_XML_THREADS,
+)
 from eidaws.federator.utils.app import _main
-from eidaws.federator.utils.cli import build_parser as _build_parser
-from eidaws.utils.cli import InterpolatingYAMLConfigFileParser
+from eidaws.federator.utils.cli import (
+    build_parser as _build_parser,
+    abs_path,
+)
+from eidaws.utils.cli import positive_int, InterpolatingYAMLConfigFileParser
 
 
 def build_parser(config_file_parser_class=InterpolatingYAMLConfigFileParser):
-    return _build_parser(
+    parser = _build_parser(
         SERVICE_ID,
         prog="eida-federator-station-xml",
         config_file_parser_class=config_file_parser_class,
     )
+    parser.add_argument(
+        "--tempdir",
+        dest="tempdir",
+        type=abs_path,
+        default=FED_DEFAULT_TMPDIR,
+        metavar="PATH",
+        help="Absolute path to a temporary directory where buffers are "
+        "stored. If not specified the value is determined as described "
+        "under https://docs.python.org/3/library/tempfile.html#tempfile."
+        "gettempdir.",
+    )
+    parser.add_argument(
+        "--buffer-rollover-size",
+        dest="buffer_rollover_size",
+        type=positive_int,
+        default=FED_DEFAULT_BUFFER_ROLLOVER_SIZE,
+        metavar="BYTES",
+        help="Defines when data is buffered on disk. If 0, data is never "
+        "buffered on disk i.e. buffers are exclusively kept in memory. "
+        "Buffering is using an approach based on spooled temporary files "
+        "(https://docs.python.org/3/library/tempfile.html#tempfile."
+        "SpooledTemporaryFile) (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--xml-threads",
+        dest="xml_threads",
+        metavar="NUM",
+        type=positive_int,
+        default=FED_DEFAULT_XML_THREADS,
+        help="Number of threads StationXML parsing and serialization is "
+        "delegated to, shared by all requests processed. If 0, StationXML "
+        "is processed on the event loop (default: %(default)s).",
+    )
+
+    return parser
 
 
 parser = build_parser()
@@ -1,9 +1,11 @@
 # -*- coding: utf-8 -*-
 
 import asyncio
+import collections
+import contextlib
+import copy
 import datetime
-import hashlib
-import io
+import functools
 
 from lxml import etree
 
@@ -12,6 +14,7 @@ from eidaws.federator.settings import (
     FED_BASE_ID,
     FED_STATION_XML_SERVICE_ID,
 )
+from eidaws.federator.utils.concurrency import make_endpoint_key
 from eidaws.federator.utils.process import (
     group_routes_by,
     UnsortedResponse,
@@ -29,11 +32,47 @@ from eidaws.utils.settings import (
 )
 
 
+class _PendingStations:
+    """
+    Keeps track of the station codes routes pending may return data for.
+    """
+
+    def __init__(self, routes):
+        self._stations = collections.Counter()
+        # number of routes pending with wildcarded station codes
+        self._wildcarded = 0
+
+        for route in routes:
+            self._update(route, 1)
+
+    def _update(self, route, n):
+        stations = {se.stream.station for se in route.stream_epochs}
+        if any("*" in sta or "?" in sta for sta in stations):
+            self._wildcarded += n
+        else:
+            self._stations.update(dict.fromkeys(stations, n))
+
+    def discard(self, route):
+        self._update(route, -1)
+
+    def completed(self, code):
+        """
+        Return whether no route pending may return data for the station
+        ``code``.
+        """
+        return not self._wildcarded and self._stations[code] <= 0
+
+
 class _StationXMLWorker(NetworkLevelMixin, BaseWorker):
     """
     A worker task implementation operating on `StationXML
     <https://www.fdsn.org/xml/station/>`_ ``NetworkType`` ``BaseNodeType``
     element granularity.
+
+    ``<Station></Station>`` elements are streamed as soon as completely
+    merged, i.e. as soon as no more routes pending may return data for them.
+    A single job streams at a time; the remaining jobs spool their data
+    until the lock is released.
     """
 
     SERVICE_ID = FED_STATION_XML_SERVICE_ID
@@ -41,6 +80,20 @@ class _StationXMLWorker(NetworkLevelMixin, BaseWorker):
 
     LOGGER = ".".join([FED_BASE_ID, SERVICE_ID, "worker"])
 
+    _CHUNK_SIZE = 64 * 1024
+
+    # attributes identifying an element (see also :py:meth:`_make_key`)
+    _KEY_ATTRIBUTES = (
+        "code",
+        "locationCode",
+        "startDate",
+        "endDate",
+        "restrictedStatus",
+        "alternateCode",
+        "historicalCode",
+        "sourceID",
+    )
+
     @property
     def level(self):
         return self.query_params["level"]
@@ -62,65 +115,348 @@ class _StationXMLWorker(NetworkLevelMixin, BaseWorker):
 
         logger.debug(f"Fetching data for network: {net!r}")
 
-        # TODO(damb): Currently, limiting the number of concurrent connection
-        # is guaranteed by sharing an aiohttp.TCPConnector instance. Though,
-        # instead of limiting the connection based on a HTTP connection pool it
-        # would be better to limit the overall number of tasks in order to keep
-        # the memory footprint low. -> Create bound number of tasks by means of
-        # globally sharing an task pool. Similar to
-        # https://docs.aiohttp.org/en/stable/client_reference.html#
-        # aiohttp.TCPConnector,
-        # to be able to limit task creation on a) overall and b) on a per host
-        # basis.
-
-        # granular request strategy
-        tasks = [
-            self._fetch(
-                _route,
-                parser_cb=self._parse_response,
-                req_method=req_method,
-                context={"logger_ctx": self.create_job_context(route, _route)},
-                **req_kwargs,
-            )
-            for _route in route
+        # NOTE: The number of fetching tasks in flight is limited by the
+        # application wide task budget (overall, per host and per request;
+        # see eidaws.federator.utils.budget) such that the memory footprint is
+        # bound.
+
+        # the documents of a job are processed by a single thread, only
+        with self._bind_xml_executor() as executor:
+            context["xml_executor"] = executor
+            # closing tag of the element streamed (or spooled)
+            context["tail"] = None
+            context["streaming"] = False
+            # number of responses each element buffered was merged from
+            context["refs"] = collections.Counter()
+
+            # granular request strategy
+            tasks = [
+                self._fetch(
+                    _route,
+                    parser_cb=functools.partial(
+                        self._parse_response, context=context
+                    ),
+                    req_method=req_method,
+                    context={
+                        "logger_ctx": self.create_job_context(route, _route)
+                    },
+                    **req_kwargs,
+                )
+                for _route in route
+            ]
+
+            async with self._create_buffer(
+                self.request.app.get("file_io_executor")
+            ) as spool:
+                context["spool"] = spool
+                try:
+                    pending = _PendingStations(route)
+                    for task in asyncio.as_completed(tasks):
+                        _route, parsed = await task
+                        pending.discard(_route)
+                        if parsed is None:
+                            continue
+
+                        await self._stream(
+                            context, completed=pending.completed
+                        )
+
+                    await self._stream_buffer(context)
+                    if not context["streaming"] and await spool.tell():
+                        async with self._lock:
+                            await self._drain_spool(spool)
+                finally:
+                    if context["streaming"]:
+                        try:
+                            # close the element streamed, if still open
+                            if context["tail"]:
+                                await self._drain.drain(context["tail"])
+                        finally:
+                            self._lock.release()
+
+        await self.finalize()
+
+    async def _acquire_stream(self, context):
+        """
+        Acquire the lock if not held by another job, such that data is
+        streamed rather than spooled. Data spooled so far is drained first.
+        Once streaming, the lock is held until the job is done such that the
+        ``<Network></Network>`` element isn't interleaved with data of other
+        jobs.
+
+        Note, that jobs waiting for the lock hold it while draining their
+        spool, only, i.e. never while fetching.
+        """
+        if context["streaming"] or self._lock.locked():
+            return
+
+        await self._lock.acquire()
+        context["streaming"] = True
+        spool = context["spool"]
+        if await spool.tell():
+            await self._drain_spool(spool)
+
+    async def _write(self, context, data):
+        if context["streaming"]:
+            await self._drain.drain(data)
+        else:
+            await context["spool"].write(data)
+
+    async def _stream(self, context, completed):
+        """
+        Stream the completed ``<Station></Station>`` elements of the first
+        ``<Network></Network>`` epoch element buffered. If the lock is held
+        by another job, the elements are spooled (i.e. serialized to a
+        spooled temporary file), instead.
+
+        :param completed: Callable returning whether no more data is
+            expected for a station code
+        """
+        if self.level == "network" or not context["buffer"]:
+            return
+
+        net_element, sta_elements = next(iter(context["buffer"].values()))
+        keys = [
+            key
+            for key, (sta_element, _) in sta_elements.items()
+            if completed(sta_element.get("code"))
         ]
-        results = await asyncio.gather(*tasks, return_exceptions=False)
+        if not keys:
+            return
 
-        logger.debug(
-            f"Merging StationXML network element (net={net!r}, "
-            f"level={self.level!r}) ..."
-        )
-        for _, station_xml in results:
-            if station_xml is None:
-                continue
+        await self._acquire_stream(context)
+        if context["tail"] is None:
+            head, tail = await self._process_xml(
+                context, self._serialize_element_head, net_element
+            )
+            # the closing tag is written when done
+            context["tail"] = tail
+            await self._write(context, head)
+
+        net_key = next(iter(context["buffer"]))
+        refs = context["refs"]
+        for key in keys:
+            sta_element, cha_elements = sta_elements.pop(key)
+            # completed, i.e. never rolled back
+            refs.pop((net_key, key), None)
+            for cha_key in cha_elements:
+                refs.pop((net_key, key, cha_key), None)
+
+            serialized = await self._process_xml(
+                context, self._serialize_sta_element, sta_element, cha_elements
+            )
+            await self._write(context, serialized)
 
-            for net_element in station_xml.iter(STATIONXML_TAGS_NETWORK):
-                self._merge_net_element(
-                    net_element, level=self.level, context=context
+    async def _stream_buffer(self, context):
+        """
+        Stream (or spool) the ``<Network></Network>`` epoch elements
+        buffered, including the remaining elements of the element already
+        streamed, if any.
+        """
+        await self._acquire_stream(context)
+
+        buffered = iter(context["buffer"].values())
+        if context["tail"] is not None:
+            _, sta_elements = next(buffered)
+            for sta_element in sta_elements.values():
+                serialized = await self._process_xml(
+                    context, self._serialize_sta_element, *sta_element
                 )
+                await self._write(context, serialized)
+
+            await self._write(context, context["tail"])
+            # closed
+            context["tail"] = b""
+
+        for net_element, sta_elements in buffered:
+            serialized = await self._process_xml(
+                context,
+                self._serialize_net_element,
+                net_element,
+                sta_elements,
+            )
+            await self._write(context, serialized)
 
-        for (net_element, sta_elements,) in context["buffer"].values():
-            serialized = self._serialize_net_element(net_element, sta_elements)
-            async with self._lock:
-                await self._drain.drain(serialized)
+    async def _drain_spool(self, spool):
+        """
+        Drain ``spool``. The lock must be held by the caller.
+        """
+        await spool.seek(0)
+        async with spool.chunks(self._CHUNK_SIZE) as chunks:
+            for chunk in chunks:
+                await self._drain.drain(chunk)
 
-        await self.finalize()
+    def _bind_xml_executor(self):
+        executor = self.request.app.get("xml_executor")
+        if executor is None:
+            return contextlib.nullcontext()
+
+        return executor.bind()
 
-    async def _parse_response(self, resp):
+    async def _process_xml(self, context, func, *args):
+        """
+        Call ``func`` processing XML. The call is delegated to the XML
+        executor the job ``context`` refers to is bound to, if configured
+        (see also :py:class:`~eidaws.federator.utils.executor.XMLExecutor`).
+        """
+        executor = context.get("xml_executor")
+        if executor is None:
+            return func(*args)
+
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, func, *args
+        )
+
+    async def _parse_response(self, resp, context):
+        """
+        Parse a StationXML response incrementally while being received.
+        ``<Station></Station>`` and ``<Network></Network>`` elements are
+        deserialized, detached from the document and merged into the job's
+        buffer as soon as completely parsed, such that neither the document
+        nor the response's inventory is kept in memory. Parsing is performed
+        by means of :py:meth:`_process_xml`.
+
+        If the response turns out to be invalid StationXML (or receiving
+        fails), the elements merged from it are rolled back (see also
+        :py:meth:`_rollback`), i.e. responses are merged all or nothing.
+
+        :returns: ``True`` if parsed or ``None`` in case of invalid
+            StationXML
+        """
         if resp is None:
             return None
 
-        ifd = io.BytesIO(await resp.read())
-        # TODO(damb): Check if there is a non-blocking alternative
-        # implementation
+        parser = etree.XMLPullParser(
+            events=("end",),
+            tag=STATIONXML_TAGS_NETWORK + STATIONXML_TAGS_STATION,
+        )
+        # the <Network></Network> element being parsed and its copy
+        # detached
+        current = None
+
+        def parse(data):
+            nonlocal current
+            if data is None:
+                parser.close()
+            else:
+                parser.feed(data)
+
+            parsed = []
+            for _, element in parser.read_events():
+                net_element = element.getparent()
+                if element.tag in STATIONXML_TAGS_STATION:
+                    net_element.remove(element)
+                    if current is None or current[0] is not net_element:
+                        current = (
+                            net_element,
+                            self._copy_net_element(net_element),
+                        )
+
+                    key, sta_element = self._deserialize_sta_element(element)
+                    parsed.append((current[1], {key: sta_element}))
+                    continue
+
+                net_element.remove(element)
+                if current is None or current[0] is not element:
+                    # no <Station></Station> elements
+                    parsed.append((element, {}))
+                current = None
+
+            return parsed
+
+        # paths of the elements merged from the response
+        merged = []
+
+        async def merge(data):
+            for net_element, sta_elements in await self._process_xml(
+                context, parse, data
+            ):
+                paths = self._make_paths(
+                    net_element, sta_elements, self.level
+                )
+                context["refs"].update(paths)
+                merged.extend(paths)
+                self._merge_net_element(
+                    net_element,
+                    sta_elements,
+                    level=self.level,
+                    context=context,
+                )
+
         try:
-            return etree.parse(ifd).getroot()
+            async for data in resp.content.iter_any():
+                await merge(data)
+
+            await merge(None)
         except etree.XMLSyntaxError:
+            self._rollback(merged, context)
             return None
+        except BaseException:
+            self._rollback(merged, context)
+            raise
+
+        return True
+
+    def _make_paths(self, net_element, sta_elements, level):
+        """
+        Return the paths (i.e. tuples of keys) of the elements of a
+        deserialized ``<Network></Network>`` element.
+        """
+        net_key = self._make_key(net_element)
+        retval = [(net_key,)]
+        if level == "network":
+            return retval
+
+        for key, (_, cha_elements) in sta_elements.items():
+            retval.append((net_key, key))
+            if level in ("channel", "response"):
+                retval.extend(
+                    (net_key, key, cha_key) for cha_key in cha_elements
+                )
+
+        return retval
+
+    def _rollback(self, paths, context):
+        """
+        Remove the elements merged from a response from the job's buffer,
+        unless merged from other responses, too.
+
+        :param paths: Paths of the elements merged (see also
+            :py:meth:`_make_paths`)
+        """
+        refs = context["refs"]
+        refs.subtract(paths)
+        buffered = context["buffer"]
+        # children first
+        for path in sorted(set(paths), key=len, reverse=True):
+            if refs[path] > 0:
+                continue
+            del refs[path]
 
-    def _merge_net_element(self, net_element, level, context):
+            net_key, *keys = path
+            try:
+                _, sta_elements = buffered[net_key]
+            except KeyError:
+                continue
+
+            if len(keys) == 2:
+                sta_key, cha_key = keys
+                if sta_key in sta_elements:
+                    sta_elements[sta_key][1].pop(cha_key, None)
+            elif keys:
+                sta_elements.pop(keys[0], None)
+            elif not sta_elements and not (
+                context.get("tail") is not None
+                and net_key == next(iter(buffered))
+            ):
+                # not streamed, yet
+                del buffered[net_key]
+
+    def _merge_net_element(
+        self, net_element, loaded_sta_elements, level, context
+    ):
         """
-        Merge a `StationXML
+        Merge a deserialized `StationXML
         <https://www.fdsn.org/xml/station/fdsn-station-1.0.xsd>`_
         ``<Network></Network>`` element into the internal element tree.
         """
@@ -128,13 +464,8 @@ class _StationXMLWorker(NetworkLevelMixin, BaseWorker):
             # merge <Channel></Channel> elements into
             # <Station></Station> from the correct
             # <Network></Network> epoch element
-            (
-                loaded_net_element,
-                loaded_sta_elements,
-            ) = self._deserialize_net_element(net_element)
-
             loaded_net_element, sta_elements = self._emerge_net_element(
-                loaded_net_element, context
+                net_element, context
             )
 
             # append / merge <Station></Station> elements
@@ -144,20 +475,16 @@ class _StationXMLWorker(NetworkLevelMixin, BaseWorker):
                 except KeyError:
                     sta_elements[key] = loaded_sta_element
                 else:
-                    # XXX(damb): Channels are ALWAYS appended; no merging
-                    # is performed
-                    sta_element[1].extend(loaded_sta_element[1])
+                    # append <Channel></Channel> elements if unknown
+                    cha_elements = sta_element[1]
+                    for cha_key, cha_element in loaded_sta_element[1].items():
+                        cha_elements.setdefault(cha_key, cha_element)
 
         elif level == "station":
             # append <Station></Station> elements to the
             # corresponding <Network></Network> epoch
-            (
-                loaded_net_element,
-                loaded_sta_elements,
-            ) = self._deserialize_net_element(net_element)
-
             loaded_net_element, sta_elements = self._emerge_net_element(
-                loaded_net_element, context
+                net_element, context
             )
 
             # append <Station></Station> elements if
@@ -184,54 +511,77 @@ class _StationXMLWorker(NetworkLevelMixin, BaseWorker):
             self._make_key(net_element), (net_element, {})
         )
 
-    def _deserialize_net_element(self, net_element, hash_method=hashlib.md5):
-        """
-        Deserialize and demultiplex ``net_element``.
+    def _deserialize_sta_element(self, sta_element):
         """
+        Deserialize and demultiplex ``sta_element``, i.e. detach its
+        ``<Channel></Channel>`` elements.
 
-        def emerge_sta_elements(net_element):
-            for tag in STATIONXML_TAGS_STATION:
-                for sta_element in net_element.findall(tag):
-                    yield sta_element
-
-        def emerge_cha_elements(sta_element):
-            for tag in STATIONXML_TAGS_CHANNEL:
-                for cha_element in sta_element.findall(tag):
-                    yield cha_element
-
-        sta_elements = {}
-        for sta_element in emerge_sta_elements(net_element):
-
-            cha_elements = []
-            for cha_element in emerge_cha_elements(sta_element):
+        :returns: Tuple of the key and the deserialized
+            ``<Station></Station>`` element, i.e. the element and its
+            ``<Channel></Channel>`` elements indexed by key
+        """
+        cha_elements = {}
+        for tag in STATIONXML_TAGS_CHANNEL:
+            for cha_element in sta_element.findall(tag):
+                key = self._make_key(cha_element)
+                cha_elements.setdefault(key, cha_element)
+                sta_element.remove(cha_element)
 
-                cha_elements.append(cha_element)
-                cha_element.getparent().remove(cha_element)
+        return self._make_key(sta_element), (sta_element, cha_elements)
 
-            sta_elements[self._make_key(sta_element)] = (
-                sta_element,
-                cha_elements,
-            )
-            sta_element.getparent().remove(sta_element)
+    @staticmethod
+    def _copy_net_element(net_element):
+        """
+        Return a copy of the ``<Network></Network>`` element ``net_element``
+        being parsed, excluding its (partially parsed)
+        ``<Station></Station>`` elements.
+        """
+        copied = copy.deepcopy(net_element)
+        for tag in STATIONXML_TAGS_STATION:
+            for sta_element in copied.findall(tag):
+                copied.remove(sta_element)
 
-        return net_element, sta_elements
+        return copied
 
     def _serialize_net_element(self, net_element, sta_elements={}):
         for sta_element, cha_elements in sta_elements.values():
             # XXX(damb): No deepcopy is performed since the processor is thrown
             # away anyway.
-            sta_element.extend(cha_elements)
+            sta_element.extend(cha_elements.values())
             net_element.append(sta_element)
 
         return etree.tostring(net_element)
 
+    def _serialize_sta_element(self, sta_element, cha_elements={}):
+        sta_element.extend(cha_elements.values())
+        return etree.tostring(sta_element)
+
     @staticmethod
-    def _make_key(element, hash_method=hashlib.md5):
+    def _serialize_element_head(element):
         """
-        Compute hash for ``element`` based on the elements' attributes.
+        Serialize ``element`` split into its head (i.e. the opening tag
+        including the element's children) and its closing tag.
         """
-        key_args = sorted(element.attrib.items())
-        return hash_method(str(key_args).encode("utf-8")).digest()
+        qname = etree.QName(element)
+        tag = qname.localname
+        if element.prefix:
+            tag = f"{element.prefix}:{tag}"
+        tail = f"</{tag}>".encode("utf-8")
+
+        serialized = etree.tostring(element, with_tail=False)
+        if serialized.endswith(tail):
+            return serialized[: -len(tail)], tail
+
+        # empty element
+        return serialized[:-2] + b">", tail
+
+    @classmethod
+    def _make_key(cls, element):
+        """
+        Return the identity key of ``element`` based on the elements'
+        ``BaseNodeType`` (and ``<Channel></Channel>``) attributes.
+        """
+        return tuple(map(element.get, cls._KEY_ATTRIBUTES))
 
 
 class StationXMLRequestProcessor(UnsortedResponse):
@@ -282,7 +632,12 @@ class StationXMLRequestProcessor(UnsortedResponse):
                 f"route={_routes!r}"
             )
             await pool.submit(
-                _routes, net, req_method=req_method, context=ctx, **req_kwargs,
+                _routes,
+                net,
+                req_method=req_method,
+                context=ctx,
+                key=make_endpoint_key(*(r.url for r in _routes)),
+                **req_kwargs,
             )
 
     async def _write_response_footer(self, response):
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Microbenchmark with regard to keying and merging StationXML elements.
+
+Usage::
+
+    $ python -m eidaws.federator.fdsnws_station.xml.tests.benchmark_merge \
+        --stations 5000 --channels 3
+"""
+
+import argparse
+import hashlib
+import timeit
+
+from lxml import etree
+
+from eidaws.federator.fdsnws_station.xml.process import _StationXMLWorker
+from eidaws.utils.settings import (
+    STATIONXML_TAGS_NETWORK,
+    STATIONXML_TAGS_STATION,
+    STATIONXML_TAGS_CHANNEL,
+)
+
+
+STATIONXML_NAMESPACE = "http://www.fdsn.org/xml/station/1"
+
+
+def make_inventory(stations, channels):
+    """
+    Return a StationXML inventory made up of a single network with
+    ``stations`` stations, each of those with ``channels`` channels.
+    """
+
+    def make_channel(i):
+        return (
+            f'<Channel code="HH{i}" locationCode="" '
+            'startDate="2001-01-01T00:00:00" restrictedStatus="open">'
+            "<Latitude>0</Latitude><Longitude>0</Longitude>"
+            "<Elevation>0</Elevation><Depth>0</Depth></Channel>"
+        )
+
+    def make_station(i):
+        return (
+            f'<Station code="S{i:05d}" startDate="2001-01-01T00:00:00" '
+            'restrictedStatus="open">'
+            "<Latitude>0</Latitude><Longitude>0</Longitude>"
+            "<Elevation>0</Elevation><Site><Name>Site</Name></Site>"
+            + "".join(make_channel(j) for j in range(channels))
+            + "</Station>"
+        )
+
+    return (
+        f'<FDSNStationXML xmlns="{STATIONXML_NAMESPACE}" '
+        'schemaVersion="1.1"><Source>Benchmark</Source>'
+        "<Created>2020-01-01T00:00:00</Created>"
+        '<Network code="XX" startDate="2001-01-01T00:00:00" '
+        'restrictedStatus="open">'
+        + "".join(make_station(i) for i in range(stations))
+        + "</Network></FDSNStationXML>"
+    ).encode("utf-8")
+
+
+def make_md5_key(element):
+    """
+    Key previously used, i.e. a MD5 hash over the stringified attributes.
+    """
+    key_args = sorted(element.attrib.items())
+    return hashlib.md5(str(key_args).encode("utf-8")).digest()
+
+
+def deserialize(worker, data):
+    """
+    Deserialize an inventory the same way the worker does.
+    """
+    root = etree.fromstring(data)
+
+    retval = []
+    for net_element in root.iter(*STATIONXML_TAGS_NETWORK):
+        sta_elements = {}
+        children = list(net_element.iterchildren(*STATIONXML_TAGS_STATION))
+        for sta_element in children:
+            key, sta_element = worker._deserialize_sta_element(sta_element)
+            sta_elements[key] = sta_element
+            net_element.remove(sta_element[0])
+
+        retval.append((net_element, sta_elements))
+
+    return retval
+
+
+def merge(worker, inventories, level="channel"):
+    context = {"buffer": {}}
+    for net_elements in inventories:
+        for net_element, sta_elements in net_elements:
+            worker._merge_net_element(
+                net_element, sta_elements, level=level, context=context
+            )
+
+    return context
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--stations", type=int, default=5000)
+    parser.add_argument("--channels", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    worker = _StationXMLWorker.__new__(_StationXMLWorker)
+    data = make_inventory(args.stations, args.channels)
+
+    root = etree.fromstring(data)
+    elements = list(
+        root.iter(*(STATIONXML_TAGS_STATION + STATIONXML_TAGS_CHANNEL))
+    )
+    print(
+        f"Inventory: {args.stations} stations, "
+        f"{len(elements) - args.stations} channels, {len(data)} bytes"
+    )
+
+    for name, make_key in (
+        ("md5", make_md5_key),
+        ("tuple", worker._make_key),
+    ):
+        t = min(
+            timeit.repeat(
+                lambda: [make_key(e) for e in elements],
+                number=1,
+                repeat=args.repeat,
+            )
+        )
+        print(f"Keying ({name}): {t * 1000:.1f}ms")
+
+    def deserialize_and_merge():
+        # two routes returning the same inventory
+        merge(worker, [deserialize(worker, data) for _ in range(2)])
+
+    t = min(timeit.repeat(deserialize_and_merge, number=1, repeat=args.repeat))
+    print(f"Parsing, deserializing and merging (2 inventories): {t:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+StationXML worker related test facilities.
+"""
+
+import aiohttp
+import collections
+import pytest
+
+from lxml import etree
+
+from eidaws.federator.fdsnws_station.xml.process import _StationXMLWorker
+
+
+STATIONXML_NAMESPACE = "http://www.fdsn.org/xml/station/1"
+
+_HEAD = (
+    f'<FDSNStationXML xmlns="{STATIONXML_NAMESPACE}" '
+    'schemaVersion="1.1"><Source>Test</Source>'
+    "<Created>2020-01-01T00:00:00</Created>"
+    '<Network code="XX" startDate="2001-01-01T00:00:00">'
+    "<Description>Network</Description>"
+).encode("utf-8")
+_TAIL = b"</Network></FDSNStationXML>"
+
+
+def _make_station(code):
+    return (
+        f'<Station code="{code}" startDate="2001-01-01T00:00:00">'
+        "<Latitude>0</Latitude><Longitude>0</Longitude>"
+        "<Elevation>0</Elevation>"
+        '<Channel code="HHZ" locationCode="" '
+        'startDate="2001-01-01T00:00:00">'
+        "<Latitude>0</Latitude><Longitude>0</Longitude>"
+        "<Elevation>0</Elevation><Depth>0</Depth></Channel>"
+        "</Station>"
+    ).encode("utf-8")
+
+
+class _Content:
+    def __init__(self, chunks, on_chunk):
+        self._chunks = chunks
+        self._on_chunk = on_chunk
+
+    async def iter_any(self):
+        for i, chunk in enumerate(self._chunks):
+            if isinstance(chunk, Exception):
+                raise chunk
+
+            yield chunk
+            self._on_chunk(i)
+
+
+class _Response:
+    def __init__(self, chunks, on_chunk=lambda i: None):
+        self.content = _Content(chunks, on_chunk)
+
+
+class _Request:
+    def __init__(self):
+        self.app = {}
+
+
+@pytest.fixture
+def worker():
+    worker = _StationXMLWorker.__new__(_StationXMLWorker)
+    worker.request = _Request()
+    worker.query_params = {"level": "station"}
+    return worker
+
+
+@pytest.mark.asyncio
+async def test_parse_response_merged_incrementally(worker):
+    chunks = [
+        _HEAD
+        + _make_station("A")
+        # partially parsed <Station></Station> element
+        + _make_station("B")[:80],
+        _make_station("B")[80:],
+        (
+            "</Network>"
+            '<Network code="YY" startDate="2001-01-01T00:00:00"></Network>'
+            "</FDSNStationXML>"
+        ).encode("utf-8"),
+    ]
+
+    context = _make_context()
+    merged = []
+
+    def on_chunk(i):
+        merged.append(
+            [
+                [sta.get("code") for sta, _ in sta_elements.values()]
+                for _, sta_elements in context["buffer"].values()
+            ]
+        )
+
+    assert await worker._parse_response(
+        _Response(chunks, on_chunk), context
+    )
+
+    # stations are merged as soon as completely parsed
+    assert merged == [[["A"]], [["A", "B"]], [["A", "B"], []]]
+
+    (net_xx, sta_elements), (net_yy, _) = context["buffer"].values()
+    assert net_xx.get("code") == "XX"
+    assert [etree.QName(e).localname for e in net_xx] == ["Description"]
+    for sta_element, cha_elements in sta_elements.values():
+        assert sta_element.getparent() is None
+        assert len(cha_elements) == 1
+    assert net_yy.get("code") == "YY"
+    assert net_yy.getparent() is None
+
+
+def _make_context():
+    return {"buffer": {}, "refs": collections.Counter()}
+
+
+def _codes(context):
+    return {
+        net_element.get("code"): [
+            sta_element.get("code") for sta_element, _ in sta_elements.values()
+        ]
+        for net_element, sta_elements in context["buffer"].values()
+    }
+
+
+@pytest.mark.asyncio
+async def test_parse_response_invalid(worker):
+    context = _make_context()
+    assert (
+        await worker._parse_response(_Response([b"<invalid>"]), context)
+        is None
+    )
+    assert context["buffer"] == {}
+
+    # invalid after elements were merged already
+    chunks = [_HEAD + _make_station("A"), b"</invalid>"]
+    assert await worker._parse_response(_Response(chunks), context) is None
+    assert context["buffer"] == {}
+    assert not +context["refs"]
+
+
+@pytest.mark.asyncio
+async def test_parse_response_truncated(worker):
+    context = _make_context()
+    chunks = [
+        _HEAD + _make_station("A"),
+        aiohttp.ClientPayloadError("Response payload is not completed"),
+    ]
+    with pytest.raises(aiohttp.ClientPayloadError):
+        await worker._parse_response(_Response(chunks), context)
+
+    assert context["buffer"] == {}
+
+
+@pytest.mark.asyncio
+async def test_parse_response_rollback(worker):
+    context = _make_context()
+    assert await worker._parse_response(
+        _Response([_HEAD + _make_station("A") + _TAIL]), context
+    )
+
+    chunks = [
+        _HEAD + _make_station("A") + _make_station("B"),
+        b"</invalid>",
+    ]
+    assert await worker._parse_response(_Response(chunks), context) is None
+
+    # elements merged from valid responses are kept
+    assert _codes(context) == {"XX": ["A"]}
@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
 
+import asyncio
 import functools
 import io
 import pytest
+import re
 
 from aiohttp import web
 from lxml import etree
@@ -428,6 +430,78 @@ class TestFDSNStationXMLServer(
             expected,
         )
 
+    @pytest.mark.parametrize("xml_threads", [0, 2])
+    async def test_single_sncl_level_response_chunked(
+        self,
+        server_config,
+        tester,
+        eidaws_routing_path_query,
+        fdsnws_station_xml_content_type,
+        load_data,
+        xml_threads,
+    ):
+        mocked_routing = {
+            "localhost": [
+                (
+                    eidaws_routing_path_query,
+                    "GET",
+                    web.Response(
+                        status=200,
+                        text=(
+                            "http://www.orfeus-eu.org/fdsnws/station/1/query\n"
+                            "NL HGN -- BHZ 2013-11-10T00:00:00 "
+                            "2013-11-11T00:00:00\n"
+                        ),
+                    ),
+                )
+            ]
+        }
+
+        data = load_data("NL.HGN..BHZ.2013-11-10.2013-11-11.response")
+
+        async def stream(request):
+            # elements span multiple chunks
+            response = web.StreamResponse()
+            await response.prepare(request)
+            for i in range(0, len(data), 64):
+                await response.write(data[i : i + 64])
+            await response.write_eof()
+            return response
+
+        config_dict = server_config(self.get_config, xml_threads=xml_threads)
+        mocked_endpoints = {
+            "www.orfeus-eu.org": [
+                (
+                    self.PATH_RESOURCE,
+                    self.lookup_config("endpoint_request_method", config_dict),
+                    stream,
+                )
+            ]
+        }
+
+        expected = {
+            "status": 200,
+            "content_type": fdsnws_station_xml_content_type,
+            "result": [(1, [(1, 1)])],
+        }
+        await tester(
+            self.FED_PATH_RESOURCE,
+            "GET",
+            {
+                "net": "NL",
+                "sta": "HGN",
+                "cha": "BHZ",
+                "start": "2013-11-10",
+                "end": "2013-11-11",
+                "level": "response",
+                "format": "xml",
+            },
+            self.create_app(config_dict=config_dict),
+            mocked_routing,
+            mocked_endpoints,
+            expected,
+        )
+
     @pytest.mark.parametrize(
         "method,params_or_data",
         [
@@ -528,6 +602,246 @@ class TestFDSNStationXMLServer(
             expected,
         )
 
+    async def test_single_net_single_sta_duplicate_chas(
+        self,
+        server_config,
+        tester,
+        eidaws_routing_path_query,
+        fdsnws_station_xml_content_type,
+        load_data,
+    ):
+        mocked_routing = {
+            "localhost": [
+                (
+                    eidaws_routing_path_query,
+                    "GET",
+                    web.Response(
+                        status=200,
+                        text=(
+                            "http://www.orfeus-eu.org/fdsnws/station/1/query\n"
+                            "NL HGN -- BHZ 2013-11-10T00:00:00 "
+                            "2013-11-10T12:00:00\n"
+                            "NL HGN -- BHZ 2013-11-10T12:00:00 "
+                            "2013-11-11T00:00:00\n"
+                        ),
+                    ),
+                )
+            ]
+        }
+
+        config_dict = server_config(self.get_config)
+        endpoint_request_method = self.lookup_config(
+            "endpoint_request_method", config_dict
+        )
+        # the same channel epoch is returned twice
+        mocked_endpoints = {
+            "www.orfeus-eu.org": [
+                (
+                    self.PATH_RESOURCE,
+                    endpoint_request_method,
+                    web.Response(
+                        status=200,
+                        text=load_data(
+                            "NL.HGN..BHZ.2013-11-10.2013-11-11.channel",
+                            reader="read_text",
+                        ),
+                    ),
+                )
+                for _ in range(2)
+            ]
+        }
+
+        expected = {
+            "status": 200,
+            "content_type": fdsnws_station_xml_content_type,
+            "result": [(1, [(1, 1)])],
+        }
+        await tester(
+            self.FED_PATH_RESOURCE,
+            "GET",
+            {
+                "net": "NL",
+                "sta": "HGN",
+                "cha": "BHZ",
+                "start": "2013-11-10",
+                "end": "2013-11-11",
+                "level": "channel",
+                "format": "xml",
+            },
+            self.create_app(config_dict=config_dict),
+            mocked_routing,
+            mocked_endpoints,
+            expected,
+        )
+
+    async def test_single_net_truncated(
+        self,
+        make_federated_eida,
+        eidaws_routing_path_query,
+        load_data,
+    ):
+        mocked_routing = {
+            "localhost": [
+                (
+                    eidaws_routing_path_query,
+                    "GET",
+                    web.Response(
+                        status=200,
+                        text=(
+                            "http://www.orfeus-eu.org/fdsnws/station/1/query\n"
+                            "NL DBN -- BHZ 2013-11-10T00:00:00 "
+                            "2013-11-11T00:00:00\n"
+                            "NL HGN -- BHZ 2013-11-10T00:00:00 "
+                            "2013-11-11T00:00:00\n"
+                        ),
+                    ),
+                )
+            ]
+        }
+
+        async def handler(request):
+            sta = request.query["station"]
+            body = load_data(f"NL.{sta}..BHZ.2013-11-10.2013-11-11.channel")
+            if sta == "HGN":
+                # truncated after the <Station></Station> element
+                body = body[: body.index(b"</Station>") + len(b"</Station>")]
+
+            return web.Response(status=200, body=body)
+
+        mocked_endpoints = {
+            "www.orfeus-eu.org": [
+                (self.PATH_RESOURCE, "GET", handler),
+                (self.PATH_RESOURCE, "GET", handler),
+            ]
+        }
+
+        client, faked_routing, faked_endpoints = await make_federated_eida(
+            self.create_app(config_dict=self.get_config(pool_size=1))(),
+            mocked_routing_config=mocked_routing,
+            mocked_endpoint_config=mocked_endpoints,
+        )
+
+        params = {
+            "net": "NL",
+            "sta": "DBN,HGN",
+            "cha": "BHZ",
+            "start": "2013-11-10",
+            "end": "2013-11-11",
+            "level": "channel",
+            "format": "xml",
+        }
+        resp = await client.get(self.FED_PATH_RESOURCE, params=params)
+        assert resp.status == 200
+
+        # the data of the truncated response is discarded
+        station_xml = etree.parse(io.BytesIO(await resp.read())).getroot()
+        assert [
+            sta_element.get("code")
+            for sta_element in station_xml.iter(*STATIONXML_TAGS_STATION)
+        ] == ["DBN"]
+
+        faked_routing.assert_no_unused_routes()
+        faked_endpoints.assert_no_unused_routes()
+
+    async def test_multi_net_streamed(
+        self,
+        make_federated_eida,
+        eidaws_routing_path_query,
+        load_data,
+    ):
+        mocked_routing = {
+            "localhost": [
+                (
+                    eidaws_routing_path_query,
+                    "GET",
+                    web.Response(
+                        status=200,
+                        text=(
+                            "http://eida.ethz.ch/fdsnws/station/1/query\n"
+                            "CH HASLI -- BHZ 2013-11-10T00:00:00 "
+                            "2013-11-11T00:00:00\n"
+                            "\n"
+                            "http://www.orfeus-eu.org/fdsnws/station/1/query\n"
+                            "NL DBN -- BHZ 2013-11-10T00:00:00 "
+                            "2013-11-11T00:00:00\n"
+                            "NL HGN -- BHZ 2013-11-10T00:00:00 "
+                            "2013-11-11T00:00:00\n"
+                        ),
+                    ),
+                )
+            ]
+        }
+
+        received = asyncio.Event()
+        served = asyncio.Event()
+
+        async def handler(request):
+            sta = request.query["station"]
+            if sta == "DBN":
+                # the first station is received by the client before the
+                # job's last route completes
+                await asyncio.wait_for(received.wait(), 5)
+                # the job streaming doesn't block fetches of other jobs
+                await asyncio.wait_for(served.wait(), 5)
+                await asyncio.sleep(0.1)
+            elif sta == "HASLI":
+                await asyncio.wait_for(received.wait(), 5)
+                served.set()
+
+            net = "CH" if sta == "HASLI" else "NL"
+            return web.Response(
+                status=200,
+                body=load_data(
+                    f"{net}.{sta}..BHZ.2013-11-10.2013-11-11.channel"
+                ),
+            )
+
+        mocked_endpoints = {
+            "eida.ethz.ch": [(self.PATH_RESOURCE, "GET", handler)],
+            "www.orfeus-eu.org": [
+                (self.PATH_RESOURCE, "GET", handler),
+                (self.PATH_RESOURCE, "GET", handler),
+            ],
+        }
+
+        client, faked_routing, faked_endpoints = await make_federated_eida(
+            self.create_app(config_dict=self.get_config(pool_size=2))(),
+            mocked_routing_config=mocked_routing,
+            mocked_endpoint_config=mocked_endpoints,
+        )
+
+        params = {
+            "net": "CH,NL",
+            "sta": "DBN,HASLI,HGN",
+            "cha": "BHZ",
+            "start": "2013-11-10",
+            "end": "2013-11-11",
+            "level": "channel",
+            "format": "xml",
+        }
+        resp = await client.get(self.FED_PATH_RESOURCE, params=params)
+        assert resp.status == 200
+
+        data = b""
+        while not (
+            re.search(rb"</(\w+:)?Station>", data) or resp.content.at_eof()
+        ):
+            data += await resp.content.readany()
+
+        assert b'code="HGN"' in data
+        received.set()
+        data += await resp.read()
+
+        station_xml = etree.parse(io.BytesIO(data)).getroot()
+        # the data spooled is written once the job streaming is done
+        assert [
+            sta_element.get("code")
+            for sta_element in station_xml.iter(*STATIONXML_TAGS_STATION)
+        ] == ["HGN", "DBN", "HASLI"]
+
+        faked_routing.assert_no_unused_routes()
+        faked_endpoints.assert_no_unused_routes()
+
     @pytest.mark.parametrize(
         "method,params_or_data",
         [
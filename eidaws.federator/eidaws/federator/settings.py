@@ -82,15 +82,31 @@ FED_DEFAULT_PORT = 8080
 FED_DEFAULT_UNIX_PATH = None
 
 FED_DEFAULT_SERVE_STATIC = False
+# Path metrics are served on; None disables serving metrics
+FED_DEFAULT_METRICS_PATH = None
 
 FED_DEFAULT_URL_ROUTING = "http://localhost/eidaws/routing/1/query"
 FED_DEFAULT_ROUTING_CONN_LIMIT = 100
+# In-process routing cache; a TTL of 0 disables the cache
+FED_DEFAULT_ROUTING_CACHE_TTL = 0
+FED_DEFAULT_ROUTING_CACHE_MAXSIZE = 16 * 1024 ** 2  # bytes
+FED_DEFAULT_ROUTING_CACHE_CHECK_INTERVAL = 30
 # NOTE(damb): Current number of EIDA DCs is 12.
 FED_DEFAULT_ENDPOINT_CONN_LIMIT = 120
 FED_DEFAULT_ENDPOINT_CONN_LIMIT_PER_HOST = 10
 FED_DEFAULT_ENDPOINT_TIMEOUT_CONNECT = None
 FED_DEFAULT_ENDPOINT_TIMEOUT_SOCK_CONNECT = 2
 FED_DEFAULT_ENDPOINT_TIMEOUT_SOCK_READ = 30
+# Per endpoint concurrency limiting; one of 'static' or 'aimd'
+FED_DEFAULT_ENDPOINT_CONCURRENCY = "static"
+FED_DEFAULT_ENDPOINT_CONCURRENCY_MIN_LIMIT = 1
+# Time to first byte in seconds considered as congestion signal
+FED_DEFAULT_ENDPOINT_CONCURRENCY_LATENCY_THRESHOLD = 10
+# Hedged endpoint requests; maximum percentage of requests hedged (0
+# disables hedging)
+FED_DEFAULT_HEDGING_BUDGET = 0
+FED_DEFAULT_HEDGING_PERCENTILE = 95
+FED_DEFAULT_HEDGING_MIN_SAMPLES = 20
 FED_DEFAULT_NETLOC_PROXY = None
 FED_DEFAULT_NUM_FORWARDED = 0
 
@@ -100,6 +116,19 @@ FED_DEFAULT_REDIS_POOL_MAXSIZE = 10
 FED_DEFAULT_REDIS_POOL_TIMEOUT = None
 
 FED_DEFAULT_POOL_SIZE = None
+# Task budget limiting the number of endpoint tasks in flight; None disables
+# limiting
+FED_DEFAULT_TASK_BUDGET = None
+FED_DEFAULT_TASK_BUDGET_PER_HOST = None
+FED_DEFAULT_TASK_BUDGET_PER_REQUEST = None
+# Number of threads file I/O (i.e. buffering) is delegated to
+FED_DEFAULT_FILE_IO_THREADS = 4
+# Number of threads XML processing (i.e. parsing and serializing) is delegated
+# to; if 0, XML is processed on the event loop
+FED_DEFAULT_XML_THREADS = 2
+# Interval in seconds the event loop lag is sampled with; None disables
+# sampling
+FED_DEFAULT_EVENT_LOOP_LAG_INTERVAL = 1.0
 
 # Default request method for endpoint requests
 FED_DEFAULT_ENDPOINT_REQUEST_METHOD = "GET"
@@ -110,6 +139,15 @@ FED_DEFAULT_RETRY_BUDGET_CLIENT_THRES = 1.0
 FED_DEFAULT_RETRY_BUDGET_CLIENT_TTL = 3600
 # Rolling window size with respect to response code time series
 FED_DEFAULT_RETRY_BUDGET_WINDOW_SIZE = 10000
+# Response code statistics backend (i.e. either "timeseries" or "counters")
+FED_DEFAULT_RETRY_BUDGET_BACKEND = "timeseries"
+# Time in seconds before an open circuit breaker lets a probe request pass
+FED_DEFAULT_CIRCUIT_BREAKER_RESET_TIMEOUT = 30
+# Interval in seconds circuit breakers are synchronized with Redis
+FED_DEFAULT_CIRCUIT_BREAKER_SYNC_INTERVAL = 5
+# Interval in seconds response code statistics are garbage collected if
+# circuit breakers aren't synchronized
+FED_DEFAULT_CIRCUIT_BREAKER_GC_INTERVAL = 60
 
 # Frontend cache configuration
 # No stream buffering and hence no caching
@@ -130,11 +168,31 @@ FED_DEFAULT_MAX_STREAM_EPOCH_DURATION_TOTAL = None
 # Configuration with respect to temporary file buffers
 FED_DEFAULT_TMPDIR = None
 FED_DEFAULT_BUFFER_ROLLOVER_SIZE = 0  # bytes
+# Size of chunks buffers are flushed with; aligned with the worker's chunk
+# size (e.g. the miniseed record length)
+FED_DEFAULT_BUFFER_FLUSH_SIZE = 256 * 1024  # bytes
 
 FED_DEFAULT_STREAMING_TIMEOUT = 600
 
+# Request coalescing (single-flight); one of 'off', 'local' or 'redis'
+FED_DEFAULT_REQUEST_COALESCING = "off"
+FED_DEFAULT_REQUEST_COALESCING_TIMEOUT = 60
+
 # Default splitting factor for HTTP status code 413 handling
 FED_DEFAULT_SPLITTING_FACTOR = 2
+# Maximum number of stream epochs downloaded concurrently after splitting
+FED_DEFAULT_SPLITTING_CONCURRENCY = 1
+# Time in seconds stream epoch durations learned from HTTP status code 413
+# responses are kept for pre-splitting; if 0, pre-splitting is disabled
+FED_DEFAULT_PRESPLITTING_TTL = 0
 
 # Fallback miniseed record size in case no blockette 1000 was found
 FED_DEFAULT_FALLBACK_MSEED_RECORD_SIZE = 0
+# Number of miniseed records reordered by start time; if 0, records are not
+# reordered
+FED_DEFAULT_MSEED_MERGE_WINDOW = 0
+# Number of miniseed records per request taken into account for
+# deduplication
+FED_DEFAULT_MSEED_DEDUP_INDEX_SIZE = 16384
+# Stream the data of a single job at a time directly to the response
+FED_DEFAULT_PASS_THROUGH = False
@@ -10,10 +10,22 @@ from eidaws.federator.utils.middleware import (
     before_request,
     exception_handling_middleware,
 )
+from eidaws.federator.utils.metrics import setup_metrics
 from eidaws.federator.utils.misc import (
+    setup_circuit_breakers,
     setup_endpoint_http_conn_pool,
+    setup_endpoint_limiters,
+    setup_epoch_duration_model,
+    setup_event_loop_lag_monitor,
+    setup_file_io_executor,
+    setup_flight_registry,
+    setup_hedger,
+    setup_routing_cache,
     setup_routing_http_conn_pool,
     setup_redis,
+    setup_task_budget,
+    setup_transfer_stats,
+    setup_xml_executor,
     setup_response_code_stats,
     setup_cache,
     setup_logger,
@@ -52,7 +64,12 @@ def create_app(service_id, config_dict, setup_routes_callback=None, **kwargs):
     on_startup = [
         functools.partial(setup_redis, service_id),
         functools.partial(setup_response_code_stats, service_id),
+        functools.partial(setup_circuit_breakers, service_id),
         functools.partial(setup_cache, service_id),
+        functools.partial(setup_routing_cache, service_id),
+        functools.partial(setup_task_budget, service_id),
+        functools.partial(setup_epoch_duration_model, service_id),
+        functools.partial(setup_event_loop_lag_monitor, service_id),
     ]
     for fn in on_startup:
         app.on_startup.append(fn)
@@ -80,8 +97,15 @@ def create_app(service_id, config_dict, setup_routes_callback=None, **kwargs):
     setup_parser_error_handler(service_version=__version__)
     setup_keywordparser_error_handler(service_version=__version__)
 
+    setup_metrics(service_id, app)
     setup_endpoint_http_conn_pool(service_id, app)
+    setup_endpoint_limiters(service_id, app)
+    setup_hedger(service_id, app)
     setup_routing_http_conn_pool(service_id, app)
+    setup_flight_registry(service_id, app)
+    setup_file_io_executor(service_id, app)
+    setup_transfer_stats(service_id, app)
+    setup_xml_executor(service_id, app)
 
     return app
 
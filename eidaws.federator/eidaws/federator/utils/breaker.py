@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+Per endpoint circuit breaker facilities.
+
+Circuit breakers implement the per client retry-budget. Their state is kept
+in process memory such that checking whether an endpoint may be requested is
+an *O(1)* operation. The state is periodically synchronized with the response
+code time series stored in Redis (i.e. the error ratio observed by all
+processes sharing the Redis backend). Regardless of synchronizing, the
+response code time series are garbage collected periodically.
+"""
+
+import asyncio
+import collections
+import logging
+import time
+
+import aioredis
+
+from eidaws.federator.settings import FED_BASE_ID
+from eidaws.federator.utils.stats import ResponseCodeTimeSeries
+
+
+logger = logging.getLogger(FED_BASE_ID + ".breaker")
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker with the states *closed* (requests pass), *open*
+    (requests are dropped) and *half-open* (a single probe request is let
+    pass).
+
+    The breaker opens if the error ratio exceeds ``threshold``. The error
+    ratio is the maximum of the error ratio observed locally and the error
+    ratio last synchronized from Redis. After ``reset_timeout`` seconds an
+    open breaker becomes half-open. A successful probe closes the breaker
+    again, while a failed one reopens it. Outcomes of requests sent before
+    the probe was let pass are not taken into account for the probe.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(
+        self, threshold, reset_timeout=30, ttl=3600, window_size=10000
+    ):
+        """
+        :param float threshold: Error ratio in percent before the breaker
+            opens
+        :param float reset_timeout: Time in seconds before an open breaker
+            becomes half-open
+        :param int ttl: Time in seconds response codes are taken into account.
+            If 0, response codes don't expire.
+        :param int window_size: Number of response codes taken into account
+            locally
+        """
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.ttl = ttl
+
+        self.state = self.CLOSED
+        self.opened = 0
+
+        # (timestamp, is_error) tuples
+        self._outcomes = collections.deque()
+        self._window_size = window_size
+        self._num_errors = 0
+        self._remote_error_ratio = 0
+        self._changed_at = 0
+        self._probed_at = None
+
+    @property
+    def error_ratio(self):
+        """
+        Error ratio in percent.
+        """
+        self._evict(time.time())
+        local = 0
+        if self._outcomes:
+            local = self._num_errors / len(self._outcomes)
+
+        return 100 * max(local, self._remote_error_ratio)
+
+    @property
+    def closed_since(self):
+        """
+        Time the breaker was closed at last. ``None`` if the breaker isn't
+        closed.
+        """
+        if self.state != self.CLOSED:
+            return None
+        return self._changed_at
+
+    def allow(self):
+        """
+        Return whether a request may be issued.
+        """
+        now = time.time()
+        if self.state == self.CLOSED:
+            if self.error_ratio > self.threshold:
+                self._open(now)
+                return False
+            return True
+
+        if self.state == self.OPEN:
+            if now - self._changed_at < self.reset_timeout:
+                return False
+            self.state = self.HALF_OPEN
+
+        # half-open: let a single probe pass; the probe is repeated if it
+        # didn't report an outcome within the reset timeout
+        if (
+            self._probed_at is not None
+            and now - self._probed_at < self.reset_timeout
+        ):
+            return False
+
+        self._probed_at = now
+        return True
+
+    def record(self, code, sent_at=None):
+        """
+        Record the response code ``code``.
+
+        :param float sent_at: Time the request was sent at. If ``None`` the
+            request is assumed to be sent after the probe was let pass.
+        """
+        now = time.time()
+        is_error = int(code) in ResponseCodeTimeSeries.ERROR_CODES
+
+        if self.state == self.HALF_OPEN and self._probed_at is not None:
+            if sent_at is not None and sent_at < self._probed_at:
+                # not the outcome of the probe
+                return
+
+            if is_error:
+                self._open(now)
+            else:
+                self._close(now)
+            return
+
+        if len(self._outcomes) >= self._window_size:
+            self._num_errors -= self._outcomes.popleft()[1]
+        self._outcomes.append((now, is_error))
+        self._num_errors += is_error
+
+        if self.state == self.CLOSED and self.error_ratio > self.threshold:
+            self._open(now)
+
+    def sync(self, error_ratio):
+        """
+        Synchronize the breaker with the error ratio ``error_ratio`` (values
+        between ``0`` and ``1``) observed globally.
+        """
+        self._remote_error_ratio = error_ratio
+
+    def _open(self, now):
+        if self.state != self.OPEN:
+            self.opened += 1
+        self.state = self.OPEN
+        self._changed_at = now
+        self._probed_at = None
+
+    def _close(self, now):
+        self.state = self.CLOSED
+        self._changed_at = now
+        self._probed_at = None
+        self._outcomes.clear()
+        self._num_errors = 0
+        self._remote_error_ratio = 0
+
+    def _evict(self, now):
+        if not self.ttl:
+            return
+
+        thres = now - self.ttl
+        while self._outcomes and self._outcomes[0][0] < thres:
+            self._num_errors -= self._outcomes.popleft()[1]
+
+    def stats(self):
+        return {
+            "state": self.state,
+            "error_ratio": self.error_ratio,
+            "opened": self.opened,
+        }
+
+
+class CircuitBreakers:
+    """
+    Registry of per endpoint URL :py:class:`CircuitBreaker` objects.
+    """
+
+    def __init__(self, threshold, **kwargs):
+        """
+        :param float threshold: Error ratio in percent before a breaker opens
+
+        Additional keyword arguments are passed to
+        :py:class:`CircuitBreaker`.
+        """
+        self.threshold = threshold
+        self._kwargs = kwargs
+        self._breakers = {}
+
+    def __len__(self):
+        return len(self._breakers)
+
+    def __contains__(self, url):
+        return url in self._breakers
+
+    def get(self, url):
+        try:
+            return self._breakers[url]
+        except KeyError:
+            breaker = CircuitBreaker(self.threshold, **self._kwargs)
+            self._breakers[url] = breaker
+            return breaker
+
+    def allow(self, url):
+        return self.get(url).allow()
+
+    def record(self, url, code, sent_at=None):
+        self.get(url).record(code, sent_at=sent_at)
+
+    def stats(self):
+        return {url: b.stats() for url, b in self._breakers.items()}
+
+    async def sync(self, stats):
+        """
+        Synchronize the circuit breakers with the response code time series
+        stored in Redis.
+
+        :param stats: Response code statistics
+        :type stats:
+            :py:class:`~eidaws.federator.utils.stats.ResponseCodeStats`
+        """
+        for url, breaker in list(self._breakers.items()):
+            # responses received before the breaker was closed are ignored
+            since = breaker.closed_since
+            error_ratio = await stats.get_error_ratio(url, since=since)
+            # discard outdated results
+            if breaker.closed_since == since:
+                breaker.sync(error_ratio)
+
+    async def gc(self, stats):
+        """
+        Garbage collect the response code time series of the circuit
+        breakers registered.
+
+        :param stats: Response code statistics
+        :type stats:
+            :py:class:`~eidaws.federator.utils.stats.ResponseCodeStats`
+        """
+        for url in list(self._breakers):
+            await stats.gc(url)
+
+    async def watch(self, stats, interval, sync=True):
+        """
+        Periodically garbage collect the response code time series and
+        synchronize the circuit breakers.
+
+        :param float interval: Interval in seconds
+        :param bool sync: Whether to synchronize the circuit breakers. If
+            ``False`` the response code time series are garbage collected,
+            only.
+        """
+        while True:
+            try:
+                await self.gc(stats)
+                if sync:
+                    await self.sync(stats)
+            except (
+                OSError,
+                aioredis.RedisError,
+                asyncio.TimeoutError,
+            ) as err:
+                logger.warning(
+                    f"Error while synchronizing circuit breakers: "
+                    f"{type(err)}: {err}"
+                )
+            await asyncio.sleep(interval)
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+Task budget facilities.
+
+The task budget limits the number of endpoint tasks (i.e. endpoint requests
+including their buffers) in flight. Budgets are organized hierarchically: a
+task acquires a slot from the per request budget, the per endpoint host budget
+and the application wide (global) budget, in that order. Hence, the memory
+footprint is bound independently from the number of requests processed
+concurrently.
+"""
+
+import asyncio
+import contextlib
+
+from eidaws.federator.utils.concurrency import make_endpoint_key
+
+
+class _Budget:
+    """
+    Counting semaphore keeping track of the slots in use.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.in_flight = 0
+
+        self._sem = asyncio.Semaphore(limit)
+
+    async def acquire(self):
+        await self._sem.acquire()
+        self.in_flight += 1
+
+    async def acquire_nowait(self):
+        """
+        Acquire a slot without waiting.
+
+        :returns: Whether a slot was acquired.
+        """
+        if self._sem.locked():
+            return False
+
+        await self.acquire()
+        return True
+
+    def release(self):
+        self.in_flight -= 1
+        self._sem.release()
+
+    def stats(self):
+        return {"limit": self.limit, "in_flight": self.in_flight}
+
+
+class TaskBudget:
+    """
+    Application wide task budget.
+    """
+
+    def __init__(
+        self, limit=None, limit_per_host=None, limit_per_request=None
+    ):
+        """
+        :param limit: Overall maximum number of tasks in flight. If ``None``
+            the number of tasks is not limited.
+        :param limit_per_host: Maximum number of tasks in flight per endpoint
+            host. If ``None`` the number of tasks is not limited.
+        :param limit_per_request: Maximum number of tasks in flight per
+            request. If ``None`` the number of tasks is not limited.
+        """
+        self.limit_per_host = limit_per_host
+        self.limit_per_request = limit_per_request
+
+        self._budget = None if limit is None else _Budget(limit)
+        self._host_budgets = {}
+
+    def make_request_budget(self):
+        """
+        Create a :py:class:`RequestTaskBudget` for a request.
+        """
+        return RequestTaskBudget(self, limit=self.limit_per_request)
+
+    @contextlib.asynccontextmanager
+    async def acquire(self, url, request_budget=None):
+        """
+        Asynchronous context manager acquiring a slot for a task requesting
+        ``url``.
+
+        :param request_budget: Per request budget to acquire a slot from
+            first
+        :type request_budget: :py:class:`_Budget`
+        """
+        budgets = [
+            b
+            for b in (
+                request_budget,
+                self._get_host_budget(make_endpoint_key(url)),
+                self._budget,
+            )
+            if b is not None
+        ]
+
+        acquired = []
+        try:
+            for b in budgets:
+                await b.acquire()
+                acquired.append(b)
+
+            yield
+        finally:
+            for b in reversed(acquired):
+                b.release()
+
+    @contextlib.asynccontextmanager
+    async def acquire_nowait(self, url, request_budget=None):
+        """
+        Asynchronous context manager acquiring a slot for a task requesting ``url``
+        without waiting. Yields whether a slot was acquired.
+
+        :param request_budget: Per request budget to acquire a slot from
+            first
+        :type request_budget: :py:class:`_Budget`
+        """
+        budgets = [
+            b
+            for b in (
+                request_budget,
+                self._get_host_budget(make_endpoint_key(url)),
+                self._budget,
+            )
+            if b is not None
+        ]
+
+        acquired = []
+        try:
+            for b in budgets:
+                if not await b.acquire_nowait():
+                    break
+                acquired.append(b)
+
+            yield len(acquired) == len(budgets)
+        finally:
+            for b in reversed(acquired):
+                b.release()
+
+    def stats(self):
+        stats = {}
+        if self._budget is not None:
+            stats = self._budget.stats()
+        if self._host_budgets:
+            stats["hosts"] = {
+                host: b.stats() for host, b in self._host_budgets.items()
+            }
+        return stats
+
+    def _get_host_budget(self, host):
+        if self.limit_per_host is None or host is None:
+            return None
+
+        try:
+            return self._host_budgets[host]
+        except KeyError:
+            b = _Budget(self.limit_per_host)
+            self._host_budgets[host] = b
+            return b
+
+
+class RequestTaskBudget:
+    """
+    Per request task budget.
+    """
+
+    def __init__(self, task_budget, limit=None):
+        self._task_budget = task_budget
+        self._budget = None if limit is None else _Budget(limit)
+
+    def acquire(self, url):
+        """
+        Asynchronous context manager acquiring a slot for a task requesting
+        ``url`` from the budget hierarchy.
+        """
+        return self._task_budget.acquire(url, request_budget=self._budget)
+
+    def acquire_nowait(self, url):
+        """
+        Asynchronous context manager acquiring a slot for a task requesting
+        ``url`` from the budget hierarchy without waiting.
+        """
+        return self._task_budget.acquire_nowait(
+            url, request_budget=self._budget
+        )
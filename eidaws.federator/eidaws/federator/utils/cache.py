@@ -9,8 +9,12 @@ The module provides a similar functionality as implemented by `pallets/cachelib
 
 import abc
 import aioredis
+import collections
 import gzip
 import string
+import time
+import uuid
+import zlib
 
 from eidaws.utils.error import ErrorWithTraceback
 
@@ -26,6 +30,161 @@ class CacheError(ErrorWithTraceback):
 
 
 # -----------------------------------------------------------------------------
+class CacheWriter:
+    """
+    Base class for streaming cache writer implementations. A writer
+    incrementally collects a value to be cached. The value does not become
+    visible within the cache before :py:meth:`commit` is called.
+
+    The base implementation doesn't cache anything.
+    """
+
+    def __init__(self, key, timeout=None, max_size=None):
+        """
+        :param key: The key to be set
+        :param timeout: The cache timeout for the key in seconds
+        :param max_size: Maximum (uncompressed) size in bytes of the value to
+            be cached. If the limit is exceeded writing is aborted. If
+            ``None`` the size is not limited.
+        """
+        self.key = key
+        self.timeout = timeout
+
+        self._max_size = max_size
+        self._size = 0
+        self._aborted = False
+
+    @property
+    def aborted(self):
+        return self._aborted
+
+    @property
+    def size(self):
+        """
+        Number of (uncompressed) bytes written.
+        """
+        return self._size
+
+    async def write(self, data):
+        """
+        Append ``data`` to the value to be cached. Writing is silently
+        aborted in case the configured maximum size is exceeded.
+
+        :param bytes data: Data to be written
+        """
+        if self._aborted:
+            return
+
+        self._size += len(data)
+        if self._max_size and self._size > self._max_size:
+            await self.abort()
+            return
+
+        await self._write(data)
+
+    async def commit(self):
+        """
+        Make the value written visible within the cache.
+
+        :returns: ``True`` if the key has been updated else ``False``.
+        :rtype: boolean
+        """
+        return not self._aborted
+
+    async def abort(self):
+        """
+        Abort writing and discard the data already written.
+        """
+        self._aborted = True
+
+    async def _write(self, data):
+        """
+        Template coro.
+        """
+
+
+class CacheReader:
+    """
+    Base class for streaming cache reader implementations. A reader returns a
+    cached value chunk by chunk. Iterating over a reader yields chunks until
+    the value is exhausted.
+    """
+
+    # maximum size in bytes of decompressed chunks
+    MAX_CHUNK_SIZE = 1024 ** 2
+
+    def __init__(self, key, size=None, decompress=False):
+        """
+        :param key: The key to be read
+        :param size: Size in bytes of the (serialized) value
+        :param bool decompress: Decompress the value while reading
+        """
+        self.key = key
+        self.size = size
+
+        self._decompressobj = (
+            zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+            if decompress
+            else None
+        )
+        self._eof = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        chunk = await self.read()
+        if not chunk:
+            raise StopAsyncIteration
+        return chunk
+
+    async def read(self):
+        """
+        Return the next chunk of the cached value. At EOF ``b""`` is
+        returned.
+        """
+        while not self._eof:
+            if self._decompressobj is None:
+                chunk = await self._read()
+                if not chunk:
+                    self._eof = True
+                return chunk
+
+            data = self._decompressobj.unconsumed_tail
+            if not data:
+                data = await self._read()
+                if not data:
+                    self._eof = True
+                    return self._decompressobj.flush()
+
+            chunk = self._decompressobj.decompress(data, self.MAX_CHUNK_SIZE)
+            if chunk:
+                return chunk
+
+        return b""
+
+    async def _read(self):
+        """
+        Template coro returning the next chunk of the serialized value. At EOF
+        ``b""`` must be returned.
+        """
+        return b""
+
+
+class BytesCacheReader(CacheReader):
+    """
+    Cache reader for values already loaded into memory.
+    """
+
+    def __init__(self, key, value, decompress=False):
+        super().__init__(key, size=len(value), decompress=decompress)
+        self._value = value
+
+    async def _read(self):
+        value, self._value = self._value, b""
+        return value
+
+
 class CachingBackend(abc.ABC):
     """
     Base class for cache backend implementations.
@@ -83,11 +242,40 @@ class CachingBackend(abc.ABC):
 
         return True
 
+    def writer(self, key, timeout=None, **kwargs):
+        """
+        Return a :py:class:`CacheWriter` object allowing a value to be
+        incrementally written to the cache.
+
+        :param key: The key to be set
+        :param timeout: The cache timeout for the key in seconds. If not
+            specified the default timeout is used.
+        """
+        return CacheWriter(key, timeout=self._normalize_timeout(timeout))
+
+    async def reader(self, key, **kwargs):
+        """
+        Look up ``key`` in the cache and return a :py:class:`CacheReader`
+        object allowing the value to be read chunk by chunk.
+
+        :param key: The key to be looked up
+        :returns: A reader if the key exists, else ``None``.
+        """
+        return None
+
     async def close(self):
         """
         Gracefully shutdown a caching backend.
         """
 
+    def stats(self):
+        """
+        Return per tier cache statistics.
+
+        :rtype: dict
+        """
+        return {}
+
     @abc.abstractmethod
     async def exists(self, key):
         """
@@ -116,21 +304,225 @@ class NullCache(CachingBackend):
         pass
 
 
+class RedisCacheWriter(CacheWriter):
+    """
+    Streaming cache writer for :py:class:`RedisCache`.
+
+    Data is compressed incrementally and written to Redis in segments of
+    ``segment_size`` bytes. Each segment is stored under a separate key. When
+    committing, a manifest (i.e. a Redis hash) referencing the segments is
+    stored under the cache key. Segment keys are unique per writer such that
+    concurrent writers of the same cache key don't interfere.
+    """
+
+    # Segments outlive their manifest such that readers are able to
+    # complete reading an entry which is just about to expire.
+    SEGMENT_TTL_GRACE = 60
+
+    def __init__(
+        self,
+        redis,
+        key,
+        timeout=None,
+        max_size=None,
+        segment_size=None,
+        compress=True,
+    ):
+        super().__init__(key, timeout=timeout, max_size=max_size)
+
+        self.redis = redis
+
+        self._id = uuid.uuid4().hex
+        self._segment_size = segment_size or RedisCache.DEFAULT_SEGMENT_SIZE
+        self._compressobj = (
+            zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compress else None
+        )
+
+        self._buf = bytearray()
+        self._num_segments = 0
+        self._num_bytes_stored = 0
+
+    @property
+    def _segment_ttl(self):
+        return self.timeout + self.SEGMENT_TTL_GRACE if self.timeout else 0
+
+    async def commit(self):
+        if self._aborted:
+            return False
+
+        if self._compressobj is not None:
+            self._buf += self._compressobj.flush()
+        if self._buf:
+            await self._write_segment(bytes(self._buf))
+            self._buf.clear()
+
+        if self.timeout and self._num_segments:
+            # segments written at the beginning of a long lasting stream
+            # would expire before the manifest, otherwise
+            tr = self.redis.multi_exec()
+            for i in range(self._num_segments):
+                tr.expire(
+                    RedisCache._make_segment_key(self.key, self._id, i),
+                    self._segment_ttl,
+                )
+            if not all(await tr.execute()):
+                # segments expired already
+                await self.abort()
+                return False
+
+        try:
+            old_manifest = await self.redis.hgetall(self.key)
+        except aioredis.ReplyError as err:
+            if not RedisCache._is_wrongtype_error(err):
+                raise
+            # replace an entry which was not written segmented
+            old_manifest = None
+
+        tr = self.redis.multi_exec()
+        tr.delete(self.key)
+        tr.hmset_dict(
+            self.key,
+            {
+                "id": self._id,
+                "segments": self._num_segments,
+                "size": self._num_bytes_stored,
+            },
+        )
+        if self.timeout:
+            tr.expire(self.key, self.timeout)
+        await tr.execute()
+
+        # let segments of a replaced entry expire
+        if old_manifest:
+            await RedisCache._expire_segments(
+                self.redis, self.key, old_manifest, self.SEGMENT_TTL_GRACE
+            )
+
+        return True
+
+    async def abort(self):
+        if self._aborted:
+            return
+
+        await super().abort()
+        self._buf.clear()
+        self._compressobj = None
+
+        if self._num_segments:
+            await self.redis.delete(
+                *[
+                    RedisCache._make_segment_key(self.key, self._id, i)
+                    for i in range(self._num_segments)
+                ]
+            )
+
+    async def _write(self, data):
+        if self._compressobj is not None:
+            data = self._compressobj.compress(data)
+
+        self._buf += data
+        while len(self._buf) >= self._segment_size:
+            await self._write_segment(bytes(self._buf[: self._segment_size]))
+            del self._buf[: self._segment_size]
+
+    async def _write_segment(self, segment):
+        key = RedisCache._make_segment_key(
+            self.key, self._id, self._num_segments
+        )
+        await self.redis.set(key, segment, expire=self._segment_ttl)
+
+        self._num_segments += 1
+        self._num_bytes_stored += len(segment)
+
+
+class RedisCacheReader(CacheReader):
+    """
+    Streaming cache reader for :py:class:`RedisCache`.
+
+    Segmented entries are read segment by segment. Entries stored as a whole
+    are read by means of Redis ``GETRANGE`` in chunks of ``chunk_size``
+    bytes.
+    """
+
+    def __init__(
+        self,
+        redis,
+        key,
+        size,
+        segment_keys=None,
+        chunk_size=None,
+        decompress=False,
+    ):
+        super().__init__(key, size=size, decompress=decompress)
+
+        self.redis = redis
+
+        self._segment_keys = segment_keys
+        self._chunk_size = chunk_size or RedisCache.DEFAULT_SEGMENT_SIZE
+        self._idx = 0
+        self._offset = 0
+
+    async def _read(self):
+        if self._segment_keys is not None:
+            if self._idx >= len(self._segment_keys):
+                return b""
+
+            segment = await self.redis.get(self._segment_keys[self._idx])
+            if segment is None:
+                raise CacheError(f"Missing segment (key={self.key!r}).")
+
+            self._idx += 1
+            return segment
+
+        if self._offset >= self.size:
+            return b""
+
+        chunk = await self.redis.getrange(
+            self.key, self._offset, self._offset + self._chunk_size - 1
+        )
+        if not chunk:
+            raise CacheError(f"Incomplete value (key={self.key!r}).")
+
+        self._offset += len(chunk)
+        return chunk
+
+
 class RedisCache(CachingBackend):
     """
     Implementation of a `Redis <https://redis.io/>`_ caching backend.
+
+    Values are either stored as a whole under the cache key (see
+    :py:meth:`set`) or segmented (see :py:meth:`writer`).
     """
 
+    DEFAULT_SEGMENT_SIZE = 512 * 1024  # bytes
+
     @classmethod
     async def create(
-        cls, url, default_timeout=300, compress=True, key_prefix=None, **kwargs
+        cls,
+        url,
+        default_timeout=300,
+        compress=True,
+        key_prefix=None,
+        segment_size=DEFAULT_SEGMENT_SIZE,
+        max_entry_size=None,
+        **kwargs,
     ):
+        """
+        :param int segment_size: Size in bytes of segments when writing
+            values by means of a :py:class:`RedisCacheWriter`
+        :param int max_entry_size: Maximum (uncompressed) size in bytes of
+            values written by means of a :py:class:`RedisCacheWriter`. If
+            ``None`` the size is not limited.
+        """
         self = cls()
         super(cls, self)._init(default_timeout)
         self.key_prefix = key_prefix or ""
         self.redis = await aioredis.create_redis_pool(url, **kwargs)
 
         self._compress = compress
+        self._segment_size = segment_size
+        self._max_entry_size = max_entry_size
 
         return self
 
@@ -140,12 +532,27 @@ class RedisCache(CachingBackend):
         return self.key_prefix()
 
     async def get(self, key, **kwargs):
-        return self._deserialize(
-            await self.redis.get(self._create_key_prefix() + key), **kwargs
-        )
+        key = self._create_key_prefix() + key
+        try:
+            value = await self.redis.get(key)
+        except aioredis.ReplyError as err:
+            if not self._is_wrongtype_error(err):
+                raise
+            value = await self._get_segmented(key)
+
+        return self._deserialize(value, **kwargs)
 
     async def delete(self, key):
-        return await self.redis.delete(self._create_key_prefix() + key)
+        key = self._create_key_prefix() + key
+        try:
+            manifest = await self.redis.hgetall(key)
+        except aioredis.ReplyError as err:
+            if not self._is_wrongtype_error(err):
+                raise
+        else:
+            await self._expire_segments(self.redis, key, manifest)
+
+        return await self.redis.delete(key)
 
     async def set(self, key, value, timeout=None, **kwargs):
         key = self._create_key_prefix() + key
@@ -154,6 +561,54 @@ class RedisCache(CachingBackend):
         timeout = self._normalize_timeout(timeout)
         return await self.redis.set(key, value, expire=timeout)
 
+    def writer(self, key, timeout=None, max_size=None, **kwargs):
+        """
+        :param max_size: Maximum (uncompressed) size in bytes of the value to
+            be cached. If not specified the backend's ``max_entry_size`` is
+            used.
+        """
+        return RedisCacheWriter(
+            self.redis,
+            self._create_key_prefix() + key,
+            timeout=self._normalize_timeout(timeout),
+            max_size=max_size or self._max_entry_size,
+            segment_size=self._segment_size,
+            compress=self._compress,
+        )
+
+    async def reader(self, key, decompress=None, **kwargs):
+        key = self._create_key_prefix() + key
+        decompress = self._compress if decompress is None else bool(decompress)
+
+        try:
+            manifest = await self.redis.hgetall(key)
+        except aioredis.ReplyError as err:
+            if not self._is_wrongtype_error(err):
+                raise
+
+            size = await self.redis.strlen(key)
+            if not size:
+                return None
+
+            return RedisCacheReader(
+                self.redis,
+                key,
+                size=size,
+                chunk_size=self._segment_size,
+                decompress=decompress,
+            )
+
+        if not manifest:
+            return None
+
+        return RedisCacheReader(
+            self.redis,
+            key,
+            size=int(manifest[b"size"]),
+            segment_keys=self._make_segment_keys(key, manifest),
+            decompress=decompress,
+        )
+
     async def exists(self, key):
         return await self.redis.exists(self._create_key_prefix() + key)
 
@@ -186,9 +641,381 @@ class RedisCache(CachingBackend):
 
         return value
 
+    async def _get_segmented(self, key):
+        manifest = await self.redis.hgetall(key)
+        if not manifest:
+            return None
+
+        keys = self._make_segment_keys(key, manifest)
+        if not keys:
+            return b""
+
+        segments = await self.redis.mget(*keys)
+        if None in segments:
+            # segments already expired
+            return None
+
+        return b"".join(segments)
+
+    @classmethod
+    async def _expire_segments(cls, redis, key, manifest, timeout=0):
+        """
+        Expire the segments referenced by ``manifest``. If ``timeout`` is
+        ``0`` segments are deleted immediately.
+        """
+        keys = cls._make_segment_keys(key, manifest)
+        if not keys:
+            return
+
+        if not timeout:
+            await redis.delete(*keys)
+            return
+
+        tr = redis.multi_exec()
+        for k in keys:
+            tr.expire(k, timeout)
+        await tr.execute()
+
+    @classmethod
+    def _make_segment_keys(cls, key, manifest):
+        if not manifest:
+            return []
+
+        _id = manifest[b"id"].decode("utf-8")
+        return [
+            cls._make_segment_key(key, _id, i)
+            for i in range(int(manifest[b"segments"]))
+        ]
+
+    @staticmethod
+    def _make_segment_key(key, _id, num):
+        return f"{key}:{_id}:{num}"
+
+    @staticmethod
+    def _is_wrongtype_error(err):
+        # segmented entries are stored as Redis hash
+        return str(err).startswith("WRONGTYPE")
+
+
+class LRUCache:
+    """
+    Bounded in-memory LRU cache. The size of the cache is limited by the total
+    number of bytes of the values stored. Entries optionally expire.
+    """
+
+    def __init__(self, maxsize, max_entry_size=None):
+        """
+        :param int maxsize: Maximum total size in bytes of the values stored
+        :param max_entry_size: Maximum size in bytes of a single value. If
+            ``None`` the size of a value is limited by ``maxsize``, only.
+        """
+        self._maxsize = maxsize
+        self._max_entry_size = max_entry_size or maxsize
+
+        # key: (value, expires)
+        self._entries = collections.OrderedDict()
+        self._size = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return self._lookup(key) is not None
+
+    @property
+    def size(self):
+        return self._size
+
+    def fits(self, size):
+        return size <= min(self._max_entry_size, self._maxsize)
+
+    def get(self, key):
+        value = self._lookup(key)
+        if value is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key, value, timeout=None):
+        """
+        Add a new ``key: value``. The value is not stored in case it is too
+        large.
+
+        :param timeout: Timeout in seconds. If ``None`` or ``0`` the entry
+            does not expire.
+        :returns: Whether the value was stored.
+        :rtype: boolean
+        """
+        self.delete(key)
+        if not self.fits(len(value)):
+            return False
+
+        expires = time.monotonic() + timeout if timeout else None
+        self._entries[key] = (value, expires)
+        self._size += len(value)
+
+        while self._size > self._maxsize:
+            _, (v, _) = self._entries.popitem(last=False)
+            self._size -= len(v)
+            self.evictions += 1
+
+        return True
+
+    def delete(self, key):
+        try:
+            value, _ = self._entries.pop(key)
+        except KeyError:
+            return False
+
+        self._size -= len(value)
+        return True
+
+    def clear(self):
+        self._entries.clear()
+        self._size = 0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "entries": len(self),
+            "size": self.size,
+        }
+
+    def _lookup(self, key):
+        try:
+            value, expires = self._entries[key]
+        except KeyError:
+            return None
+
+        if expires is not None and expires <= time.monotonic():
+            self.delete(key)
+            self.expirations += 1
+            return None
+
+        return value
+
+
+class TieredCacheWriter(CacheWriter):
+    """
+    Streaming cache writer for :py:class:`TieredCache`. Writing is delegated
+    to the writer of the Redis tier. When committing, the entry of the local
+    tier is invalidated.
+    """
+
+    def __init__(self, writer, local):
+        super().__init__(writer.key, timeout=writer.timeout)
+
+        self._writer = writer
+        self._local = local
+
+    @property
+    def aborted(self):
+        return self._writer.aborted
+
+    @property
+    def size(self):
+        return self._writer.size
+
+    async def write(self, data):
+        await self._writer.write(data)
+
+    async def commit(self):
+        retval = await self._writer.commit()
+        if retval:
+            self._local.delete(self.key)
+        return retval
+
+    async def abort(self):
+        await self._writer.abort()
+
+
+class TieredCache(CachingBackend):
+    """
+    Two-tier caching backend. A bounded per-process LRU cache (local tier) is
+    layered over a :py:class:`RedisCache` (Redis tier).
+
+    The local tier is populated on read (i.e. read-through) and stores
+    serialized values, i.e. compressed data if compression is enabled.
+    Local entries expire together with the corresponding Redis entry. Note
+    that the local tier is not synchronized between processes; overwriting a
+    key invalidates the local entry of the writing process, only. Use
+    ``local_timeout`` to limit staleness.
+    """
+
+    DEFAULT_LOCAL_MAXSIZE = 64 * 1024 ** 2  # bytes
+    DEFAULT_LOCAL_MAX_ENTRY_SIZE = 1024 ** 2  # bytes
+
+    @classmethod
+    async def create(
+        cls,
+        url,
+        default_timeout=300,
+        local_maxsize=DEFAULT_LOCAL_MAXSIZE,
+        local_max_entry_size=DEFAULT_LOCAL_MAX_ENTRY_SIZE,
+        local_timeout=None,
+        **kwargs,
+    ):
+        """
+        :param int local_maxsize: Maximum total size in bytes of the values
+            stored by the local tier
+        :param int local_max_entry_size: Maximum size in bytes of a
+            (serialized) value stored by the local tier. Larger values are
+            served from the Redis tier, only.
+        :param local_timeout: Maximum timeout in seconds of local entries. If
+            ``None`` local entries expire together with the corresponding
+            Redis entry.
+
+        Additional keyword arguments are passed to
+        :py:meth:`RedisCache.create`.
+        """
+        self = cls()
+        super(cls, self)._init(default_timeout)
+        self.local = LRUCache(
+            local_maxsize, max_entry_size=local_max_entry_size
+        )
+        self.remote = await RedisCache.create(
+            url, default_timeout=default_timeout, **kwargs
+        )
+
+        self._local_timeout = local_timeout
+        self._remote_hits = 0
+        self._remote_misses = 0
+
+        return self
+
+    async def get(self, key, decompress=None, **kwargs):
+        local_key = self._create_local_key(key)
+        value = self.local.get(local_key)
+        if value is None:
+            value = await self.remote.get(key, decompress=False)
+            if value is None:
+                self._remote_misses += 1
+                return None
+
+            self._remote_hits += 1
+            await self._populate(local_key, value)
+
+        return self.remote._deserialize(value, decompress=decompress)
+
+    async def delete(self, key):
+        self.local.delete(self._create_local_key(key))
+        return await self.remote.delete(key)
+
+    async def set(self, key, value, timeout=None, **kwargs):
+        local_key = self._create_local_key(key)
+        self.local.delete(local_key)
+        timeout = self._normalize_timeout(timeout)
+        retval = await self.remote.set(key, value, timeout=timeout, **kwargs)
+        if retval:
+            self.local.set(
+                local_key,
+                self.remote._serialize(value, **kwargs),
+                timeout=self._make_local_timeout(timeout),
+            )
+        return retval
+
+    def writer(self, key, timeout=None, **kwargs):
+        return TieredCacheWriter(
+            self.remote.writer(
+                key, timeout=self._normalize_timeout(timeout), **kwargs
+            ),
+            self.local,
+        )
+
+    async def reader(self, key, decompress=None, **kwargs):
+        decompress = (
+            self.remote._compress if decompress is None else bool(decompress)
+        )
+        local_key = self._create_local_key(key)
+        value = self.local.get(local_key)
+        if value is not None:
+            return BytesCacheReader(local_key, value, decompress=decompress)
+
+        reader = await self.remote.reader(key, decompress=decompress)
+        if reader is None:
+            self._remote_misses += 1
+            return None
+
+        self._remote_hits += 1
+        if not self.local.fits(reader.size):
+            return reader
+
+        # the local tier stores serialized values, i.e. bypass decompression
+        chunks = []
+        chunk = await reader._read()
+        while chunk:
+            chunks.append(chunk)
+            chunk = await reader._read()
+
+        value = b"".join(chunks)
+        await self._populate(local_key, value)
+        return BytesCacheReader(local_key, value, decompress=decompress)
+
+    async def exists(self, key):
+        if self._create_local_key(key) in self.local:
+            return True
+        return await self.remote.exists(key)
+
+    async def flush_all(self, **kwargs):
+        self.local.clear()
+        await self.remote.flush_all(**kwargs)
+
+    async def close(self):
+        self.local.clear()
+        await self.remote.close()
+
+    def stats(self):
+        return {
+            "local": self.local.stats(),
+            "redis": {
+                "hits": self._remote_hits,
+                "misses": self._remote_misses,
+            },
+        }
+
+    def _create_local_key(self, key):
+        return self.remote._create_key_prefix() + key
+
+    def _make_local_timeout(self, timeout):
+        if not timeout:
+            return self._local_timeout
+        if self._local_timeout:
+            return min(timeout, self._local_timeout)
+        return timeout
+
+    async def _populate(self, local_key, value):
+        """
+        Populate the local tier. The timeout is derived from the TTL of the
+        corresponding Redis entry.
+        """
+        if not self.local.fits(len(value)):
+            return
+
+        pttl = await self.remote.redis.pttl(local_key)
+        if pttl == -2:
+            # already expired
+            return
+
+        timeout = pttl / 1000 if pttl > 0 else 0
+        self.local.set(
+            local_key, value, timeout=self._make_local_timeout(timeout)
+        )
+
 
 CachingBackend.register(NullCache)
 CachingBackend.register(RedisCache)
+CachingBackend.register(TieredCache)
 
 
 # -----------------------------------------------------------------------------
@@ -200,6 +1027,7 @@ class Cache:
     CACHE_MAP = {
         "null": NullCache,
         "redis": RedisCache,
+        "tiered": TieredCache,
     }
 
     @classmethod
@@ -223,12 +1051,21 @@ class Cache:
     async def set(self, *args, **kwargs):
         return await self._cache.set(*args, **kwargs)
 
+    def writer(self, *args, **kwargs):
+        return self._cache.writer(*args, **kwargs)
+
+    async def reader(self, *args, **kwargs):
+        return await self._cache.reader(*args, **kwargs)
+
     async def delete(self, *args, **kwargs):
         return await self._cache.delete(*args, **kwargs)
 
     async def exists(self, *args, **kwargs):
         return await self._cache.__contains__(*args, **kwargs)
 
+    def stats(self):
+        return self._cache.stats()
+
     async def close(self, *args, **kwargs):
         return await self._cache.close(*args, **kwargs)
 
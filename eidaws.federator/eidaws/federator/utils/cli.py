@@ -21,6 +21,7 @@ from eidaws.federator.settings import (
     FED_DEFAULT_UNIX_PATH,
     FED_DEFAULT_NUM_FORWARDED,
     FED_DEFAULT_SERVE_STATIC,
+    FED_DEFAULT_METRICS_PATH,
     FED_DEFAULT_URL_ROUTING,
     FED_DEFAULT_NETLOC_PROXY,
     FED_DEFAULT_ENDPOINT_REQUEST_METHOD,
@@ -29,7 +30,16 @@ from eidaws.federator.settings import (
     FED_DEFAULT_ENDPOINT_TIMEOUT_CONNECT,
     FED_DEFAULT_ENDPOINT_TIMEOUT_SOCK_CONNECT,
     FED_DEFAULT_ENDPOINT_TIMEOUT_SOCK_READ,
+    FED_DEFAULT_ENDPOINT_CONCURRENCY,
+    FED_DEFAULT_ENDPOINT_CONCURRENCY_MIN_LIMIT,
+    FED_DEFAULT_ENDPOINT_CONCURRENCY_LATENCY_THRESHOLD,
+    FED_DEFAULT_HEDGING_BUDGET,
+    FED_DEFAULT_HEDGING_PERCENTILE,
+    FED_DEFAULT_HEDGING_MIN_SAMPLES,
     FED_DEFAULT_ROUTING_CONN_LIMIT,
+    FED_DEFAULT_ROUTING_CACHE_TTL,
+    FED_DEFAULT_ROUTING_CACHE_MAXSIZE,
+    FED_DEFAULT_ROUTING_CACHE_CHECK_INTERVAL,
     FED_DEFAULT_URL_REDIS,
     FED_DEFAULT_REDIS_POOL_MINSIZE,
     FED_DEFAULT_REDIS_POOL_MAXSIZE,
@@ -37,12 +47,22 @@ from eidaws.federator.settings import (
     FED_DEFAULT_RETRY_BUDGET_CLIENT_THRES,
     FED_DEFAULT_RETRY_BUDGET_CLIENT_TTL,
     FED_DEFAULT_RETRY_BUDGET_WINDOW_SIZE,
+    FED_DEFAULT_RETRY_BUDGET_BACKEND,
+    FED_DEFAULT_CIRCUIT_BREAKER_RESET_TIMEOUT,
+    FED_DEFAULT_CIRCUIT_BREAKER_SYNC_INTERVAL,
     FED_DEFAULT_POOL_SIZE,
+    FED_DEFAULT_TASK_BUDGET,
+    FED_DEFAULT_TASK_BUDGET_PER_HOST,
+    FED_DEFAULT_TASK_BUDGET_PER_REQUEST,
+    FED_DEFAULT_FILE_IO_THREADS,
+    FED_DEFAULT_EVENT_LOOP_LAG_INTERVAL,
     FED_DEFAULT_CACHE_CONFIG,
     FED_DEFAULT_CLIENT_MAX_SIZE,
     FED_DEFAULT_MAX_STREAM_EPOCH_DURATION,
     FED_DEFAULT_MAX_STREAM_EPOCH_DURATION_TOTAL,
     FED_DEFAULT_STREAMING_TIMEOUT,
+    FED_DEFAULT_REQUEST_COALESCING,
+    FED_DEFAULT_REQUEST_COALESCING_TIMEOUT,
     make_config_file_paths,
 )
 from eidaws.federator.version import __version__
@@ -114,6 +134,16 @@ def build_parser(
 
         return netloc
 
+    redis_cache_kwargs_properties = {
+        "url": {"type": "string", "format": "uri", "pattern": "^redis://"},
+        "default_timeout": {"type": "integer", "minimum": 0},
+        "compress": {"type": "boolean"},
+        "segment_size": {"type": "integer", "minimum": 1},
+        "max_entry_size": {"type": ["integer", "null"], "minimum": 1},
+        "minsize": {"type": "integer", "minimum": 1},
+        "maxsize": {"type": "integer", "maximum": 1},
+    }
+
     cache_config_schema = {
         "oneOf": [
             {"type": "null"},
@@ -127,27 +157,39 @@ def build_parser(
                 "type": "object",
                 "properties": {
                     "cache_type": {"type": "string", "pattern": "^redis$"},
+                    "cache_kwargs": {
+                        "type": "object",
+                        "properties": redis_cache_kwargs_properties,
+                        "required": ["url"],
+                        "additionalProperties": False,
+                    },
+                },
+                "required": ["cache_kwargs"],
+                "additionalProperties": False,
+            },
+            {
+                "type": "object",
+                "properties": {
+                    "cache_type": {"type": "string", "pattern": "^tiered$"},
                     "cache_kwargs": {
                         "type": "object",
                         "properties": {
-                            "url": {
-                                "type": "string",
-                                "format": "uri",
-                                "pattern": "^redis://",
-                            },
-                            "default_timeout": {
+                            **redis_cache_kwargs_properties,
+                            "local_maxsize": {"type": "integer", "minimum": 0},
+                            "local_max_entry_size": {
                                 "type": "integer",
-                                "minimum": 0,
+                                "minimum": 1,
+                            },
+                            "local_timeout": {
+                                "type": ["integer", "null"],
+                                "minimum": 1,
                             },
-                            "compress": {"type": "boolean"},
-                            "minsize": {"type": "integer", "minimum": 1},
-                            "maxsize": {"type": "integer", "maximum": 1},
                         },
                         "required": ["url"],
                         "additionalProperties": False,
                     },
                 },
-                "required": ["cache_kwargs"],
+                "required": ["cache_type", "cache_kwargs"],
                 "additionalProperties": False,
             },
         ]
@@ -204,6 +246,46 @@ def build_parser(
         "By default the number of task workers is determined based on the "
         "'--endpoint-connection-limit' configuration parameter.",
     )
+    parser.add_argument(
+        "--task-budget",
+        dest="task_budget",
+        metavar="NUM",
+        type=positive_int_or_none,
+        default=FED_DEFAULT_TASK_BUDGET,
+        help="Overall maximum number of endpoint tasks (i.e. endpoint "
+        "requests including their buffers) in flight, shared by all "
+        "requests processed. Bounds the memory footprint independently from "
+        "the number of concurrent requests. If not specified or 0, the number "
+        "of tasks is not limited (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--task-budget-per-host",
+        dest="task_budget_per_host",
+        metavar="NUM",
+        type=positive_int_or_none,
+        default=FED_DEFAULT_TASK_BUDGET_PER_HOST,
+        help="Maximum number of endpoint tasks in flight per endpoint host, "
+        "shared by all requests processed (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--task-budget-per-request",
+        dest="task_budget_per_request",
+        metavar="NUM",
+        type=positive_int_or_none,
+        default=FED_DEFAULT_TASK_BUDGET_PER_REQUEST,
+        help="Maximum number of endpoint tasks in flight per request "
+        "(default: %(default)s).",
+    )
+    parser.add_argument(
+        "--file-io-threads",
+        dest="file_io_threads",
+        metavar="NUM",
+        type=positive_int_exclusive,
+        default=FED_DEFAULT_FILE_IO_THREADS,
+        help="Number of threads file I/O (i.e. buffering data on disk) is "
+        "delegated to, shared by all requests processed "
+        "(default: %(default)s).",
+    )
     parser.add_argument(
         "--proxy-netloc",
         dest="proxy_netloc",
@@ -223,6 +305,26 @@ def build_parser(
         "serve static files by means of a reverse proxy. (default: "
         "%(default)s).",
     )
+    parser.add_argument(
+        "--metrics-path",
+        dest="metrics_path",
+        metavar="PATH",
+        default=FED_DEFAULT_METRICS_PATH,
+        help="URL path internal metrics (e.g. cache statistics, endpoint "
+        "concurrency limits) are served on in JSON format. If not specified, "
+        "metrics are not served (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--event-loop-lag-interval",
+        dest="event_loop_lag_interval",
+        type=positive_float_or_none,
+        metavar="SEC",
+        default=FED_DEFAULT_EVENT_LOOP_LAG_INTERVAL,
+        help="Interval in seconds the event loop lag (i.e. the delay "
+        "callbacks are executed with due to the event loop being blocked) is "
+        "sampled with. Served as part of the metrics. If 0, sampling is "
+        "disabled (default: %(default)s).",
+    )
     parser.add_argument(
         "--streaming-timeout",
         dest="streaming_timeout",
@@ -289,6 +391,35 @@ def build_parser(
         help="Maximum number of concurrent HTTP connections to "
         "eidaws-stationlite (default: %(default)s).",
     )
+    parser.add_argument(
+        "--routing-cache-ttl",
+        dest="routing_cache_ttl",
+        type=positive_int,
+        metavar="SEC",
+        default=FED_DEFAULT_ROUTING_CACHE_TTL,
+        help="Timeout in seconds of routing responses cached in-process. If "
+        "0, routing responses are not cached (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--routing-cache-maxsize",
+        dest="routing_cache_maxsize",
+        type=positive_int_exclusive,
+        metavar="BYTES",
+        default=FED_DEFAULT_ROUTING_CACHE_MAXSIZE,
+        help="Maximum total size in bytes of routing responses cached "
+        "in-process (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--routing-cache-check-interval",
+        dest="routing_cache_check_interval",
+        type=positive_int,
+        metavar="SEC",
+        default=FED_DEFAULT_ROUTING_CACHE_CHECK_INTERVAL,
+        help="Interval in seconds the eidaws-stationlite routing table "
+        "version is checked. Cached routing responses are invalidated if "
+        "the version changed. If 0, the version is not checked (default: "
+        "%(default)s).",
+    )
     parser.add_argument(
         "--forwarded",
         dest="num_forwarded",
@@ -359,6 +490,69 @@ def build_parser(
         help="Timeout in seconds for reading a portion of data from a peer "
         "(default: %(default)s).",
     )
+    parser.add_argument(
+        "--endpoint-concurrency",
+        dest="endpoint_concurrency",
+        choices=["static", "aimd"],
+        default=FED_DEFAULT_ENDPOINT_CONCURRENCY,
+        help="Per endpoint concurrency limiting. With 'static' concurrency is "
+        "limited by '--endpoint-connection-limit-per-host', only. With "
+        "'aimd' the per endpoint concurrency limit is adapted (additive "
+        "increase, multiplicative decrease) with respect to the latency and "
+        "the error rate observed. The upper bound is "
+        "'--endpoint-connection-limit-per-host' (choices: %(choices)s, "
+        "default: %(default)s).",
+    )
+    parser.add_argument(
+        "--endpoint-concurrency-min-limit",
+        dest="endpoint_concurrency_min_limit",
+        type=positive_int_exclusive,
+        metavar="NUM",
+        default=FED_DEFAULT_ENDPOINT_CONCURRENCY_MIN_LIMIT,
+        help="Lower bound of the adaptive per endpoint concurrency limit "
+        "(default: %(default)s).",
+    )
+    parser.add_argument(
+        "--endpoint-concurrency-latency-threshold",
+        dest="endpoint_concurrency_latency_threshold",
+        type=positive_float_or_none,
+        metavar="SEC",
+        default=FED_DEFAULT_ENDPOINT_CONCURRENCY_LATENCY_THRESHOLD,
+        help="Time to first byte in seconds of an endpoint request considered "
+        "as congestion signal when adapting the per endpoint concurrency "
+        "limit (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--hedging-budget",
+        dest="hedging_budget",
+        type=percent,
+        metavar="PERCENT",
+        default=FED_DEFAULT_HEDGING_BUDGET,
+        help="Maximum percentage of endpoint requests hedged. A request is "
+        "hedged (i.e. a duplicate request is issued and whichever request "
+        "responds first is used) if it didn't respond within the endpoint's "
+        "observed latency percentile. Applies to station text, StationXML "
+        "and availability endpoint requests. If 0, requests are not hedged "
+        "(default: %(default)s).",
+    )
+    parser.add_argument(
+        "--hedging-percentile",
+        dest="hedging_percentile",
+        type=percent,
+        metavar="PERCENT",
+        default=FED_DEFAULT_HEDGING_PERCENTILE,
+        help="Per endpoint latency percentile after which an endpoint "
+        "request is hedged (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--hedging-min-samples",
+        dest="hedging_min_samples",
+        type=positive_int_exclusive,
+        metavar="NUM",
+        default=FED_DEFAULT_HEDGING_MIN_SAMPLES,
+        help="Minimum number of latencies observed per endpoint before "
+        "endpoint requests are hedged (default: %(default)s).",
+    )
     parser.add_argument(
         "--redis-url",
         dest="redis_url",
@@ -419,6 +613,59 @@ def build_parser(
         help="Rolling window size with respect to response code time series "
         "(default: %(default)s).",
     )
+    parser.add_argument(
+        "--retry-budget-backend",
+        dest="client_retry_budget_backend",
+        choices=["timeseries", "counters"],
+        default=FED_DEFAULT_RETRY_BUDGET_BACKEND,
+        help="Response code statistics backend. With 'timeseries' each "
+        "response code is stored individually (within a rolling window), "
+        "while with 'counters' response codes are counted within time "
+        "buckets. Note that with 'counters' the rolling window size is "
+        "ignored (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--circuit-breaker-reset-timeout",
+        dest="circuit_breaker_reset_timeout",
+        type=positive_int,
+        metavar="SEC",
+        default=FED_DEFAULT_CIRCUIT_BREAKER_RESET_TIMEOUT,
+        help="Time in seconds before an endpoint's open circuit breaker "
+        "(i.e. endpoint requests are dropped due to an exceeded retry-budget) "
+        "lets a single probe request pass (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--circuit-breaker-sync-interval",
+        dest="circuit_breaker_sync_interval",
+        type=positive_int,
+        metavar="SEC",
+        default=FED_DEFAULT_CIRCUIT_BREAKER_SYNC_INTERVAL,
+        help="Interval in seconds circuit breakers are synchronized with the "
+        "response code statistics stored in Redis. If 0, circuit breakers "
+        "rely on the response codes observed locally, only. The statistics "
+        "are still garbage collected periodically (default: %(default)s).",
+    )
+    parser.add_argument(
+        "--request-coalescing",
+        dest="request_coalescing",
+        choices=["off", "local", "redis"],
+        default=FED_DEFAULT_REQUEST_COALESCING,
+        help="Coalesce identical requests processed concurrently such that "
+        "only a single request performs the federation. With 'local' "
+        "requests are coalesced per process, with 'redis' additionally "
+        "across processes (by means of a Redis lock) (choices: %(choices)s, "
+        "default: %(default)s).",
+    )
+    parser.add_argument(
+        "--request-coalescing-timeout",
+        dest="request_coalescing_timeout",
+        type=positive_int_exclusive,
+        metavar="SEC",
+        default=FED_DEFAULT_REQUEST_COALESCING_TIMEOUT,
+        help="Timeout in seconds coalesced requests wait for a cache entry "
+        "of the coalescing request. Also the expiration time of the Redis "
+        "lock (default: %(default)s).",
+    )
     parser.add_argument(
         "-C",
         "--cache-config",
@@ -427,7 +674,9 @@ def build_parser(
         help="Cache configuration. Cache keys are computed based on request "
         "parameters (including stream epochs). The cache can be configured "
         "with different caching backends: cache_type='null' (NullCache, "
-        "enables response buffering), cache_type: 'redis' (Redis backend). "
+        "enables response buffering), cache_type: 'redis' (Redis backend), "
+        "cache_type: 'tiered' (in-process LRU cache layered over the Redis "
+        "backend). "
         "By default both response buffering and caching is disabled. The "
         "configuration must must obey the following schema: %s",
     )
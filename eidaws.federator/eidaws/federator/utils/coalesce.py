@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""
+Request coalescing (single-flight) facilities.
+
+Identical requests (i.e. requests with the same cache key) processed
+concurrently are coalesced such that only a single request (the *leader*)
+performs the federation. The remaining requests (the *followers*) either
+attach to the leader's response stream or wait for the leader's cache entry.
+"""
+
+import asyncio
+import aioredis
+import uuid
+
+from eidaws.utils.error import ErrorWithTraceback
+
+
+# -----------------------------------------------------------------------------
+class CoalescingError(ErrorWithTraceback):
+    """Base coalescing error ({})."""
+
+
+class FlightAborted(CoalescingError):
+    """Flight aborted ({})."""
+
+
+# -----------------------------------------------------------------------------
+class Flight:
+    """
+    A response in flight. Chunks fed by the leader are tee'd to followers.
+
+    Followers are able to attach to a flight as long as the leader didn't
+    start feeding. Chunks are queued per follower, i.e. slow followers
+    don't slow down the leader. Queues are bounded: A follower whose queue
+    overflows is detached from the flight. Its queued chunks are discarded
+    and :py:attr:`OVERFLOW` is put to the queue, instead. Queues are
+    unbounded while the leader feeds data followers are unable to resume
+    from (see :py:meth:`feed`).
+    """
+
+    # maximum number of chunks queued per follower
+    DEFAULT_MAXSIZE = 32
+
+    # marker put to the queue of a follower detached due to an overflow
+    OVERFLOW = object()
+
+    def __init__(self, key, maxsize=DEFAULT_MAXSIZE):
+        if maxsize < 1:
+            raise ValueError(f"Invalid maxsize: {maxsize!r}")
+
+        self.key = key
+        # response headers to be taken over by followers
+        self.headers = None
+
+        self._maxsize = maxsize
+        self._queues = []
+        self._started = False
+        self._done = asyncio.Event()
+        self._error = None
+
+    @property
+    def started(self):
+        return self._started
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    @property
+    def error(self):
+        """
+        The exception the flight was aborted with. ``None`` if the flight
+        either is still in flight or landed.
+        """
+        return self._error
+
+    def attach(self):
+        """
+        Attach a follower to the flight.
+
+        :returns: A :py:class:`asyncio.Queue` chunks are put to. The end of
+            the flight is marked by ``None``, a detached follower is notified
+            by :py:attr:`OVERFLOW`. If the leader already started feeding
+            ``None`` is returned.
+        """
+        if self._started or self.done:
+            return None
+
+        # bounded by means of feeding
+        queue = asyncio.Queue()
+        self._queues.append(queue)
+        return queue
+
+    def detach(self, queue):
+        try:
+            self._queues.remove(queue)
+        except ValueError:
+            pass
+
+    def feed(self, data, headers=None, detach=True):
+        """
+        Feed ``data`` to the followers attached.
+
+        :param headers: Response headers to be taken over by followers.
+            Evaluated when feeding for the first time, only.
+        :param bool detach: Whether followers whose queue overflows are
+            detached. If ``False`` (e.g. if followers are unable to resume
+            from the cache) queues aren't bounded.
+        """
+        if not self._started:
+            self._started = True
+            self.headers = headers
+
+        data = bytes(data)
+        for queue in list(self._queues):
+            if detach and queue.qsize() >= self._maxsize:
+                self._overflow(queue)
+            else:
+                queue.put_nowait(data)
+
+    def land(self):
+        """
+        Complete the flight successfully.
+        """
+        self._complete()
+
+    def abort(self, error):
+        """
+        Abort the flight due to ``error``.
+        """
+        self._error = error
+        self._complete()
+
+    async def wait(self, timeout=None):
+        """
+        Wait for the flight to be completed.
+
+        :returns: ``True`` if the flight was completed within ``timeout``
+            seconds, else ``False``.
+        """
+        try:
+            await asyncio.wait_for(self._done.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def _overflow(self, queue):
+        # release the memory occupied by the chunks queued
+        while not queue.empty():
+            queue.get_nowait()
+
+        queue.put_nowait(self.OVERFLOW)
+        self.detach(queue)
+
+    def _complete(self):
+        if self.done:
+            return
+
+        for queue in self._queues:
+            queue.put_nowait(None)
+        self._done.set()
+
+
+class FlightRegistry:
+    """
+    Per process registry of flights.
+    """
+
+    def __init__(self, maxsize=Flight.DEFAULT_MAXSIZE):
+        self._maxsize = maxsize
+        self._flights = {}
+
+    def __len__(self):
+        return len(self._flights)
+
+    def __contains__(self, key):
+        return key in self._flights
+
+    def get(self, key):
+        return self._flights.get(key)
+
+    def take_off(self, key):
+        """
+        Register a new flight for ``key``.
+
+        :raises CoalescingError: If a flight for ``key`` is already
+            registered.
+        """
+        if key in self._flights:
+            raise CoalescingError(f"Flight already registered: {key!r}")
+
+        flight = Flight(key, maxsize=self._maxsize)
+        self._flights[key] = flight
+        return flight
+
+    def remove(self, flight):
+        if self._flights.get(flight.key) is flight:
+            del self._flights[flight.key]
+
+
+# -----------------------------------------------------------------------------
+class RedisFlightLock:
+    """
+    Redis based lock allowing flights to be coalesced across processes. The
+    lock expires after ``timeout`` seconds such that a crashed leader
+    doesn't block followers forever.
+    """
+
+    DEFAULT_PREFIX = "coalescing:flights:"
+
+    # release the lock only if still owned
+    _RELEASE_SCRIPT = """
+    if redis.call("get", KEYS[1]) == ARGV[1] then
+        return redis.call("del", KEYS[1])
+    end
+    return 0
+    """
+
+    def __init__(self, redis, key, timeout, prefix=None):
+        self.redis = redis
+        self.key = (prefix or self.DEFAULT_PREFIX) + key
+        self.timeout = timeout
+
+        self._token = uuid.uuid4().hex
+        self._acquired = False
+
+    @property
+    def acquired(self):
+        return self._acquired
+
+    async def acquire(self):
+        """
+        Try to acquire the lock without blocking.
+
+        :returns: Whether the lock was acquired.
+        :rtype: bool
+        """
+        self._acquired = bool(
+            await self.redis.set(
+                self.key,
+                self._token,
+                pexpire=int(self.timeout * 1000),
+                exist=aioredis.Redis.SET_IF_NOT_EXIST,
+            )
+        )
+        return self._acquired
+
+    async def release(self):
+        if not self._acquired:
+            return
+
+        self._acquired = False
+        await self.redis.eval(
+            self._RELEASE_SCRIPT, keys=[self.key], args=[self._token]
+        )
+
+    async def wait(self, timeout=None, interval=0.05, max_interval=1):
+        """
+        Wait for the lock to be released by its current owner. The lock is
+        polled with an exponentially increasing interval.
+
+        :returns: ``True`` if the lock was released within ``timeout``
+            seconds, else ``False``.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + timeout
+
+        while await self.redis.exists(self.key):
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return False
+
+            await asyncio.sleep(min(interval, remaining))
+            interval = min(interval * 2, max_interval)
+
+        return True
@@ -0,0 +1,248 @@
+# -*- coding: utf-8 -*-
+"""
+Adaptive per endpoint concurrency limiting facilities.
+
+Concurrency limits are adjusted based on the outcome of endpoint requests
+following an *additive increase, multiplicative decrease* (AIMD) scheme:
+successful requests increase the limit by one per window of ``limit``
+requests, while congestion signals (i.e. HTTP status codes ``5xx`` and
+``429``, timeouts or an exceeded latency threshold) decrease the limit
+multiplicatively.
+"""
+
+import asyncio
+import collections
+import logging
+import time
+
+from urllib.parse import urlsplit
+
+from eidaws.federator.settings import FED_BASE_ID
+
+
+logger = logging.getLogger(FED_BASE_ID + ".concurrency")
+
+
+def make_endpoint_key(*urls):
+    """
+    Return the key (i.e. the network location) concurrency is limited by
+    for requests to ``urls``. If ``urls`` refer to different network
+    locations ``None`` is returned.
+    """
+    netlocs = {urlsplit(url).netloc for url in urls}
+    if len(netlocs) != 1:
+        return None
+
+    return netlocs.pop()
+
+
+class AIMDLimiter:
+    """
+    Concurrency limiter with a limit adapted following an AIMD scheme.
+    Waiters are woken up in FIFO order.
+    """
+
+    def __init__(
+        self,
+        max_limit,
+        min_limit=1,
+        initial_limit=None,
+        latency_threshold=None,
+        backoff_ratio=0.5,
+    ):
+        """
+        :param int max_limit: Upper bound of the concurrency limit
+        :param int min_limit: Lower bound of the concurrency limit
+        :param initial_limit: Initial concurrency limit. By default
+            ``max_limit``.
+        :param latency_threshold: Latency in seconds considered as congestion
+            signal. If ``None`` latency is not taken into account.
+        :param float backoff_ratio: Factor the limit is multiplied by when
+            decreasing
+        """
+        if min_limit < 1 or max_limit < min_limit:
+            raise ValueError(
+                f"Invalid limits: min_limit={min_limit}, "
+                f"max_limit={max_limit}"
+            )
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_threshold = latency_threshold
+        self.backoff_ratio = backoff_ratio
+
+        self._limit = float(initial_limit or max_limit)
+        self._inflight = 0
+        self._waiters = collections.deque()
+        self._last_decrease = float("-inf")
+
+        self.successes = 0
+        self.errors = 0
+        self.decreases = 0
+
+    @property
+    def limit(self):
+        return max(self.min_limit, int(self._limit))
+
+    @property
+    def inflight(self):
+        return self._inflight
+
+    @property
+    def waiting(self):
+        return len(self._waiters)
+
+    def locked(self):
+        return self._inflight >= self.limit
+
+    async def acquire(self):
+        """
+        Acquire a slot. Blocks until a slot is available.
+        """
+        if not self._waiters and not self.locked():
+            self._inflight += 1
+            return True
+
+        fut = asyncio.get_event_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # the slot was granted in the meantime
+                self.release()
+            else:
+                try:
+                    self._waiters.remove(fut)
+                except ValueError:
+                    pass
+            raise
+
+        return True
+
+    def acquire_nowait(self):
+        """
+        Acquire a slot without waiting.
+
+        :returns: Whether a slot was acquired.
+        """
+        if self._waiters or self.locked():
+            return False
+
+        self._inflight += 1
+        return True
+
+    def release(self):
+        self._inflight -= 1
+        self._wake_up()
+
+    def observe(self, latency, status):
+        """
+        Adapt the concurrency limit with respect to the outcome of a request.
+
+        :param float latency: Latency in seconds of the request (i.e. time to
+            first byte)
+        :param int status: HTTP status code of the request
+        """
+        now = time.monotonic()
+        if self._is_congested(latency, status):
+            self.errors += 1
+            # ignore congestion signals of requests issued before the limit
+            # was decreased the last time
+            if now - latency < self._last_decrease:
+                return
+
+            self._limit = max(
+                float(self.min_limit), self._limit * self.backoff_ratio
+            )
+            self._last_decrease = now
+            self.decreases += 1
+        else:
+            self.successes += 1
+            self._limit = min(
+                float(self.max_limit), self._limit + 1 / self._limit
+            )
+            self._wake_up()
+
+    def stats(self):
+        return {
+            "limit": self.limit,
+            "inflight": self._inflight,
+            "waiting": self.waiting,
+            "successes": self.successes,
+            "errors": self.errors,
+            "decreases": self.decreases,
+        }
+
+    def _is_congested(self, latency, status):
+        return (
+            status >= 500
+            or status == 429
+            or (
+                self.latency_threshold is not None
+                and latency > self.latency_threshold
+            )
+        )
+
+    def _wake_up(self):
+        while self._waiters and not self.locked():
+            fut = self._waiters.popleft()
+            if not fut.done():
+                self._inflight += 1
+                fut.set_result(True)
+
+
+class EndpointLimiters:
+    """
+    Per process registry of :py:class:`AIMDLimiter` objects keyed by
+    endpoint network location.
+    """
+
+    def __init__(self, max_limit, **kwargs):
+        """
+        :param int max_limit: Upper bound of the per endpoint concurrency
+            limit
+        :param kwargs: Keyword arguments passed to :py:class:`AIMDLimiter`
+        """
+        self._max_limit = max_limit
+        self._kwargs = kwargs
+
+        self._limiters = {}
+
+    def __len__(self):
+        return len(self._limiters)
+
+    def __contains__(self, key):
+        return key in self._limiters
+
+    def get(self, key):
+        """
+        Return the limiter for ``key``. The limiter is created if not
+        available, yet.
+        """
+        try:
+            return self._limiters[key]
+        except KeyError:
+            limiter = AIMDLimiter(self._max_limit, **self._kwargs)
+            self._limiters[key] = limiter
+            return limiter
+
+    def observe(self, url, latency, status):
+        """
+        Observe the outcome of a request to ``url``.
+        """
+        key = make_endpoint_key(url)
+        limiter = self.get(key)
+        limit = limiter.limit
+        limiter.observe(latency, status)
+
+        if limiter.limit != limit:
+            logger.debug(
+                f"Concurrency limit for {key!r} changed: {limit} -> "
+                f"{limiter.limit} (latency={latency:.3f}s, status={status})"
+            )
+
+    def stats(self):
+        return {
+            key: limiter.stats() for key, limiter in self._limiters.items()
+        }
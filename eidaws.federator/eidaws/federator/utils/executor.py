@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Executor facilities.
+"""
+
+import contextlib
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BoundedExecutor(ThreadPoolExecutor):
+    """
+    Bounded thread pool executor shared by all workers of an application.
+    Keeps track of the number of work items pending (i.e. either queued or
+    running).
+    """
+
+    def __init__(self, max_workers, thread_name_prefix=""):
+        super().__init__(
+            max_workers=max_workers, thread_name_prefix=thread_name_prefix
+        )
+
+        self._stats_lock = threading.Lock()
+        self.submitted = 0
+        self.pending = 0
+        self.max_pending = 0
+
+    def submit(self, fn, *args, **kwargs):
+        with self._stats_lock:
+            self.submitted += 1
+            self.pending += 1
+            self.max_pending = max(self.max_pending, self.pending)
+
+        try:
+            future = super().submit(fn, *args, **kwargs)
+        except BaseException:
+            self._done()
+            raise
+
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future=None):
+        with self._stats_lock:
+            self.pending -= 1
+
+    def stats(self):
+        return {
+            "max_workers": self._max_workers,
+            "threads": len(self._threads),
+            "queued": self._work_queue.qsize(),
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "submitted": self.submitted,
+        }
+
+
+class FileIOExecutor(BoundedExecutor):
+    """
+    Bounded thread pool executor for file I/O (i.e. buffering).
+    """
+
+
+class XMLExecutor:
+    """
+    Executor for CPU bound XML processing (i.e. parsing and serializing),
+    made up of single threaded executors. While :py:mod:`lxml` releases the
+    GIL when processing XML, documents must not be processed by multiple
+    threads concurrently (e.g. since string dictionaries are thread local).
+    Hence, the documents of a job are processed by a single thread, only
+    (see also :py:meth:`bind`).
+    """
+
+    def __init__(self, max_workers, thread_name_prefix=""):
+        self._executors = [
+            BoundedExecutor(1, thread_name_prefix=f"{thread_name_prefix}_{i}")
+            for i in range(max_workers)
+        ]
+        self._bound = [0] * max_workers
+
+    @contextlib.contextmanager
+    def bind(self):
+        """
+        Context manager binding a job to the single threaded executor with
+        the least jobs bound.
+        """
+        i = min(range(len(self._executors)), key=self._bound.__getitem__)
+        self._bound[i] += 1
+        try:
+            yield self._executors[i]
+        finally:
+            self._bound[i] -= 1
+
+    def shutdown(self, wait=True):
+        for executor in self._executors:
+            executor.shutdown(wait=wait)
+
+    def stats(self):
+        stats = [executor.stats() for executor in self._executors]
+        return {
+            "max_workers": len(self._executors),
+            "threads": sum(s["threads"] for s in stats),
+            "bound": sum(self._bound),
+            "queued": sum(s["queued"] for s in stats),
+            "pending": sum(s["pending"] for s in stats),
+            "max_pending": max(s["max_pending"] for s in stats),
+            "submitted": sum(s["submitted"] for s in stats),
+        }
@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""
+Hedged request facilities.
+
+A request is *hedged* if it didn't return a response (i.e. response headers)
+within the endpoint's observed latency percentile: a duplicate request is
+issued and whichever request returns first is used, while the other one is
+cancelled. The number of duplicate requests is bounded by a hedge budget.
+"""
+
+import asyncio
+import collections
+import logging
+import math
+
+from eidaws.federator.settings import FED_BASE_ID
+from eidaws.federator.utils.concurrency import make_endpoint_key
+
+
+logger = logging.getLogger(FED_BASE_ID + ".hedge")
+
+
+class LatencyTracker:
+    """
+    Keeps track of the latencies observed within a sliding window of size
+    ``window_size``.
+    """
+
+    def __init__(self, window_size=100):
+        self._latencies = collections.deque(maxlen=window_size)
+
+    def __len__(self):
+        return len(self._latencies)
+
+    def observe(self, latency):
+        self._latencies.append(latency)
+
+    def percentile(self, p):
+        """
+        Return the ``p``-th percentile (nearest-rank method) of the latencies
+        observed. ``None`` if no latencies were observed, yet.
+        """
+        if not self._latencies:
+            return None
+
+        _sorted = sorted(self._latencies)
+        rank = max(1, math.ceil(p / 100 * len(_sorted)))
+        return _sorted[rank - 1]
+
+
+class HedgeBudget:
+    """
+    Token bucket based hedge budget. Each request deposits ``percent / 100``
+    tokens, while a hedge withdraws a single token. At most ``burst`` tokens
+    are accumulated.
+    """
+
+    def __init__(self, percent, burst=10):
+        self.percent = percent
+        self.burst = burst
+
+        self._tokens = 0.0
+
+    def deposit(self):
+        self._tokens = min(
+            float(self.burst), self._tokens + self.percent / 100
+        )
+
+    def withdraw(self):
+        """
+        :returns: Whether a token was available.
+        :rtype: bool
+        """
+        if self._tokens < 1:
+            return False
+
+        self._tokens -= 1
+        return True
+
+
+class Hedger:
+    """
+    Issues hedged requests with respect to per endpoint latency percentiles.
+    """
+
+    def __init__(
+        self, budget, percentile=95, min_samples=20, window_size=100
+    ):
+        """
+        :param float budget: Hedge budget i.e. the maximum percentage of
+            requests hedged
+        :param float percentile: Latency percentile after which a request is
+            hedged
+        :param int min_samples: Minimum number of latencies observed per
+            endpoint before requests to the endpoint are hedged
+        :param int window_size: Number of latencies per endpoint taken into
+            account
+        """
+        self.percentile = percentile
+        self.min_samples = min_samples
+
+        self._budget = HedgeBudget(budget)
+        self._window_size = window_size
+        self._trackers = {}
+
+        self.requests = 0
+        self.hedges = 0
+        self.wins = 0
+
+    def delay(self, key):
+        """
+        Return the delay in seconds after which a request to the endpoint
+        referenced by ``key`` is hedged. ``None`` if not enough latencies
+        were observed, yet.
+        """
+        tracker = self._trackers.get(key)
+        if tracker is None or len(tracker) < self.min_samples:
+            return None
+
+        return tracker.percentile(self.percentile)
+
+    def observe(self, key, latency):
+        try:
+            tracker = self._trackers[key]
+        except KeyError:
+            tracker = LatencyTracker(window_size=self._window_size)
+            self._trackers[key] = tracker
+
+        tracker.observe(latency)
+
+    def wrap(self, req, url):
+        """
+        Wrap the request factory ``req`` such that requests to ``url`` are
+        hedged.
+
+        :param req: Callable returning an awaitable asynchronous context
+            manager (e.g. a bound :py:meth:`aiohttp.ClientSession.get`)
+        """
+
+        def hedged_req(**kwargs):
+            return _HedgedRequestContextManager(
+                self, make_endpoint_key(url), req, kwargs
+            )
+
+        return hedged_req
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "wins": self.wins,
+            "delays": {key: self.delay(key) for key in self._trackers},
+        }
+
+    async def _race(self, key, make_coro):
+        """
+        Race a request against a hedged request issued after the endpoint's
+        latency percentile.
+
+        :returns: The response of the request returning first
+        """
+        loop = asyncio.get_event_loop()
+        started = loop.time()
+
+        self.requests += 1
+        self._budget.deposit()
+
+        primary = asyncio.ensure_future(make_coro())
+        delay = self.delay(key)
+        try:
+            if delay is not None:
+                await asyncio.wait({primary}, timeout=delay)
+
+            if primary.done() or delay is None or not self._budget.withdraw():
+                resp = await primary
+                self.observe(key, loop.time() - started)
+                return resp
+
+            logger.debug(
+                f"Hedging request to {key!r} (delay={delay:.3f}s) ..."
+            )
+            self.hedges += 1
+            secondary = asyncio.ensure_future(make_coro())
+        except BaseException:
+            primary.cancel()
+            raise
+
+        resp = await self._first_completed([primary, secondary])
+        if secondary.done() and not secondary.cancelled():
+            if secondary.exception() is None and secondary.result() is resp:
+                self.wins += 1
+
+        # in case the hedged request wins the latency observed is a lower
+        # bound of the primary request's latency
+        self.observe(key, loop.time() - started)
+        return resp
+
+    @staticmethod
+    async def _first_completed(tasks):
+        """
+        Return the result of the first task completed successfully. Pending
+        tasks are cancelled and responses not used are released. If all
+        tasks failed, the exception of the first task is raised.
+        """
+        pending = set(tasks)
+        winner = None
+        try:
+            while pending and winner is None:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for t in tasks:
+                    if t in done and t.exception() is None:
+                        winner = t
+                        break
+        finally:
+            for t in pending:
+                t.cancel()
+
+            for t in tasks:
+                if (
+                    t is not winner
+                    and t.done()
+                    and not t.cancelled()
+                    and t.exception() is None
+                ):
+                    t.result().release()
+
+        if winner is None:
+            raise tasks[0].exception()
+
+        return winner.result()
+
+
+class _HedgedRequestContextManager:
+    def __init__(self, hedger, key, req, kwargs):
+        self._hedger = hedger
+        self._key = key
+        self._req = req
+        self._kwargs = kwargs
+
+        self._resp = None
+
+    async def __aenter__(self):
+        async def make_coro():
+            return await self._req(**self._kwargs)
+
+        self._resp = await self._hedger._race(self._key, make_coro)
+        return self._resp
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._resp.release()
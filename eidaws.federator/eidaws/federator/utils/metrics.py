@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+Metrics facilities.
+"""
+
+import asyncio
+import contextlib
+
+from aiohttp import web
+
+
+# request config key of the per request transfer statistics
+KEY_REQUEST_TRANSFER_STATS = "transfer_stats"
+
+
+class Metrics:
+    """
+    Per process registry of metrics providers. A provider is a callable
+    returning a JSON serializable mapping.
+    """
+
+    def __init__(self):
+        self._providers = {}
+
+    def __contains__(self, name):
+        return name in self._providers
+
+    def register(self, name, provider):
+        self._providers[name] = provider
+
+    def unregister(self, name):
+        self._providers.pop(name, None)
+
+    def collect(self):
+        return {name: provider() for name, provider in self._providers.items()}
+
+
+def _throughput(nbytes, duration):
+    return round(nbytes / duration, 3) if duration else None
+
+
+class TransferStats:
+    """
+    Accounting of data transferred per endpoint (i.e. per network location).
+    Both the data received from endpoints (number of responses, bytes,
+    records, time spent receiving) and the data flushed to the client (bytes,
+    time spent flushing) are accounted.
+    """
+
+    _COUNTERS = (
+        "responses",
+        "bytes",
+        "records",
+        "duration",
+        "flushed_bytes",
+        "flush_duration",
+    )
+
+    def __init__(self):
+        self._endpoints = {}
+
+    def __len__(self):
+        return len(self._endpoints)
+
+    def __str__(self):
+        return ", ".join(
+            f"{netloc}: {c['bytes']} bytes, {c['records']} records in "
+            f"{c['duration']:.3f}s "
+            f"({_throughput(c['bytes'], c['duration']) or 0:.0f} B/s), "
+            f"{c['flushed_bytes']} bytes flushed in "
+            f"{c['flush_duration']:.3f}s"
+            for netloc, c in sorted(self._endpoints.items())
+        )
+
+    def account(self, netloc, **kwargs):
+        try:
+            counters = self._endpoints[netloc]
+        except KeyError:
+            counters = self._endpoints[netloc] = dict.fromkeys(
+                self._COUNTERS, 0
+            )
+
+        for k, v in kwargs.items():
+            counters[k] += v
+
+    def stats(self):
+        return {
+            netloc: {
+                **c,
+                "duration": round(c["duration"], 6),
+                "flush_duration": round(c["flush_duration"], 6),
+                "throughput": _throughput(c["bytes"], c["duration"]),
+                "flush_throughput": _throughput(
+                    c["flushed_bytes"], c["flush_duration"]
+                ),
+            }
+            for netloc, c in self._endpoints.items()
+        }
+
+
+class EventLoopLagMonitor:
+    """
+    Samples the event loop lag, i.e. the delay a callback scheduled is
+    executed with. Lags are caused by code blocking the event loop (e.g. CPU
+    bound processing).
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._task = None
+
+        self.samples = 0
+        self.lag = 0
+        self.max_lag = 0
+        self._total_lag = 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._sample())
+
+    async def stop(self):
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def _sample(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            scheduled = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.observe(max(loop.time() - scheduled, 0))
+
+    def observe(self, lag):
+        self.samples += 1
+        self.lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        self._total_lag += lag
+
+    def stats(self):
+        return {
+            "interval": self.interval,
+            "samples": self.samples,
+            "lag": round(self.lag, 6),
+            "mean_lag": (
+                round(self._total_lag / self.samples, 6)
+                if self.samples
+                else None
+            ),
+            "max_lag": round(self.max_lag, 6),
+        }
+
+
+async def handle_metrics(request):
+    return web.json_response(request.app["metrics"].collect())
+
+
+def setup_metrics(service_id, app):
+
+    metrics = Metrics()
+
+    path = app["config"][service_id]["metrics_path"]
+    if path:
+        app.router.add_get(path, handle_metrics)
+
+    app["metrics"] = metrics
+    return metrics
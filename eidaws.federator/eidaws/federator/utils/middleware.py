@@ -10,6 +10,7 @@ from aiohttp import web
 
 from eidaws.federator.settings import FED_BASE_ID
 from eidaws.federator.utils.httperror import FDSNHTTPError
+from eidaws.federator.utils.metrics import KEY_REQUEST_TRANSFER_STATS
 from eidaws.federator.version import __version__
 from eidaws.utils.settings import (
     REQUEST_CONFIG_KEY,
@@ -26,6 +27,23 @@ from eidaws.utils.misc import (
 logger = logging.getLogger(FED_BASE_ID + ".middleware")
 
 
+def log_transfers(logger, request):
+    """
+    Complement the access log with the data transferred per endpoint while
+    processing ``request``.
+    """
+    stats = request.get(KEY_REQUEST_TRANSFER_STATS)
+    if not stats:
+        return
+
+    start_time = get_req_config(request, KEY_REQUEST_STARTTIME)
+    duration = datetime.datetime.utcnow() - start_time
+    make_context_logger(logger, request).info(
+        f"{request.remote} {start_time.isoformat()} "
+        f"({duration.total_seconds():.3f}s) transfers: {stats}"
+    )
+
+
 @web.middleware
 async def before_request(request, handler):
     # set up config dict
@@ -37,7 +55,10 @@ async def before_request(request, handler):
 
     log_access(logger, request)
 
-    return await handler(request)
+    try:
+        return await handler(request)
+    finally:
+        log_transfers(logger, request)
 
 
 @web.middleware
@@ -13,10 +13,23 @@ from hashlib import md5
 
 from eidaws.federator.settings import (
     FED_BASE_ID,
+    FED_DEFAULT_CIRCUIT_BREAKER_GC_INTERVAL,
     FED_CONTENT_TYPE_VERSION,
     FED_CONTENT_TYPE_WADL,
 )
+from eidaws.federator.utils.breaker import CircuitBreakers
+from eidaws.federator.utils.budget import TaskBudget
 from eidaws.federator.utils.cache import Cache
+from eidaws.federator.utils.coalesce import FlightRegistry
+from eidaws.federator.utils.concurrency import EndpointLimiters
+from eidaws.federator.utils.executor import FileIOExecutor, XMLExecutor
+from eidaws.federator.utils.hedge import Hedger
+from eidaws.federator.utils.metrics import (
+    EventLoopLagMonitor,
+    TransferStats,
+)
+from eidaws.federator.utils.presplit import EpochDurationModel
+from eidaws.federator.utils.routing import RoutingCache, make_tableversion_url
 from eidaws.federator.utils.stats import ResponseCodeStats
 from eidaws.utils.error import ErrorWithTraceback
 
@@ -138,12 +151,49 @@ async def setup_response_code_stats(service_id, app):
         window_size=app["config"][service_id][
             "client_retry_budget_window_size"
         ],
+        backend=app["config"][service_id]["client_retry_budget_backend"],
     )
 
     app["response_code_statistics"] = stats
     return stats
 
 
+async def setup_circuit_breakers(service_id, app):
+
+    config = app["config"][service_id]
+
+    breakers = CircuitBreakers(
+        config["client_retry_budget_threshold"],
+        reset_timeout=config["circuit_breaker_reset_timeout"],
+        ttl=config["client_retry_budget_ttl"],
+        window_size=config["client_retry_budget_window_size"],
+    )
+
+    # response code statistics are garbage collected even if circuit
+    # breakers aren't synchronized
+    sync_interval = config["circuit_breaker_sync_interval"]
+    task = asyncio.create_task(
+        breakers.watch(
+            app["response_code_statistics"],
+            sync_interval or FED_DEFAULT_CIRCUIT_BREAKER_GC_INTERVAL,
+            sync=bool(sync_interval),
+        )
+    )
+
+    async def stop_watching(app):
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    app.on_cleanup.append(stop_watching)
+
+    app["metrics"].register("circuit_breakers", breakers.stats)
+    app["circuit_breakers"] = breakers
+    return breakers
+
+
 async def setup_cache(service_id, app):
 
     cache_config = app["config"][service_id]["cache_config"]
@@ -158,10 +208,200 @@ async def setup_cache(service_id, app):
         await cache.close()
 
     app.on_cleanup.append(close_cache)
+    app["metrics"].register("cache", cache.stats)
     app["cache"] = cache
     return cache
 
 
+async def setup_routing_cache(service_id, app):
+
+    config = app["config"][service_id]
+
+    if not config["routing_cache_ttl"]:
+        app["routing_cache"] = None
+        return
+
+    cache = RoutingCache(
+        config["routing_cache_ttl"], config["routing_cache_maxsize"]
+    )
+
+    if config["routing_cache_check_interval"]:
+        task = asyncio.create_task(
+            cache.watch(
+                make_tableversion_url(config["url_routing"]),
+                app["routing_http_conn_pool"],
+                config["routing_cache_check_interval"],
+            )
+        )
+
+        async def stop_watching(app):
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        app.on_cleanup.append(stop_watching)
+
+    app["metrics"].register("routing_cache", cache.stats)
+    app["routing_cache"] = cache
+    return cache
+
+
+def setup_flight_registry(service_id, app):
+
+    registry = FlightRegistry()
+
+    app["flight_registry"] = registry
+    return registry
+
+
+async def setup_task_budget(service_id, app):
+
+    config = app["config"][service_id]
+
+    # a limit of 0 disables limiting, as well
+    limits = (
+        config["task_budget"] or None,
+        config["task_budget_per_host"] or None,
+        config["task_budget_per_request"] or None,
+    )
+    if all(limit is None for limit in limits):
+        app["task_budget"] = None
+        return
+
+    budget = TaskBudget(*limits)
+
+    app["metrics"].register("task_budget", budget.stats)
+    app["task_budget"] = budget
+    return budget
+
+
+async def setup_epoch_duration_model(service_id, app):
+
+    config = app["config"][service_id]
+
+    # only available for services implementing splitting and aligning
+    if not config.get("presplitting_ttl"):
+        app["epoch_duration_model"] = None
+        return
+
+    model = EpochDurationModel(
+        app["redis_connection_pool"], ttl=config["presplitting_ttl"]
+    )
+
+    app["metrics"].register("presplitting", model.stats)
+    app["epoch_duration_model"] = model
+    return model
+
+
+def setup_hedger(service_id, app):
+
+    config = app["config"][service_id]
+
+    if not config["hedging_budget"]:
+        app["hedger"] = None
+        return
+
+    hedger = Hedger(
+        config["hedging_budget"],
+        percentile=config["hedging_percentile"],
+        min_samples=config["hedging_min_samples"],
+    )
+
+    app["metrics"].register("hedging", hedger.stats)
+    app["hedger"] = hedger
+    return hedger
+
+
+def setup_file_io_executor(service_id, app):
+
+    executor = FileIOExecutor(
+        app["config"][service_id]["file_io_threads"],
+        thread_name_prefix=service_id + ".file-io",
+    )
+
+    async def shutdown_file_io_executor(app):
+        executor.shutdown(wait=True)
+
+    app.on_cleanup.append(shutdown_file_io_executor)
+    app["metrics"].register("file_io_executor", executor.stats)
+    app["file_io_executor"] = executor
+    return executor
+
+
+def setup_xml_executor(service_id, app):
+
+    config = app["config"][service_id]
+
+    # only available for services processing XML
+    if not config.get("xml_threads"):
+        app["xml_executor"] = None
+        return
+
+    executor = XMLExecutor(
+        config["xml_threads"], thread_name_prefix=service_id + ".xml"
+    )
+
+    async def shutdown_xml_executor(app):
+        executor.shutdown(wait=True)
+
+    app.on_cleanup.append(shutdown_xml_executor)
+    app["metrics"].register("xml_executor", executor.stats)
+    app["xml_executor"] = executor
+    return executor
+
+
+async def setup_event_loop_lag_monitor(service_id, app):
+
+    interval = app["config"][service_id]["event_loop_lag_interval"]
+    if not interval:
+        app["event_loop_lag_monitor"] = None
+        return
+
+    monitor = EventLoopLagMonitor(interval)
+    monitor.start()
+
+    async def stop_event_loop_lag_monitor(app):
+        await monitor.stop()
+
+    app.on_cleanup.append(stop_event_loop_lag_monitor)
+    app["metrics"].register("event_loop_lag", monitor.stats)
+    app["event_loop_lag_monitor"] = monitor
+    return monitor
+
+
+def setup_transfer_stats(service_id, app):
+
+    stats = TransferStats()
+
+    app["metrics"].register("transfers", stats.stats)
+    app["transfer_stats"] = stats
+    return stats
+
+
+def setup_endpoint_limiters(service_id, app):
+
+    config = app["config"][service_id]
+
+    if config["endpoint_concurrency"] != "aimd":
+        app["endpoint_limiters"] = None
+        return
+
+    limiters = EndpointLimiters(
+        config["endpoint_connection_limit_per_host"],
+        min_limit=min(
+            config["endpoint_concurrency_min_limit"],
+            config["endpoint_connection_limit_per_host"],
+        ),
+        latency_threshold=config["endpoint_concurrency_latency_threshold"],
+    )
+
+    app["metrics"].register("endpoint_concurrency", limiters.stats)
+    app["endpoint_limiters"] = limiters
+    return limiters
+
+
 async def _on_prepare_static(request, response):
     if request.path.endswith("version"):
         response.headers["Content-Type"] = FED_CONTENT_TYPE_VERSION
@@ -3,10 +3,18 @@
 import asyncio
 import aioredis
 import base64
+import contextlib
 import functools
 import hashlib
 
+from urllib.parse import urlsplit
+
 from eidaws.federator.utils.cache import null_control
+from eidaws.federator.utils.concurrency import make_endpoint_key
+from eidaws.federator.utils.metrics import (
+    KEY_REQUEST_TRANSFER_STATS,
+    TransferStats,
+)
 
 
 def with_redis_exception_handling(propagate_exceptions=False):
@@ -49,11 +57,8 @@ class CachingMixin:
         return self.request.app["cache"]
 
     @property
-    def cache_buffer(self):
-        if not hasattr(self, "_cache_buffer"):
-            self._cache_buffer = []
-
-        return self._cache_buffer
+    def cache_writer(self):
+        return getattr(self, "_cache_writer", None)
 
     def make_cache_key(
         self,
@@ -100,34 +105,77 @@ class CachingMixin:
 
         return cache_key
 
-    def dump_to_cache_buffer(self, data):
+    def open_cache_writer(self, cache_key, timeout=None, **kwargs):
+        """
+        Open a cache writer for ``cache_key``. Data dumped by means of
+        :py:meth:`dump_to_cache` is streamed to the cache until the entry is
+        either committed or aborted.
+        """
         if self.cache is not None:
-            self.cache_buffer.append(data)
+            self._cache_writer = self.cache.writer(
+                cache_key, timeout=timeout, **kwargs
+            )
 
-    async def set_cache(self, cache_key, timeout=None, **kwargs):
-        await self.cache.set(
-            cache_key, b"".join(self.cache_buffer), timeout=timeout, **kwargs
-        )
+        return self.cache_writer
+
+    async def dump_to_cache(self, data):
+        """
+        Write ``data`` to the cache writer. Cache errors abort caching but are
+        not propagated.
+        """
+        writer = self.cache_writer
+        if writer is None or writer.aborted:
+            return
+
+        try:
+            await writer.write(data)
+        except Exception as err:
+            self.logger.warning(f"Error while writing to cache: {err}")
+            await self.abort_cache()
+
+    async def commit_cache(self):
+        """
+        Commit the data written to the cache writer.
+
+        :returns: ``True`` if the cache entry has been updated else ``False``.
+        """
+        writer = self.cache_writer
+        if writer is None:
+            return False
+
+        try:
+            return await writer.commit()
+        except Exception as err:
+            self.logger.warning(f"Error while committing to cache: {err}")
+            await self.abort_cache()
+            return False
 
-    async def get_cache(self, cache_key, **kwargs):
+    async def abort_cache(self):
         """
-        Lookup ``cache_key`` from the cache.
+        Abort writing to the cache and discard data already written.
         """
+        writer = self.cache_writer
+        if writer is None:
+            return
 
         try:
-            retval = await self.cache.get(cache_key, **kwargs)
-            found = True
+            await writer.abort()
+        except Exception as err:
+            self.logger.debug(f"Error while aborting cache writer: {err}")
 
-            # If the value returned by cache.get() is None, it might be
-            # because the key is not found in the cache or because the
-            # cached value is actually None
-            if retval is None:
-                found = await self.cache.exists(cache_key)
-        except Exception:
-            found = False
-            return None, found
-        else:
-            return retval, found
+    async def get_cache_reader(self, cache_key, **kwargs):
+        """
+        Lookup ``cache_key`` from the cache and return a reader for the cached
+        value.
+
+        :returns: A :py:class:`~eidaws.federator.utils.cache.CacheReader`
+            object if ``cache_key`` was found, else ``None``.
+        """
+        try:
+            return await self.cache.reader(cache_key, **kwargs)
+        except Exception as err:
+            self.logger.warning(f"Error while reading from cache: {err}")
+            return None
 
 
 class ClientRetryBudgetMixin:
@@ -141,22 +189,21 @@ class ClientRetryBudgetMixin:
     def stats_retry_budget_client(self):
         return self.request.app["response_code_statistics"]
 
-    @with_redis_exception_handling(propagate_exceptions=True)
-    async def get_cretry_budget_error_ratio(self, url):
-        """
-        Return the error ratio of a response code time series referenced by
-        ``url``.
+    @property
+    def circuit_breakers(self):
+        return self.request.app["circuit_breakers"]
 
-        :param str url: URL indicating the response code time series to be
-            garbage collected
+    def allow_cretry_budget(self, url):
+        """
+        Return whether requests to ``url`` are allowed with respect to the
+        endpoint's circuit breaker.
 
-        :returns: Error ratio in percent
-        :rtype: float
+        :param str url: URL referencing the circuit breaker
         """
-        return 100 * await self.stats_retry_budget_client.get_error_ratio(url)
+        return self.circuit_breakers.allow(url)
 
     @with_redis_exception_handling()
-    async def update_cretry_budget(self, url, code):
+    async def update_cretry_budget(self, url, code, sent_at=None):
         """
         Add ``code`` to the response code time series referenced by
         ``url``.
@@ -164,18 +211,237 @@ class ClientRetryBudgetMixin:
         :param str url: URL indicating the response code time series to be
             garbage collected
         :param int code: HTTP status code to be appended
+        :param float sent_at: Time the request was sent at
         """
+        self.circuit_breakers.record(url, code, sent_at=sent_at)
         await self.stats_retry_budget_client.add(url, code)
 
-    @with_redis_exception_handling()
-    async def gc_cretry_budget(self, url):
+
+class EndpointConcurrencyMixin:
+    """
+    Adds facilities with respect to adaptive endpoint concurrency limits to a
+    :py:class:`~eidaws.federator.utils.process.BaseRequestProcessor` or any
+    other object with a ``request`` property.
+    """
+
+    @property
+    def endpoint_limiters(self):
+        return self.request.app.get("endpoint_limiters")
+
+    def observe_endpoint(self, url, latency, code):
         """
-        Garbage collect the response code time series referenced by ``url``.
+        Report the outcome of a request to ``url`` to the endpoint's
+        concurrency limiter.
 
-        :param str url: URL indicating the response code time series to be
-            garbage collected
+        :param str url: Endpoint URL
+        :param float latency: Time to first byte in seconds
+        :param int code: HTTP status code
+        """
+        if self.endpoint_limiters is not None:
+            self.endpoint_limiters.observe(url, latency, code)
+
+    @contextlib.contextmanager
+    def acquire_endpoint_nowait(self, url):
+        """
+        Context manager acquiring a slot from the concurrency limiter of the
+        endpoint ``url`` refers to without waiting. Yields whether a slot was
+        acquired.
+
+        :param str url: Endpoint URL
+        """
+        if self.endpoint_limiters is None:
+            yield True
+            return
+
+        limiter = self.endpoint_limiters.get(make_endpoint_key(url))
+        if not limiter.acquire_nowait():
+            yield False
+            return
+
+        try:
+            yield True
+        finally:
+            limiter.release()
+
+
+class HedgingMixin:
+    """
+    Adds hedged request facilities to a
+    :py:class:`~eidaws.federator.utils.worker.BaseWorker` or any other object
+    with a ``request`` property.
+    """
+
+    @property
+    def hedger(self):
+        return self.request.app.get("hedger")
+
+    def hedge(self, req, url):
+        """
+        Return a hedging version of the request factory ``req``. If hedging
+        is disabled ``req`` is returned unmodified.
+        """
+        if self.hedger is None:
+            return req
+
+        return self.hedger.wrap(req, url)
+
+
+class TaskBudgetMixin:
+    """
+    Adds task budget facilities to a
+    :py:class:`~eidaws.federator.utils.worker.BaseWorker` or any other object
+    with a ``request`` property.
+    """
+
+    _KEY_TASK_BUDGET = "task_budget"
+
+    @property
+    def task_budget(self):
+        """
+        Return the per request task budget. ``None`` if no task budget is
+        configured.
+        """
+        task_budget = self.request.app.get("task_budget")
+        if task_budget is None:
+            return None
+
+        try:
+            return self.request[self._KEY_TASK_BUDGET]
+        except KeyError:
+            budget = task_budget.make_request_budget()
+            self.request[self._KEY_TASK_BUDGET] = budget
+            return budget
+
+    @contextlib.asynccontextmanager
+    async def acquire_task_budget(self, url):
+        """
+        Asynchronous context manager acquiring a slot from the task budget
+        for a task requesting ``url``.
+        """
+        if self.task_budget is None:
+            yield
+            return
+
+        async with self.task_budget.acquire(url):
+            yield
+
+    @contextlib.asynccontextmanager
+    async def acquire_task_budget_nowait(self, url):
+        """
+        Asynchronous context manager acquiring a slot from the task budget
+        for a task requesting ``url`` without waiting. Yields whether a slot
+        was acquired.
         """
-        await self.stats_retry_budget_client.gc(url)
+        if self.task_budget is None:
+            yield True
+            return
+
+        async with self.task_budget.acquire_nowait(url) as acquired:
+            yield acquired
+
+
+class TransferStatsMixin:
+    """
+    Adds per endpoint transfer accounting facilities to a
+    :py:class:`~eidaws.federator.utils.worker.BaseWorker` or any other object
+    with a ``request`` property. Transfers are accounted both application-wide
+    and per request.
+    """
+
+    @property
+    def transfer_stats(self):
+        """
+        Return the per request transfer statistics.
+        """
+        try:
+            return self.request[KEY_REQUEST_TRANSFER_STATS]
+        except KeyError:
+            stats = TransferStats()
+            self.request[KEY_REQUEST_TRANSFER_STATS] = stats
+            return stats
+
+    def account_transfer(self, url, **kwargs):
+        """
+        Account a transfer from/to the endpoint ``url`` refers to. Keyword
+        arguments are counters to be incremented (see also
+        :py:class:`~eidaws.federator.utils.metrics.TransferStats`).
+        """
+        netloc = urlsplit(str(url)).netloc
+        for stats in (
+            self.request.app.get("transfer_stats"),
+            self.transfer_stats,
+        ):
+            if stats is not None:
+                stats.account(netloc, **kwargs)
+
+
+class PreSplittingMixin:
+    """
+    Adds facilities with respect to pre-splitting stream epochs to a
+    :py:class:`~eidaws.federator.utils.worker.BaseWorker` or any other object
+    with a ``request`` property.
+    """
+
+    @property
+    def epoch_duration_model(self):
+        return self.request.app.get("epoch_duration_model")
+
+    # errors pre-splitting is skipped on
+    _PRESPLITTING_ERRORS = (
+        OSError,
+        aioredis.RedisError,
+        asyncio.TimeoutError,
+        ValueError,
+    )
+
+    async def learn_epoch_duration(
+        self, url, stream_epoch, num, default_endtime
+    ):
+        """
+        Learn from ``stream_epoch`` rejected by the endpoint referenced by
+        ``url`` with HTTP status code 413. Errors are logged, only.
+        """
+        if self.epoch_duration_model is None:
+            return
+
+        try:
+            await self.epoch_duration_model.learn(
+                url, stream_epoch, num, default_endtime
+            )
+        except self._PRESPLITTING_ERRORS as err:
+            self.logger.warning(
+                f"Error while learning epoch duration: {type(err)}: {err}"
+            )
+
+    async def presplit_stream_epochs(
+        self, url, stream_epochs, default_endtime
+    ):
+        """
+        Split ``stream_epochs`` with respect to the maximum stream epoch
+        duration accepted by the endpoint referenced by ``url``.
+
+        :returns: Sorted list of stream epochs. ``None`` if pre-splitting
+            isn't configured or failed.
+        """
+        if self.epoch_duration_model is None:
+            return None
+
+        retval = []
+        try:
+            for se in stream_epochs:
+                retval.extend(
+                    await self.epoch_duration_model.split(
+                        url, se, default_endtime
+                    )
+                )
+        except self._PRESPLITTING_ERRORS as err:
+            self.logger.warning(
+                f"Error while pre-splitting stream epochs: {type(err)}: "
+                f"{err}"
+            )
+            return None
+
+        return sorted(retval)
 
 
 class ConfigMixin:
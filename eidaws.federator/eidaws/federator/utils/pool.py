@@ -35,8 +35,13 @@ class Pool:
     LOGGER = FED_BASE_ID + ".pool"
 
     def __init__(
-        self, worker_coro=None, max_workers=None, timeout=None,
+        self, worker_coro=None, max_workers=None, timeout=None, limiters=None,
     ):
+        """
+        :param limiters: Optional
+            :py:class:`~eidaws.federator.utils.concurrency.EndpointLimiters`
+            object gating the dispatch of jobs submitted with a ``key``
+        """
 
         if max_workers is None:
             max_workers = self.DEFAULT_NUM_WORKERS
@@ -54,6 +59,11 @@ class Pool:
 
         self._timeout = timeout
 
+        self._limiters = limiters
+        # jobs pending due to an exceeded concurrency limit; per key
+        self._pending = {}
+        self._feeders = {}
+
     @property
     def exceptions(self):
         return self._exceptions
@@ -74,9 +84,23 @@ class Pool:
             worker_coro = self._wrap_worker_coro(self._worker_coro)
             self._worker_tasks.append(asyncio.create_task(worker_coro))
 
-    async def submit(self, *args, return_future=False, **kwargs):
+    async def submit(self, *args, return_future=False, key=None, **kwargs):
+        """
+        Submit a job.
+
+        :param key: Key (e.g. the endpoint's network location) the job's
+            concurrency is limited by. Jobs are dispatched to workers as soon
+            as the corresponding limiter grants a slot. Jobs without a key
+            are not limited.
+        """
         fut = self._loop.create_future() if return_future else None
-        await self._queue.put((fut, args, kwargs))
+        if self._limiters is None or key is None:
+            await self._queue.put((None, fut, args, kwargs))
+            return fut
+
+        self._pending.setdefault(key, deque()).append((fut, args, kwargs))
+        if key not in self._feeders:
+            self._feeders[key] = asyncio.create_task(self._feed(key))
         return fut
 
     async def join(self, timeout=None):
@@ -84,20 +108,31 @@ class Pool:
         if not self._worker_tasks:
             return True
 
+        async def _join():
+            while self._feeders:
+                await asyncio.gather(*self._feeders.values())
+            await self._queue.join()
+
         timeout = timeout or self._timeout
         try:
-            await asyncio.wait_for(self._queue.join(), timeout)
+            await asyncio.wait_for(_join(), timeout)
         except BaseException:
             raise
         else:
             return True
         finally:
+            feeders = list(self._feeders.values())
+            for feeder in feeders:
+                feeder.cancel()
+            await asyncio.gather(*feeders, return_exceptions=True)
+
             for worker in self._worker_tasks:
                 worker.cancel()
 
             results = await asyncio.gather(
                 *self._worker_tasks, return_exceptions=True
             )
+            self._release_queued()
 
             while results:
                 result = results.pop()
@@ -115,16 +150,39 @@ class Pool:
         self._worker_coro = coro
         return coro
 
+    async def _feed(self, key):
+        """
+        Move jobs pending for ``key`` to the queue whenever the limiter
+        grants a slot.
+        """
+        limiter = self._limiters.get(key)
+        pending = self._pending[key]
+        try:
+            while pending:
+                await limiter.acquire()
+                self._queue.put_nowait((limiter,) + pending.popleft())
+        finally:
+            del self._feeders[key]
+
+    def _release_queued(self):
+        # release the slots of jobs which were never processed
+        while not self._queue.empty():
+            limiter, *_ = self._queue.get_nowait()
+            self._queue.task_done()
+            if limiter is not None:
+                limiter.release()
+
     async def _wrap_worker_coro(self, coro):
 
         while True:
             fut = None
+            limiter = None
             task_received = False
             try:
                 obj = await self._queue.get()
                 task_received = True
 
-                fut, args, kwargs = obj
+                limiter, fut, args, kwargs = obj
                 result = await coro(*args, **kwargs)
 
                 if fut:
@@ -148,5 +206,7 @@ class Pool:
                 raise PoolError(err)
 
             finally:
+                if limiter is not None:
+                    limiter.release()
                 if task_received:
                     self._queue.task_done()
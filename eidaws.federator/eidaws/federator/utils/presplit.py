@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+Pre-splitting facilities.
+
+Endpoints reject requests exceeding their limits with HTTP status code 413
+(Request too large). Instead of awaiting the rejection, the maximum stream
+epoch duration an endpoint accepts is learned from past 413 responses such
+that stream epochs are split before being requested.
+"""
+
+import math
+import time
+
+from urllib.parse import urlsplit
+
+
+class EpochDurationModel:
+    """
+    Per endpoint model of the maximum stream epoch duration accepted. Since
+    the amount of data depends on the sampling rate, durations are modeled
+    per channel band code, additionally.
+
+    Durations are stored in Redis and expire after ``ttl`` seconds such that
+    they are relearned, eventually. Locally, durations are cached for
+    ``refresh_interval`` seconds.
+    """
+
+    DEFAULT_PREFIX = "presplit:max-duration"
+
+    def __init__(self, redis, ttl=86400, refresh_interval=60, prefix=None):
+        """
+        :param redis: Redis connection (pool)
+        :param int ttl: Time in seconds durations learned are kept
+        :param float refresh_interval: Time in seconds durations are cached
+            locally
+        :param str prefix: Redis key prefix
+        """
+        self.redis = redis
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+
+        self._prefix = prefix or self.DEFAULT_PREFIX
+        self._cache = {}
+
+        self.learned = 0
+        self.presplit = 0
+
+    @staticmethod
+    def _duration(stream_epoch, default_endtime):
+        end = stream_epoch.endtime or default_endtime
+        return (end - stream_epoch.starttime).total_seconds()
+
+    def make_key(self, url, stream_epoch):
+        split_result = urlsplit(url)
+        band = stream_epoch.channel[:1]
+        if band in ("", "*", "?"):
+            band = "*"
+
+        return ":".join(
+            [self._prefix, split_result.netloc + split_result.path, band]
+        )
+
+    async def get(self, url, stream_epoch):
+        """
+        Return the maximum duration in seconds of ``stream_epoch`` accepted
+        by the endpoint referenced by ``url``. ``None`` if no duration was
+        learned, yet.
+        """
+        key = self.make_key(url, stream_epoch)
+        now = time.monotonic()
+        try:
+            duration, fetched_at = self._cache[key]
+        except KeyError:
+            pass
+        else:
+            if now - fetched_at < self.refresh_interval:
+                return duration
+
+        duration = await self.redis.get(key)
+        if duration is not None:
+            duration = float(duration)
+
+        self._cache[key] = (duration, now)
+        return duration
+
+    async def learn(self, url, stream_epoch, num, default_endtime):
+        """
+        Learn from ``stream_epoch`` rejected by the endpoint referenced by
+        ``url``. The maximum duration accepted is assumed to be the duration
+        of ``stream_epoch`` split into ``num`` stream epochs.
+        """
+        key = self.make_key(url, stream_epoch)
+        duration = self._duration(stream_epoch, default_endtime) / num
+
+        # NOTE: Concurrent updates by multiple processes are not
+        # synchronized. In the worst case a larger duration is stored, which
+        # is corrected by the next 413 response.
+        current = await self.redis.get(key)
+        if current is not None:
+            duration = min(duration, float(current))
+
+        await self.redis.set(key, str(duration), expire=self.ttl)
+        self._cache[key] = (duration, time.monotonic())
+        self.learned += 1
+
+    async def split(self, url, stream_epoch, default_endtime):
+        """
+        Split ``stream_epoch`` with respect to the maximum duration accepted
+        by the endpoint referenced by ``url``.
+
+        :returns: Sorted list of stream epochs
+        """
+        max_duration = await self.get(url, stream_epoch)
+        if not max_duration:
+            return [stream_epoch]
+
+        duration = self._duration(stream_epoch, default_endtime)
+        if duration <= max_duration:
+            return [stream_epoch]
+
+        self.presplit += 1
+        return sorted(
+            stream_epoch.slice(
+                num=math.ceil(duration / max_duration),
+                default_endtime=default_endtime,
+            )
+        )
+
+    def stats(self):
+        return {
+            "learned": self.learned,
+            "presplit": self.presplit,
+            "durations": {
+                key: duration
+                for key, (duration, _) in self._cache.items()
+                if duration is not None
+            },
+        }
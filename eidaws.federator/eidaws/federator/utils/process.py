@@ -1,4 +1,5 @@
 import aiohttp
+import aioredis
 import asyncio
 import collections
 import datetime
@@ -9,15 +10,22 @@ import logging
 from dataclasses import dataclass, field
 from typing import Any
 
-from aiohttp import web
+from aiohttp import hdrs, web
 
 from eidaws.federator.settings import FED_BASE_ID
+from eidaws.federator.utils.coalesce import (
+    Flight,
+    FlightAborted,
+    RedisFlightLock,
+)
+from eidaws.federator.utils.concurrency import make_endpoint_key
 from eidaws.federator.utils.httperror import FDSNHTTPError
 from eidaws.federator.utils.misc import create_job_context
 from eidaws.federator.utils.mixin import (
     CachingMixin,
     ClientRetryBudgetMixin,
     ConfigMixin,
+    EndpointConcurrencyMixin,
 )
 from eidaws.federator.utils.pool import Pool
 from eidaws.federator.utils.request import RoutingRequestHandler
@@ -50,58 +58,222 @@ def cached(coro):
     """
     Method decorator providing caching facilities.
     """
-    ENCODING = "gzip"
 
     @functools.wraps(coro)
     async def wrapper(self, *args, **kwargs):
         async def set_cache(cache_key):
-            if self._response_sent and self.cache_buffer:
+            writer = self.cache_writer
+            if writer is None:
+                return
+
+            if self._response_sent and writer.size and not writer.aborted:
                 self.logger.debug(f"Set cache (cache_key={cache_key!r}).")
-                await self.set_cache(cache_key)
+                await self.commit_cache()
+            else:
+                if writer.aborted:
+                    self.logger.debug(
+                        f"Caching aborted (cache_key={cache_key!r}, "
+                        f"size={writer.size})."
+                    )
+                await self.abort_cache()
 
         cache_key = self.make_cache_key(
             self.query_params, self.stream_epochs, key_prefix=type(self)
         )
 
-        # use compressed cache content if available; qvalues are not
-        # taken into account
-        accept_encoding = self.request.headers.get(
-            "Accept-Encoding", ""
-        ).lower()
+        resp = await self._make_cached_response(cache_key)
 
-        cache_config = self.config["cache_config"]
-        compressed_cache = bool(
-            cache_config
-            and cache_config.get("cache_type") == "redis"
-            and cache_config.get("cache_kwargs")
-            and cache_config["cache_kwargs"].get("compress", True)
-        )
-        decompress = (
-            False
-            if not compressed_cache
-            or ENCODING in accept_encoding
-            and compressed_cache
-            else True
-        )
+        self._await_on_close.insert(0, functools.partial(set_cache, cache_key))
 
-        cached, found = await self.get_cache(cache_key, decompress=decompress)
+        if resp is not None:
+            return resp
 
-        self._await_on_close.insert(0, functools.partial(set_cache, cache_key))
+        self.open_cache_writer(cache_key)
+        return await coro(self, *args, **kwargs)
 
-        if found:
-            resp = web.Response(
-                content_type=self.content_type,
-                charset=self.charset,
-                body=cached,
+    return wrapper
+
+
+def coalesced(coro):
+    """
+    Method decorator providing request coalescing (single-flight)
+    facilities. Identical requests (with respect to the cache key) processed
+    concurrently are coalesced such that only the first request (the leader)
+    performs the federation. Requests arriving before the leader started
+    streaming (the followers) attach to the leader's response stream. Late
+    followers wait for the leader's cache entry. So do followers detached
+    due to being too slow; they resume their response from the cache.
+    Followers aren't detached if the leader's response isn't cached.
+
+    If configured, flights are additionally coalesced across processes by
+    means of a Redis lock. Since response streams cannot be shared across
+    processes, remote followers wait for the leader's cache entry.
+
+    Must be applied below :py:func:`cached`.
+    """
+
+    # headers taken over by followers
+    HEADERS = (hdrs.CONTENT_TYPE, hdrs.CONTENT_DISPOSITION)
+
+    @functools.wraps(coro)
+    async def wrapper(self, *args, **kwargs):
+        async def resume(flight, cache_key, response, offset):
+            await flight.wait(timeout=self.request_coalescing_timeout)
+
+            reader = None
+            if flight.done and flight.error is None:
+                reader = await self.get_cache_reader(
+                    cache_key, decompress=self._is_cache_compressed()
+                )
+            if reader is None:
+                raise FlightAborted(
+                    "Unable to resume response from cache "
+                    f"(cache_key={cache_key!r})"
+                )
+
+            self.logger.debug(
+                f"Resuming followed flight from cache "
+                f"(cache_key={cache_key!r}, offset={offset})."
             )
-            if decompress:
-                resp.enable_compression()
-            elif compressed_cache:
-                resp.headers["Content-Encoding"] = ENCODING
+            async for chunk in reader:
+                if offset >= len(chunk):
+                    offset -= len(chunk)
+                    continue
 
-            return resp
+                await response.write(chunk[offset:])
+                offset = 0
 
-        return await coro(self, *args, **kwargs)
+            await response.write_eof()
+            return response
+
+        async def follow(flight, cache_key):
+            queue = flight.attach()
+            if queue is None:
+                # the leader already started streaming
+                await flight.wait(timeout=self.request_coalescing_timeout)
+                return await self._make_cached_response(cache_key)
+
+            try:
+                chunk = await queue.get()
+                if chunk is Flight.OVERFLOW:
+                    await flight.wait(timeout=self.request_coalescing_timeout)
+                    return await self._make_cached_response(cache_key)
+
+                if chunk is None:
+                    # the leader didn't stream anything
+                    if isinstance(flight.error, FDSNHTTPError) and (
+                        flight.error.status in FDSNWS_NO_CONTENT_CODES
+                    ):
+                        raise FDSNHTTPError.create(
+                            self.nodata,
+                            self.request,
+                            request_submitted=self.request_submitted,
+                            service_version=__version__,
+                        )
+                    return await self._make_cached_response(cache_key)
+
+                self.logger.debug(
+                    f"Following flight (cache_key={cache_key!r})."
+                )
+                response = web.StreamResponse(headers=flight.headers)
+                await response.prepare(self.request)
+                written = 0
+                while chunk is not None:
+                    if chunk is Flight.OVERFLOW:
+                        # detached from the flight due to being too slow
+                        return await resume(
+                            flight, cache_key, response, written
+                        )
+
+                    await response.write(chunk)
+                    written += len(chunk)
+                    chunk = await queue.get()
+
+                if flight.error is not None:
+                    raise FlightAborted(flight.error)
+
+                await response.write_eof()
+                return response
+            finally:
+                flight.detach(queue)
+
+        async def lead(flight, cache_key):
+            async def tee(response, data):
+                # followers detached resume from the cache
+                writer = self.cache_writer
+                flight.feed(
+                    data,
+                    headers={
+                        k: response.headers[k]
+                        for k in HEADERS
+                        if k in response.headers
+                    },
+                    detach=writer is not None and not writer.aborted,
+                )
+                # writing to the leader's response does not necessarily
+                # yield; let followers drain their queues such that only
+                # followers actually too slow are detached
+                await asyncio.sleep(0)
+
+            lock = None
+            if self.request_coalescing == "redis":
+                lock = RedisFlightLock(
+                    self.request.app["redis_connection_pool"],
+                    cache_key,
+                    timeout=self.request_coalescing_timeout,
+                )
+                try:
+                    if not await lock.acquire():
+                        # coalesce with a flight of a different process
+                        await lock.wait()
+                        resp = await self._make_cached_response(cache_key)
+                        if resp is not None:
+                            return resp
+                except (OSError, aioredis.RedisError) as err:
+                    self.logger.warning(
+                        f"Error while coalescing (cache_key={cache_key!r}): "
+                        f"{err}"
+                    )
+
+            self._write_hooks.append(tee)
+            try:
+                return await coro(self, *args, **kwargs)
+            finally:
+                self._write_hooks.remove(tee)
+                if lock is not None:
+                    await asyncio.shield(lock.release())
+
+        if self.request_coalescing == "off":
+            return await coro(self, *args, **kwargs)
+
+        flights = self.request.app["flight_registry"]
+
+        cache_key = self.make_cache_key(
+            self.query_params, self.stream_epochs, key_prefix=type(self)
+        )
+
+        flight = flights.get(cache_key)
+        if flight is not None:
+            resp = await follow(flight, cache_key)
+            if resp is not None:
+                return resp
+
+            self.logger.debug(
+                f"Flight not followed (cache_key={cache_key!r})."
+            )
+            return await coro(self, *args, **kwargs)
+
+        flight = flights.take_off(cache_key)
+        try:
+            resp = await lead(flight, cache_key)
+        except BaseException as err:
+            flight.abort(err)
+            raise
+        else:
+            flight.land()
+            return resp
+        finally:
+            flights.remove(flight)
 
     return wrapper
 
@@ -141,7 +313,9 @@ class RequestProcessorError(ErrorWithTraceback):
     """Base RequestProcessor error ({})."""
 
 
-class BaseRequestProcessor(CachingMixin, ClientRetryBudgetMixin, ConfigMixin):
+class BaseRequestProcessor(
+    CachingMixin, ClientRetryBudgetMixin, EndpointConcurrencyMixin, ConfigMixin
+):
     """
     Abstract base class for request processors.
     """
@@ -152,6 +326,8 @@ class BaseRequestProcessor(CachingMixin, ClientRetryBudgetMixin, ConfigMixin):
 
     RESOURCE_METHOD = None
 
+    CACHE_ENCODING = "gzip"
+
     def __init__(self, request, **kwargs):
         self.request = request
 
@@ -160,9 +336,10 @@ class BaseRequestProcessor(CachingMixin, ClientRetryBudgetMixin, ConfigMixin):
 
         self._routed_urls = None
         self._response_sent = False
-        self._await_on_close = [
-            self._gc_response_code_stats,
-        ]
+        # coroutine functions called with both the response and the data
+        # written
+        self._write_hooks = []
+        self._await_on_close = []
 
         self._logger = logging.getLogger(self.LOGGER)
         self.logger = make_context_logger(self._logger, self.request)
@@ -231,6 +408,14 @@ class BaseRequestProcessor(CachingMixin, ClientRetryBudgetMixin, ConfigMixin):
     def client_retry_budget_threshold(self):
         return self.config["client_retry_budget_threshold"]
 
+    @property
+    def request_coalescing(self):
+        return self.config["request_coalescing"]
+
+    @property
+    def request_coalescing_timeout(self):
+        return self.config["request_coalescing_timeout"]
+
     async def _route(self, timeout=aiohttp.ClientTimeout(total=2 * 60)):
         req_handler = RoutingRequestHandler(
             self.config["url_routing"],
@@ -240,6 +425,24 @@ class BaseRequestProcessor(CachingMixin, ClientRetryBudgetMixin, ConfigMixin):
             method=self.RESOURCE_METHOD,
         )
 
+        routing_cache = self.request.app["routing_cache"]
+        cache_key = None
+        # routes of HTTP POST requests with an open endtime are not cached
+        # since the routing service substitutes the endtime
+        if routing_cache is not None and not (
+            self.post and any(se.endtime is None for se in self.stream_epochs)
+        ):
+            cache_key = routing_cache.make_key(req_handler, post=self.post)
+            version = routing_cache.version
+            text = routing_cache.get(cache_key)
+            if text is not None:
+                self.logger.debug("Routes served from routing cache.")
+                return await self._emerge_routes(
+                    text,
+                    post=self.post,
+                    default_endtime=self._default_endtime,
+                )
+
         async with aiohttp.ClientSession(
             connector=self.request.app["routing_http_conn_pool"],
             timeout=timeout,
@@ -287,13 +490,18 @@ class BaseRequestProcessor(CachingMixin, ClientRetryBudgetMixin, ConfigMixin):
                         service_version=__version__,
                     )
 
+                text = await resp.text()
+                if cache_key is not None:
+                    routing_cache.set(cache_key, text, version=version)
+
                 return await self._emerge_routes(
-                    await resp.text(),
+                    text,
                     post=self.post,
                     default_endtime=self._default_endtime,
                 )
 
     @cached
+    @coalesced
     async def federate(self, timeout=aiohttp.ClientTimeout(total=60)):
         try:
             self._routed_urls, routes = await self._route()
@@ -352,12 +560,80 @@ class BaseRequestProcessor(CachingMixin, ClientRetryBudgetMixin, ConfigMixin):
 
         async def write(*args, **kwargs):
             await response_write(*args, **kwargs)
-            self.dump_to_cache_buffer(*args, **kwargs)
+            await self.dump_to_cache(*args, **kwargs)
+            for hook in self._write_hooks:
+                await hook(response, *args, **kwargs)
 
         response.write = write
 
         return response
 
+    def _is_cache_compressed(self):
+        cache_config = self.config["cache_config"]
+        return bool(
+            cache_config
+            and cache_config.get("cache_type") in ("redis", "tiered")
+            and cache_config.get("cache_kwargs")
+            and cache_config["cache_kwargs"].get("compress", True)
+        )
+
+    async def _make_cached_response(self, cache_key):
+        """
+        Return a response streamed from the cache. If ``cache_key`` is not
+        cached ``None`` is returned.
+        """
+
+        # use compressed cache content if available; qvalues are not
+        # taken into account
+        accept_encoding = self.request.headers.get(
+            "Accept-Encoding", ""
+        ).lower()
+
+        compressed_cache = self._is_cache_compressed()
+        decompress = (
+            False
+            if not compressed_cache
+            or self.CACHE_ENCODING in accept_encoding
+            and compressed_cache
+            else True
+        )
+
+        reader = await self.get_cache_reader(cache_key, decompress=decompress)
+        if reader is None:
+            return None
+
+        # read ahead before preparing the response such that an expired
+        # entry still results in a federated response
+        try:
+            chunk = await reader.read()
+        except Exception as err:
+            self.logger.warning(
+                f"Error while reading from cache (cache_key={cache_key!r}): "
+                f"{err}"
+            )
+            return None
+
+        if not chunk:
+            return None
+
+        resp = web.StreamResponse()
+        resp.content_type = self.content_type
+        resp.charset = self.charset
+        if decompress:
+            resp.enable_compression()
+        else:
+            if compressed_cache:
+                resp.headers["Content-Encoding"] = self.CACHE_ENCODING
+            resp.content_length = reader.size
+
+        await resp.prepare(self.request)
+        while chunk:
+            await resp.write(chunk)
+            chunk = await reader.read()
+
+        await resp.write_eof()
+        return resp
+
     async def _make_response(
         self,
         routes,
@@ -420,13 +696,6 @@ class BaseRequestProcessor(CachingMixin, ClientRetryBudgetMixin, ConfigMixin):
             else:
                 raise TypeError("Unknown type: {type(coro_or_func)}")
 
-    async def _gc_response_code_stats(self):
-
-        self.logger.debug("Garbage collect response code statistics ...")
-
-        for url in self._routed_urls:
-            await self.gc_cretry_budget(url)
-
     async def _emerge_routes(
         self, text, post, default_endtime,
     ):
@@ -492,17 +761,14 @@ class BaseRequestProcessor(CachingMixin, ClientRetryBudgetMixin, ConfigMixin):
             if not url:
                 url = line.strip()
 
-                try:
-                    e_ratio = await self.get_cretry_budget_error_ratio(url)
-                except Exception:
-                    pass
-                else:
-                    if e_ratio > self.client_retry_budget_threshold:
-                        self.logger.warning(
-                            f"Exceeded per client retry-budget for {url}: "
-                            f"(e_ratio={e_ratio})."
-                        )
-                        skip_url = True
+                if not self.allow_cretry_budget(url):
+                    breaker = self.circuit_breakers.get(url)
+                    self.logger.warning(
+                        f"Exceeded per client retry-budget for {url}: "
+                        f"(e_ratio={breaker.error_ratio}, "
+                        f"state={breaker.state})."
+                    )
+                    skip_url = True
 
             elif not line.strip():
                 urls.add(url)
@@ -551,7 +817,11 @@ class UnsortedResponse(BaseRequestProcessor):
                 f"Creating job: context={ctx!r}, route={route!r}"
             )
             await pool.submit(
-                route, req_method=req_method, context=ctx, **req_kwargs,
+                route,
+                req_method=req_method,
+                context=ctx,
+                key=make_endpoint_key(route.url),
+                **req_kwargs,
             )
 
     async def _make_response(
@@ -587,6 +857,7 @@ class UnsortedResponse(BaseRequestProcessor):
                     worker_coro=worker.run,
                     max_workers=self.pool_size,
                     timeout=self.config["streaming_timeout"],
+                    limiters=self.endpoint_limiters,
                 ) as pool:
 
                     await self._dispatch(
@@ -673,6 +944,7 @@ class SortedResponse(BaseRequestProcessor):
                     worker_coro=worker.run,
                     max_workers=self.pool_size,
                     timeout=self.config["streaming_timeout"],
+                    limiters=self.endpoint_limiters,
                 ) as pool:
 
                     await self._dispatch(
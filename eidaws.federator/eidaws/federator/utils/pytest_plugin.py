@@ -66,6 +66,10 @@ class FakeServer:
 
     async def _handler(self, request):
         route, resp = self._find_response(request)
+        if callable(resp):
+            # response factory e.g. returning a response depending on the
+            # request
+            resp = await resp(request)
         return resp
 
     def add(self, path, method, response, **kwargs):
@@ -264,9 +268,15 @@ def server_config(request):
                 "cache_type": "redis",
                 "cache_kwargs": {"url": "redis://localhost:6379"},
             }
-        }
+        },
+        {
+            "cache_config": {
+                "cache_type": "tiered",
+                "cache_kwargs": {"url": "redis://localhost:6379"},
+            }
+        },
     ],
-    ids=["redis-cache"],
+    ids=["redis-cache", "tiered-cache"],
 )
 def cache_config(request):
     return request.param
@@ -87,6 +87,10 @@ class RequestHandlerBase:
     def stream_epochs(self):
         return self._stream_epochs
 
+    @property
+    def query_params(self):
+        return self._query_params
+
     @property
     def payload_post(self):
         raise NotImplementedError
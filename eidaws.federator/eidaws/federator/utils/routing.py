@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Routing related facilities.
+"""
+
+import aiohttp
+import asyncio
+import logging
+
+from eidaws.federator.settings import FED_BASE_ID
+from eidaws.federator.utils.cache import LRUCache
+from eidaws.federator.version import __version__
+from eidaws.utils.settings import (
+    EIDAWS_ROUTING_TABLEVERSION_METHOD_TOKEN,
+    FDSNWS_QUERY_METHOD_TOKEN,
+)
+
+
+logger = logging.getLogger(FED_BASE_ID + ".routing")
+
+
+def make_tableversion_url(url):
+    """
+    Return the routing table version URL corresponding to the routing
+    ``url``.
+    """
+    url = url.rstrip("/")
+    if url.endswith("/" + FDSNWS_QUERY_METHOD_TOKEN):
+        url = url[: -len(FDSNWS_QUERY_METHOD_TOKEN)].rstrip("/")
+
+    return "/".join([url, EIDAWS_ROUTING_TABLEVERSION_METHOD_TOKEN])
+
+
+class RoutingCache:
+    """
+    In-process cache for routing service responses.
+
+    Entries expire after ``ttl`` seconds. Besides, the cache is invalidated
+    whenever the routing table version changes (see :py:meth:`watch`).
+    """
+
+    def __init__(self, ttl, maxsize, max_entry_size=None):
+        """
+        :param int ttl: Timeout in seconds of cache entries
+        :param int maxsize: Maximum total size in bytes of the routing
+            responses cached
+        :param max_entry_size: Maximum size in bytes of a single routing
+            response cached
+        """
+        self.ttl = ttl
+        self.version = None
+
+        self._cache = LRUCache(maxsize, max_entry_size=max_entry_size)
+
+    def __len__(self):
+        return len(self._cache)
+
+    @staticmethod
+    def make_key(req_handler, post=False):
+        """
+        Create a cache key from a
+        :py:class:`~eidaws.federator.utils.request.RoutingRequestHandler`.
+        """
+        return (
+            req_handler.url,
+            bool(post),
+            tuple(sorted(req_handler.query_params.items())),
+            tuple(
+                (se.stream.id(), se.starttime, se.endtime)
+                for se in sorted(req_handler.stream_epochs)
+            ),
+        )
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, text, version=None):
+        """
+        Cache the routing response ``text``.
+
+        :param version: Routing table version the response corresponds to.
+            If the version is outdated the response is not cached.
+        """
+        if version != self.version:
+            return False
+
+        return self._cache.set(key, text, timeout=self.ttl)
+
+    def clear(self):
+        self._cache.clear()
+
+    def update_version(self, version):
+        """
+        Update the routing table version. If the version changed, the cache is
+        invalidated.
+
+        :returns: Whether the version changed.
+        :rtype: bool
+        """
+        if version == self.version:
+            return False
+
+        logger.debug(
+            f"Routing table version changed ({self.version!r} -> "
+            f"{version!r}). Invalidating routing cache."
+        )
+        self.version = version
+        self.clear()
+        return True
+
+    def stats(self):
+        return self._cache.stats()
+
+    async def watch(
+        self,
+        url,
+        connector,
+        interval,
+        timeout=aiohttp.ClientTimeout(total=10),
+    ):
+        """
+        Periodically check the routing table version.
+
+        :param str url: Routing table version URL
+        :param connector: Connector used for requesting the routing service
+        :type connector: :py:class:`aiohttp.BaseConnector`
+        :param float interval: Check interval in seconds
+        """
+        async with aiohttp.ClientSession(
+            connector=connector,
+            timeout=timeout,
+            connector_owner=False,
+            headers={"User-Agent": "EIDA-Federator/" + __version__},
+        ) as session:
+            while True:
+                try:
+                    await self._check_version(session, url)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                    logger.warning(
+                        f"Error while requesting routing table version: "
+                        f"{type(err)}: {err}"
+                    )
+                await asyncio.sleep(interval)
+
+    async def _check_version(self, session, url):
+        async with session.get(url) as resp:
+            if resp.status != 200:
+                # routing service doesn't provide a routing table version
+                logger.debug(
+                    f"Routing table version not available: {resp.status}"
+                )
+                self.update_version(None)
+                return
+
+            self.update_version((await resp.text()).strip())
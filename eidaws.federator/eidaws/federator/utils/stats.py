@@ -5,6 +5,7 @@ Facilities related with statistics.
 
 import abc
 import asyncio
+import math
 import os
 import time
 import uuid
@@ -126,12 +127,15 @@ class ResponseCodeTimeSeries(RedisCollection):
 
         self._buffer = None
 
-    async def get_error_ratio(self):
+    async def get_error_ratio(self, since=None):
         """
         Returns the error ratio of the response code time series. Values are
         between ``0`` (no errors) and ``1`` (errors only).
+
+        :param float since: If not ``None``, only response codes appended
+            after ``since`` (seconds since the epoch) are taken into account
         """
-        data = await self._data(ttl=self.ttl)
+        data = await self._data(ttl=self.ttl, since=since)
         num_errors = len(
             [code for code, t in data if int(code) in self.ERROR_CODES]
         )
@@ -203,10 +207,15 @@ class ResponseCodeTimeSeries(RedisCollection):
         Helper for getting the time series data within a transaction.
         """
         ttl = kwargs.get("ttl") or self.ttl
+        since = kwargs.get("since")
 
         now = time.time()
+        min_score = now - ttl
+        if since is not None:
+            min_score = max(min_score, since)
+
         items = await self.redis.zrevrangebyscore(
-            self.key, now, now - ttl, withscores=True
+            self.key, now, min_score, withscores=True
         )
 
         if not items:
@@ -235,18 +244,174 @@ class ResponseCodeTimeSeries(RedisCollection):
         return ttl, window_size
 
 
+class ResponseCodeCounters(RedisCollection):
+    """
+    Distributed collection implementing response code statistics by means of
+    time bucketed counters. Each bucket of ``bucket_size`` seconds maintains
+    both the total number of response codes and the number of error codes
+    within a Redis `hash <https://redis.io/topics/data-types>`_.
+
+    Compared to :py:class:`ResponseCodeTimeSeries` the memory footprint is
+    constant with respect to the number of response codes appended. Appending
+    doesn't require optimistic locking and computing the error ratio is
+    *O(buckets)*.
+
+    ..note::
+        Response codes expire with bucket granularity. Besides, the number of
+        response codes taken into account is limited by ``ttl``, only (i.e.
+        a ``window_size`` is ignored).
+    """
+
+    _DEFAULT_TTL = ResponseCodeTimeSeries._DEFAULT_TTL  # seconds
+    _DEFAULT_BUCKET_SIZE = 10  # seconds
+
+    ERROR_CODES = ResponseCodeTimeSeries.ERROR_CODES
+
+    FIELD_TOTAL = b"t"
+    FIELD_ERRORS = b"e"
+    FIELD_DELIMITER = b":"
+
+    def __init__(self, redis, key=None, **kwargs):
+        super().__init__(redis, key, **kwargs)
+
+        self.ttl = kwargs.get("ttl", self._DEFAULT_TTL)
+        self.bucket_size = kwargs.get("bucket_size", self._DEFAULT_BUCKET_SIZE)
+        if self.ttl < 0 or self.bucket_size <= 0:
+            raise ValueError("Invalid value specified.")
+
+    async def get_error_ratio(self, since=None):
+        """
+        Returns the error ratio of the response code counters. Values are
+        between ``0`` (no errors) and ``1`` (errors only).
+
+        :param float since: If not ``None``, only buckets starting after
+            ``since`` (seconds since the epoch) are taken into account
+        """
+        num_total = 0
+        num_errors = 0
+        for bucket, field, value in await self._data(since=since):
+            if field == self.FIELD_TOTAL:
+                num_total += value
+            elif field == self.FIELD_ERRORS:
+                num_errors += value
+
+        if not num_total:
+            return 0
+
+        return num_errors / num_total
+
+    async def gc(self, **kwargs):
+        """
+        Discard outdated buckets.
+        """
+        ttl = kwargs.get("ttl") or self.ttl
+        if not ttl:
+            return
+
+        thres = self._bucket(time.time() - ttl)
+        fields = await self.redis.hkeys(self.key)
+        outdated = [f for f in fields if self._parse_field(f)[0] < thres]
+        if outdated:
+            await self.redis.hdel(self.key, *outdated)
+
+    async def clear(self, **kwargs):
+        await self._clear()
+
+    async def append(self, value):
+        """
+        Count the response code ``value``.
+
+        :param int value: Response code to be appended
+        """
+        bucket = str(self._bucket(time.time())).encode(self.ENCODING)
+
+        tr = self.redis.multi_exec()
+        tr.hincrby(self.key, bucket + self.FIELD_DELIMITER + self.FIELD_TOTAL)
+        if int(value) in self.ERROR_CODES:
+            tr.hincrby(
+                self.key, bucket + self.FIELD_DELIMITER + self.FIELD_ERRORS
+            )
+        if self.ttl:
+            # the collection as a whole expires if not updated anymore
+            tr.expire(self.key, math.ceil(self.ttl + self.bucket_size))
+        await tr.execute()
+
+    async def _data(self, **kwargs):
+        """
+        Helper returning the counters of the buckets not expired as
+        ``(bucket, field, value)`` tuples.
+        """
+        ttl = kwargs.get("ttl") or self.ttl
+        since = kwargs.get("since")
+
+        now = time.time()
+        min_bucket = None
+        if ttl:
+            min_bucket = self._bucket(now - ttl)
+        if since is not None:
+            # skip the bucket containing since
+            since_bucket = self._bucket(since) + 1
+            min_bucket = (
+                since_bucket
+                if min_bucket is None
+                else max(min_bucket, since_bucket)
+            )
+
+        items = await self.redis.hgetall(self.key)
+
+        retval = []
+        for field, value in items.items():
+            bucket, field = self._parse_field(field)
+            if min_bucket is not None and bucket < min_bucket:
+                continue
+            retval.append((bucket, field, int(value)))
+
+        return retval
+
+    def _bucket(self, t):
+        return int(t // self.bucket_size)
+
+    def _parse_field(self, field):
+        bucket, field = field.split(self.FIELD_DELIMITER)
+        return int(bucket), field
+
+
 class ResponseCodeStats:
     """
     Container for datacenter response code statistics handling.
     """
 
     DEFAULT_PREFIX = b"stats:response-codes"
+    DEFAULT_PREFIX_COUNTERS = b"stats:response-code-counters"
 
-    def __init__(self, redis, prefix=None, **kwargs):
+    BACKENDS = {
+        "timeseries": ResponseCodeTimeSeries,
+        "counters": ResponseCodeCounters,
+    }
+
+    def __init__(self, redis, prefix=None, backend="timeseries", **kwargs):
+        """
+        :param redis: Redis connection (pool)
+        :param prefix: Key prefix of the response code collections
+        :param str backend: Type of the response code collections. Either
+            ``timeseries`` (see :py:class:`ResponseCodeTimeSeries`) or
+            ``counters`` (see :py:class:`ResponseCodeCounters`)
+
+        Additional keyword arguments are passed to the response code
+        collections.
+        """
+        try:
+            self._collection_type = self.BACKENDS[backend]
+        except KeyError:
+            raise ValueError(f"Invalid backend: {backend!r}")
 
         self.redis = redis
         self.kwargs_series = kwargs
 
+        if prefix is None and backend == "counters":
+            # the data types of the backends are not compatible
+            prefix = self.DEFAULT_PREFIX_COUNTERS
+
         self._prefix = prefix or self.DEFAULT_PREFIX
         if isinstance(self._prefix, str):
             self._prefix = self._prefix.encode(RedisCollection.ENCODING)
@@ -263,7 +428,7 @@ class ResponseCodeStats:
         key = self._create_key_from_url(url, prefix=self._prefix)
 
         if key not in self._map:
-            self._map[key] = ResponseCodeTimeSeries(
+            self._map[key] = self._collection_type(
                 redis=self.redis, key=key, **kwargs_series
             )
 
@@ -281,7 +446,7 @@ class ResponseCodeStats:
 
         if lazy_load and key not in self._map:
             # lazy loading
-            self._map[key] = ResponseCodeTimeSeries(
+            self._map[key] = self._collection_type(
                 redis=self.redis, key=key, **self.kwargs_series
             )
 
@@ -295,24 +460,26 @@ class ResponseCodeStats:
         except KeyError as err:
             raise StatsError(err)
 
-    async def get_error_ratio(self, url, lazy_load=True):
+    async def get_error_ratio(self, url, lazy_load=True, since=None):
         """
         Return the error ratio of a response code time series specified by
         ``url``.
 
         :param bool lazy_load: Lazily load the response code time series the
             error ratio is computed from
+        :param float since: If not ``None``, only response codes appended
+            after ``since`` (seconds since the epoch) are taken into account
         """
 
         key = self._create_key_from_url(url, prefix=self._prefix)
 
         if lazy_load and key not in self._map:
             # lazy loading
-            self._map[key] = ResponseCodeTimeSeries(
+            self._map[key] = self._collection_type(
                 redis=self.redis, key=key, **self.kwargs_series
             )
 
-        return await self._map[key].get_error_ratio()
+        return await self._map[key].get_error_ratio(since=since)
 
     def __contains__(self, url):
         return self._create_key_from_url(url) in self._map
@@ -2,13 +2,15 @@
 
 import asyncio
 import functools
+import itertools
+import mmap
 
 from aiofiles.base import AsyncBase
 from aiofiles.threadpool.utils import (
     delegate_to_executor,
     proxy_property_directly,
 )
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, contextmanager
 from functools import partial
 from tempfile import SpooledTemporaryFile as _SpooledTemporaryFile
 
@@ -132,3 +134,84 @@ class AsyncSpooledTemporaryFile(AsyncBase):
             rv = file.writelines(iterable)
             await self._check()
             return rv
+
+    @asynccontextmanager
+    async def chunks(self, chunk_size=-1, boundaries=()):
+        """
+        Async context manager providing an iterator over the file's content
+        (starting from the current position) in chunks of ``chunk_size``
+        bytes. Chunks don't span any of ``boundaries`` (i.e. ascending
+        offsets relative to the current position).
+
+        Once rolled to a file object, the file is memory mapped and chunks
+        are :py:class:`memoryview` slices of the mapping, i.e. neither
+        reading is delegated to the executor nor is data copied. Otherwise,
+        chunks are read from the in-memory buffer directly.
+        """
+        if not self._file._rolled:
+            offset = self._file.tell()
+            size = self._file.seek(0, 2) - offset
+            self._file.seek(offset)
+            yield _iter_chunks(
+                self._file.read, size, chunk_size, boundaries=boundaries
+            )
+            return
+
+        await self.flush()
+        offset = await self.tell()
+        size = await self.seek(0, 2) - offset
+        if size <= 0:
+            yield iter(())
+            return
+
+        with _mmap(self._file.fileno()) as m:
+            yield _iter_chunks(
+                _make_view_reader(memoryview(m)[offset:]),
+                size,
+                chunk_size,
+                boundaries=boundaries,
+            )
+
+
+@contextmanager
+def _mmap(fileno):
+    m = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    if hasattr(m, "madvise"):
+        m.madvise(mmap.MADV_SEQUENTIAL)
+    try:
+        yield m
+    finally:
+        try:
+            m.close()
+        except BufferError:
+            # views are still referenced (e.g. by a transport's write
+            # buffer); the mapping is released when garbage collected
+            pass
+
+
+def _make_view_reader(view):
+    pos = 0
+
+    def read(n):
+        nonlocal pos
+        chunk = view[pos : pos + n]
+        pos += len(chunk)
+        return chunk
+
+    return read
+
+
+def _iter_chunks(read, size, chunk_size, boundaries=()):
+    if chunk_size <= 0:
+        chunk_size = size
+
+    pos = 0
+    for boundary in itertools.chain(boundaries, (size,)):
+        boundary = min(boundary, size)
+        while pos < boundary:
+            chunk = read(min(chunk_size, boundary - pos))
+            if not chunk:
+                return
+
+            pos += len(chunk)
+            yield chunk
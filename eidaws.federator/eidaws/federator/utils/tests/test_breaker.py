@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+Circuit breaker related test facilities.
+"""
+
+import asyncio
+import pytest
+import time
+
+from eidaws.federator.utils.breaker import CircuitBreaker, CircuitBreakers
+
+
+URL = "http://eida.ethz.ch/fdsnws/station/1/query"
+
+
+class FakeResponseCodeStats:
+    def __init__(self, error_ratio):
+        self.error_ratio = error_ratio
+        self.since = []
+        self.collected = []
+
+    async def gc(self, url):
+        self.collected.append(url)
+
+    async def get_error_ratio(self, url, since=None):
+        self.since.append(since)
+        return self.error_ratio
+
+
+class TestCircuitBreaker:
+    def test_closed(self):
+        breaker = CircuitBreaker(50)
+
+        for c in (200, 500, 204):
+            breaker.record(c)
+
+        assert breaker.allow()
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.error_ratio == pytest.approx(100 / 3)
+
+    def test_open(self):
+        breaker = CircuitBreaker(50)
+
+        for c in (200, 503):
+            breaker.record(c)
+        assert breaker.allow()
+
+        breaker.record(504)
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+        assert breaker.opened == 1
+
+    def test_sync(self):
+        breaker = CircuitBreaker(50)
+        breaker.record(200)
+
+        breaker.sync(0.8)
+        assert not breaker.allow()
+        assert breaker.state == CircuitBreaker.OPEN
+
+    def test_half_open(self):
+        breaker = CircuitBreaker(50, reset_timeout=0)
+        breaker.record(500)
+        assert breaker.state == CircuitBreaker.OPEN
+
+        # a single probe passes
+        assert breaker.allow()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        breaker.reset_timeout = 60
+        assert not breaker.allow()
+
+        # failed probe
+        breaker.record(500)
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.opened == 2
+
+        # successful probe
+        breaker.reset_timeout = 0
+        assert breaker.allow()
+        breaker.record(200)
+        assert breaker.state == CircuitBreaker.CLOSED
+        assert breaker.error_ratio == 0
+        assert breaker.allow()
+
+    def test_half_open_outdated(self):
+        breaker = CircuitBreaker(50, reset_timeout=0)
+        sent_at = time.time() - 1
+        breaker.record(500)
+        assert breaker.allow()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+
+        # outcomes of requests sent before the probe are ignored
+        breaker.record(200, sent_at=sent_at)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+
+        breaker.record(200, sent_at=time.time())
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_window_size(self):
+        breaker = CircuitBreaker(50, window_size=2)
+
+        for c in (500, 200, 200):
+            breaker.record(c)
+
+        assert breaker.error_ratio == 0
+
+    def test_ttl(self):
+        breaker = CircuitBreaker(50, ttl=60)
+        breaker.record(500)
+        breaker._outcomes[0] = (breaker._outcomes[0][0] - 120, True)
+
+        assert breaker.error_ratio == 0
+
+
+class TestCircuitBreakers:
+    @pytest.mark.asyncio
+    async def test_sync(self):
+        breakers = CircuitBreakers(50)
+        assert breakers.allow(URL)
+        assert URL in breakers
+
+        stats = FakeResponseCodeStats(1)
+        await breakers.sync(stats)
+        assert not breakers.allow(URL)
+        assert breakers.stats()[URL]["state"] == CircuitBreaker.OPEN
+
+        # the whole window is taken into account while open
+        await breakers.sync(stats)
+        assert stats.since[-1] is None
+
+    @pytest.mark.asyncio
+    async def test_sync_closed(self):
+        breakers = CircuitBreakers(50, reset_timeout=0)
+        breakers.record(URL, 500)
+        assert breakers.allow(URL)
+        breakers.record(URL, 200)
+
+        breaker = breakers.get(URL)
+        assert breaker.state == CircuitBreaker.CLOSED
+
+        # response codes received before closing are ignored
+        stats = FakeResponseCodeStats(0)
+        await breakers.sync(stats)
+        assert stats.since == [breaker.closed_since]
+
+    @pytest.mark.asyncio
+    async def test_watch_gc_only(self):
+        breakers = CircuitBreakers(50)
+        breakers.record(URL, 200)
+
+        stats = FakeResponseCodeStats(1)
+        task = asyncio.ensure_future(breakers.watch(stats, 60, sync=False))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert stats.collected == [URL]
+        assert stats.since == []
+        assert breakers.allow(URL)
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+Task budget related test facilities.
+"""
+
+import asyncio
+import pytest
+
+from eidaws.federator.utils.budget import TaskBudget
+
+
+URL_CH = "http://eida.ethz.ch/fdsnws/station/1/query"
+URL_NL = "http://www.orfeus-eu.org/fdsnws/station/1/query"
+
+
+async def _run_tasks(budget, urls, request_budgets=None, delay=0.01):
+    in_flight = []
+    max_in_flight = []
+
+    async def task(url, request_budget):
+        async with request_budget.acquire(url):
+            in_flight.append(url)
+            max_in_flight.append(len(in_flight))
+            await asyncio.sleep(delay)
+            in_flight.remove(url)
+
+    request_budgets = request_budgets or [budget.make_request_budget()]
+    await asyncio.gather(
+        *[
+            task(url, request_budgets[i % len(request_budgets)])
+            for i, url in enumerate(urls)
+        ]
+    )
+    return max(max_in_flight)
+
+
+class TestTaskBudget:
+    @pytest.mark.asyncio
+    async def test_unlimited(self):
+        budget = TaskBudget()
+
+        assert await _run_tasks(budget, [URL_CH] * 4) == 4
+        assert budget.stats() == {}
+
+    @pytest.mark.asyncio
+    async def test_limit(self):
+        budget = TaskBudget(limit=2)
+
+        assert await _run_tasks(budget, [URL_CH, URL_NL] * 3) == 2
+        assert budget.stats() == {"limit": 2, "in_flight": 0}
+
+    @pytest.mark.asyncio
+    async def test_limit_per_host(self):
+        budget = TaskBudget(limit=3, limit_per_host=1)
+
+        assert await _run_tasks(budget, [URL_CH, URL_NL] * 3) == 2
+        assert budget.stats()["hosts"] == {
+            "eida.ethz.ch": {"limit": 1, "in_flight": 0},
+            "www.orfeus-eu.org": {"limit": 1, "in_flight": 0},
+        }
+
+    @pytest.mark.asyncio
+    async def test_limit_per_request(self):
+        budget = TaskBudget(limit_per_request=1)
+        request_budgets = [
+            budget.make_request_budget(),
+            budget.make_request_budget(),
+        ]
+
+        assert (
+            await _run_tasks(
+                budget, [URL_CH] * 6, request_budgets=request_budgets
+            )
+            == 2
+        )
+
+    @pytest.mark.asyncio
+    async def test_release_on_error(self):
+        budget = TaskBudget(limit=1, limit_per_host=1, limit_per_request=1)
+        request_budget = budget.make_request_budget()
+
+        with pytest.raises(ValueError):
+            async with request_budget.acquire(URL_CH):
+                raise ValueError
+
+        async def acquire():
+            async with request_budget.acquire(URL_CH):
+                pass
+
+        await asyncio.wait_for(acquire(), timeout=1)
+        assert budget.stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_acquire_nowait(self):
+        budget = TaskBudget(limit=2, limit_per_host=1)
+        request_budget = budget.make_request_budget()
+
+        async with request_budget.acquire_nowait(URL_CH) as acquired:
+            assert acquired
+            async with request_budget.acquire_nowait(URL_CH) as acquired:
+                assert not acquired
+                # the global slot acquired is released
+                assert budget.stats()["in_flight"] == 1
+
+            async with request_budget.acquire_nowait(URL_NL) as acquired:
+                assert acquired
+                assert budget.stats()["in_flight"] == 2
+
+        assert budget.stats()["in_flight"] == 0
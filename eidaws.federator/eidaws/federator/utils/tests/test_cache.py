@@ -5,9 +5,20 @@ Cache related test facilities.
 
 import aioredis
 import asyncio
+import gzip
+import os
 import pytest
+import time
 
-from eidaws.federator.utils.cache import RedisCache
+from eidaws.federator.utils.cache import (
+    BytesCacheReader,
+    CacheError,
+    LRUCache,
+    RedisCache,
+    RedisCacheReader,
+    RedisCacheWriter,
+    TieredCache,
+)
 
 
 @pytest.fixture
@@ -71,3 +82,323 @@ class TestRedisCache:
         await redis_cache.delete(cache_key)
 
         assert not await redis_cache.exists(cache_key)
+
+    @pytest.mark.asyncio
+    async def test_writer(self, redis_cache):
+        cache_key = "cache_key"
+        cache_value = b"foo" * 1024
+
+        redis_cache._segment_size = 64
+        writer = redis_cache.writer(cache_key)
+        for i in range(0, len(cache_value), 100):
+            await writer.write(cache_value[i : i + 100])
+
+        assert not await redis_cache.exists(cache_key)
+
+        assert await writer.commit()
+        assert writer.size == len(cache_value)
+        assert await redis_cache.get(cache_key) == cache_value
+
+    @pytest.mark.asyncio
+    async def test_writer_uncompressed(self, redis_cache):
+        cache_key = "cache_key"
+        cache_value = b"foo" * 1024
+
+        redis_cache._compress = False
+        redis_cache._segment_size = 1000
+        writer = redis_cache.writer(cache_key)
+        await writer.write(cache_value)
+        await writer.commit()
+
+        # 4 segments + manifest
+        assert await redis_cache.redis.dbsize() == 5
+        assert await redis_cache.get(cache_key) == cache_value
+
+    @pytest.mark.asyncio
+    async def test_writer_max_size(self, redis_cache):
+        cache_key = "cache_key"
+
+        redis_cache._segment_size = 8
+        writer = redis_cache.writer(cache_key, max_size=128)
+        for _ in range(16):
+            await writer.write(b"foo" * 4)
+
+        assert writer.aborted
+        assert not await writer.commit()
+        assert not await redis_cache.exists(cache_key)
+        assert await redis_cache.redis.dbsize() == 0
+
+    @pytest.mark.asyncio
+    async def test_writer_replace(self, redis_cache):
+        cache_key = "cache_key"
+
+        await redis_cache.set(cache_key, b"foo")
+        writer = redis_cache.writer(cache_key)
+        await writer.write(b"bar")
+        await writer.commit()
+
+        assert await redis_cache.get(cache_key) == b"bar"
+
+        writer = redis_cache.writer(cache_key)
+        await writer.write(b"baz")
+        await writer.commit()
+
+        assert await redis_cache.get(cache_key) == b"baz"
+
+    @pytest.mark.asyncio
+    async def test_writer_slow(self, redis_cache, monkeypatch):
+        cache_key = "cache_key"
+        cache_value = b"foo" * 1024
+
+        monkeypatch.setattr(RedisCacheWriter, "SEGMENT_TTL_GRACE", 1)
+        redis_cache._compress = False
+        redis_cache._segment_size = 64
+        writer = redis_cache.writer(cache_key, timeout=1)
+        await writer.write(cache_value)
+        # writing takes longer than the timeout
+        await asyncio.sleep(1.2)
+        assert await writer.commit()
+
+        # the segments written first outlive the manifest
+        await asyncio.sleep(0.9)
+        reader = await redis_cache.reader(cache_key)
+        assert b"".join([chunk async for chunk in reader]) == cache_value
+
+    @pytest.mark.asyncio
+    async def test_writer_expired(self, redis_cache, monkeypatch):
+        cache_key = "cache_key"
+
+        monkeypatch.setattr(RedisCacheWriter, "SEGMENT_TTL_GRACE", 0)
+        redis_cache._compress = False
+        redis_cache._segment_size = 8
+        writer = redis_cache.writer(cache_key, timeout=1)
+        await writer.write(b"foo" * 1024)
+        await asyncio.sleep(1.2)
+
+        assert not await writer.commit()
+        assert not await redis_cache.exists(cache_key)
+
+    @pytest.mark.asyncio
+    async def test_writer_delete(self, redis_cache):
+        cache_key = "cache_key"
+
+        writer = redis_cache.writer(cache_key)
+        await writer.write(b"foo")
+        await writer.commit()
+
+        await redis_cache.delete(cache_key)
+
+        assert not await redis_cache.exists(cache_key)
+        assert await redis_cache.redis.dbsize() == 0
+
+    @pytest.mark.asyncio
+    async def test_reader(self, redis_cache):
+        cache_key = "cache_key"
+        cache_value = b"foo" * 1024
+
+        redis_cache._segment_size = 64
+        writer = redis_cache.writer(cache_key)
+        await writer.write(cache_value)
+        await writer.commit()
+
+        reader = await redis_cache.reader(cache_key)
+        assert b"".join([chunk async for chunk in reader]) == cache_value
+
+        reader = await redis_cache.reader(cache_key, decompress=False)
+        assert (
+            gzip.decompress(b"".join([chunk async for chunk in reader]))
+            == cache_value
+        )
+
+    @pytest.mark.asyncio
+    async def test_reader_plain(self, redis_cache):
+        cache_key = "cache_key"
+        cache_value = b"foo" * 1024
+
+        redis_cache._compress = False
+        redis_cache._segment_size = 100
+        await redis_cache.set(cache_key, cache_value)
+
+        reader = await redis_cache.reader(cache_key)
+        assert reader.size == len(cache_value)
+        chunks = [chunk async for chunk in reader]
+        assert len(chunks) == 31
+        assert b"".join(chunks) == cache_value
+
+    @pytest.mark.asyncio
+    async def test_reader_missing(self, redis_cache):
+        assert await redis_cache.reader("cache_key") is None
+
+    @pytest.mark.asyncio
+    async def test_reader_missing_segment(self, redis_cache):
+        cache_key = "cache_key"
+
+        redis_cache._segment_size = 8
+        writer = redis_cache.writer(cache_key)
+        await writer.write(b"foo" * 1024)
+        await writer.commit()
+
+        reader = await redis_cache.reader(cache_key)
+        await redis_cache.redis.delete(reader._segment_keys[-1])
+
+        with pytest.raises(CacheError):
+            async for _ in reader:
+                pass
+
+
+@pytest.fixture
+async def tiered_cache():
+
+    DB = 15
+
+    try:
+        cache = await TieredCache.create(
+            "redis://localhost:6379",
+            db=DB,
+            timeout=1,
+            local_maxsize=1024,
+            local_max_entry_size=512,
+        )
+    except (OSError, aioredis.RedisError) as err:
+        pytest.skip(str(err))
+
+    if await cache.remote.redis.dbsize():
+        raise EnvironmentError(
+            f"Redis database number {DB} is not empty, tests could harm "
+            f"your data."
+        )
+
+    yield cache
+
+    await cache.remote.redis.flushdb()
+    await cache.close()
+
+
+class TestLRUCache:
+    def test_lru(self):
+        cache = LRUCache(8)
+        cache.set("a", b"aaaa")
+        cache.set("b", b"bbbb")
+        assert cache.get("a") == b"aaaa"
+
+        cache.set("c", b"cccc")
+        assert cache.get("b") is None
+        assert cache.get("a") == b"aaaa"
+        assert cache.get("c") == b"cccc"
+        assert cache.size == 8
+        assert cache.stats() == {
+            "hits": 3,
+            "misses": 1,
+            "evictions": 1,
+            "expirations": 0,
+            "entries": 2,
+            "size": 8,
+        }
+
+    def test_max_entry_size(self):
+        cache = LRUCache(8, max_entry_size=2)
+        assert not cache.set("a", b"aaa")
+        assert "a" not in cache
+        assert cache.size == 0
+
+    def test_timeout(self):
+        cache = LRUCache(8)
+        cache.set("a", b"a", timeout=0.01)
+        time.sleep(0.02)
+        assert cache.get("a") is None
+        assert cache.size == 0
+        assert cache.expirations == 1
+
+
+class TestTieredCache:
+    @pytest.mark.asyncio
+    async def test_read_through(self, tiered_cache):
+        cache_key = "cache_key"
+        cache_value = b"foo"
+
+        await tiered_cache.remote.set(cache_key, cache_value)
+
+        assert await tiered_cache.get(cache_key) == cache_value
+        assert await tiered_cache.get(cache_key) == cache_value
+        assert await tiered_cache.get("missing") is None
+
+        stats = tiered_cache.stats()
+        assert stats["local"]["hits"] == 1
+        assert stats["local"]["misses"] == 2
+        assert stats["redis"] == {"hits": 1, "misses": 1}
+
+        # ttl is taken over from Redis
+        _, expires = tiered_cache.local._entries[cache_key]
+        assert 299 < expires - time.monotonic() <= 300
+
+    @pytest.mark.asyncio
+    async def test_reader(self, tiered_cache):
+        cache_key = "cache_key"
+        cache_value = b"foo" * 1024
+
+        writer = tiered_cache.writer(cache_key)
+        await writer.write(cache_value)
+        assert await writer.commit()
+
+        for _ in range(2):
+            reader = await tiered_cache.reader(cache_key)
+            assert isinstance(reader, BytesCacheReader)
+            assert b"".join([c async for c in reader]) == cache_value
+
+        assert tiered_cache.stats()["redis"]["hits"] == 1
+        assert tiered_cache.stats()["local"]["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_reader_large(self, tiered_cache):
+        cache_key = "cache_key"
+        cache_value = b"foo" * 1024
+
+        await tiered_cache.set(cache_key, cache_value, compress=False)
+        assert not len(tiered_cache.local)
+
+        reader = await tiered_cache.reader(cache_key, decompress=False)
+        assert isinstance(reader, RedisCacheReader)
+        assert b"".join([c async for c in reader]) == cache_value
+        assert not len(tiered_cache.local)
+
+    @pytest.mark.asyncio
+    async def test_reader_large_compressed(self, tiered_cache, monkeypatch):
+        cache_key = "cache_key"
+        # incompressible
+        cache_value = os.urandom(1024)
+
+        await tiered_cache.set(cache_key, cache_value)
+        tiered_cache.local.clear()
+
+        calls = []
+        reader = tiered_cache.remote.reader
+
+        async def remote_reader(key, **kwargs):
+            calls.append(kwargs)
+            return await reader(key, **kwargs)
+
+        monkeypatch.setattr(tiered_cache.remote, "reader", remote_reader)
+
+        reader = await tiered_cache.reader(cache_key)
+        assert isinstance(reader, RedisCacheReader)
+        assert b"".join([c async for c in reader]) == cache_value
+        assert not len(tiered_cache.local)
+
+        # the entry is looked up from Redis once, only
+        assert len(calls) == 1
+        assert tiered_cache.stats()["redis"]["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidate(self, tiered_cache):
+        cache_key = "cache_key"
+
+        await tiered_cache.set(cache_key, b"foo")
+        assert await tiered_cache.get(cache_key) == b"foo"
+
+        writer = tiered_cache.writer(cache_key)
+        await writer.write(b"bar")
+        await writer.commit()
+        assert await tiered_cache.get(cache_key) == b"bar"
+
+        await tiered_cache.delete(cache_key)
+        assert await tiered_cache.get(cache_key) is None
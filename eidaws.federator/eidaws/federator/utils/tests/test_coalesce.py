@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+Request coalescing related test facilities.
+"""
+
+import aioredis
+import asyncio
+import pytest
+
+from eidaws.federator.utils.coalesce import (
+    CoalescingError,
+    Flight,
+    FlightRegistry,
+    RedisFlightLock,
+)
+
+
+@pytest.fixture
+async def redis():
+
+    DB = 15
+
+    try:
+        redis = await aioredis.create_redis_pool(
+            "redis://localhost:6379", db=DB, timeout=1
+        )
+    except (OSError, aioredis.RedisError) as err:
+        pytest.skip(str(err))
+
+    if await redis.dbsize():
+        raise EnvironmentError(
+            f"Redis database number {DB} is not empty, tests could harm "
+            f"your data."
+        )
+
+    yield redis
+
+    await redis.flushdb()
+    redis.close()
+    await redis.wait_closed()
+
+
+async def _consume(queue):
+    chunks = []
+    while True:
+        chunk = await queue.get()
+        if chunk is None:
+            return chunks
+        chunks.append(chunk)
+
+
+class TestFlight:
+    @pytest.mark.asyncio
+    async def test_tee(self):
+        flight = Flight("key")
+        queues = [flight.attach(), flight.attach()]
+
+        flight.feed(b"foo", headers={"Content-Type": "text/plain"})
+        flight.feed(bytearray(b"bar"))
+        flight.land()
+
+        for queue in queues:
+            assert await _consume(queue) == [b"foo", b"bar"]
+
+        assert flight.headers == {"Content-Type": "text/plain"}
+        assert flight.done
+        assert flight.error is None
+
+    @pytest.mark.asyncio
+    async def test_slow_follower(self):
+        flight = Flight("key", maxsize=2)
+        slow, fast = flight.attach(), flight.attach()
+
+        chunks = [b"foo", b"bar", b"baz"]
+        consumer = asyncio.ensure_future(_consume(fast))
+        for chunk in chunks:
+            flight.feed(chunk)
+            await asyncio.sleep(0)
+        flight.land()
+
+        assert await consumer == chunks
+        # queued chunks are discarded when detaching
+        assert slow.qsize() == 1
+        assert slow.get_nowait() is Flight.OVERFLOW
+
+    @pytest.mark.asyncio
+    async def test_slow_follower_not_detached(self):
+        flight = Flight("key", maxsize=2)
+        slow = flight.attach()
+
+        chunks = [b"foo", b"bar", b"baz"]
+        for chunk in chunks:
+            flight.feed(chunk, detach=False)
+        flight.land()
+
+        assert await _consume(slow) == chunks
+
+    def test_invalid_maxsize(self):
+        with pytest.raises(ValueError):
+            Flight("key", maxsize=0)
+
+    @pytest.mark.asyncio
+    async def test_attach_started(self):
+        flight = Flight("key")
+        flight.feed(b"foo")
+
+        assert flight.attach() is None
+
+    @pytest.mark.asyncio
+    async def test_abort(self):
+        flight = Flight("key")
+        queue = flight.attach()
+
+        err = ValueError("foo")
+        flight.abort(err)
+
+        assert await _consume(queue) == []
+        assert flight.error is err
+        assert flight.done
+
+    @pytest.mark.asyncio
+    async def test_wait_timeout(self):
+        flight = Flight("key")
+        assert not await flight.wait(timeout=0.01)
+
+
+class TestFlightRegistry:
+    def test_take_off(self):
+        registry = FlightRegistry()
+        flight = registry.take_off("key")
+
+        assert "key" in registry
+        assert registry.get("key") is flight
+        with pytest.raises(CoalescingError):
+            registry.take_off("key")
+
+        registry.remove(flight)
+        assert not len(registry)
+
+
+class TestRedisFlightLock:
+    @pytest.mark.asyncio
+    async def test_acquire_release(self, redis):
+        lock = RedisFlightLock(redis, "key", timeout=10)
+        other = RedisFlightLock(redis, "key", timeout=10)
+
+        assert await lock.acquire()
+        assert not await other.acquire()
+
+        # releasing a lock not owned is a no-op
+        await other.release()
+        assert await redis.exists(lock.key)
+
+        await lock.release()
+        assert not await redis.exists(lock.key)
+        assert await other.acquire()
+
+    @pytest.mark.asyncio
+    async def test_wait(self, redis):
+        lock = RedisFlightLock(redis, "key", timeout=10)
+        other = RedisFlightLock(redis, "key", timeout=10)
+
+        assert await lock.acquire()
+        assert not await other.wait(timeout=0.1)
+
+        loop = asyncio.get_event_loop()
+        loop.call_later(0.1, lambda: loop.create_task(lock.release()))
+        assert await other.wait(timeout=1)
+
+    @pytest.mark.asyncio
+    async def test_expire(self, redis):
+        lock = RedisFlightLock(redis, "key", timeout=0.05)
+
+        assert await lock.acquire()
+        await asyncio.sleep(0.1)
+        assert not await redis.exists(lock.key)
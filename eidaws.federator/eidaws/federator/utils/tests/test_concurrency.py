@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+Endpoint concurrency related test facilities.
+"""
+
+import asyncio
+import pytest
+
+from eidaws.federator.utils.concurrency import (
+    AIMDLimiter,
+    EndpointLimiters,
+    make_endpoint_key,
+)
+from eidaws.federator.utils.pool import Pool
+
+
+def test_make_endpoint_key():
+    assert (
+        make_endpoint_key("http://www.orfeus-eu.org/fdsnws/station/1/query")
+        == "www.orfeus-eu.org"
+    )
+    assert (
+        make_endpoint_key(
+            "http://eida.ethz.ch/fdsnws/station/1/query",
+            "http://eida.ethz.ch/fdsnws/dataselect/1/query",
+        )
+        == "eida.ethz.ch"
+    )
+    assert (
+        make_endpoint_key(
+            "http://eida.ethz.ch/fdsnws/station/1/query",
+            "http://www.orfeus-eu.org/fdsnws/station/1/query",
+        )
+        is None
+    )
+
+
+class TestAIMDLimiter:
+    def test_invalid_limits(self):
+        with pytest.raises(ValueError):
+            AIMDLimiter(1, min_limit=2)
+
+    def test_additive_increase(self):
+        limiter = AIMDLimiter(4, initial_limit=2)
+
+        # increase by one per window of limit requests
+        limiter.observe(0.1, 200)
+        limiter.observe(0.1, 204)
+        assert limiter.limit == 2
+        limiter.observe(0.1, 200)
+        assert limiter.limit == 3
+        assert limiter.successes == 3
+
+        for _ in range(10):
+            limiter.observe(0.1, 200)
+        assert limiter.limit == 4
+
+    def test_multiplicative_decrease(self):
+        limiter = AIMDLimiter(8)
+
+        limiter.observe(0.1, 503)
+        assert limiter.limit == 4
+        # requests issued before the last decrease are ignored
+        limiter.observe(0.1, 500)
+        assert limiter.limit == 4
+        assert limiter.errors == 2
+        assert limiter.decreases == 1
+
+        limiter._last_decrease -= 1
+        limiter.observe(0.1, 429)
+        assert limiter.limit == 2
+
+        limiter._last_decrease -= 1
+        limiter.observe(0.1, 503)
+        limiter._last_decrease -= 1
+        limiter.observe(0.1, 503)
+        assert limiter.limit == 1
+
+    def test_latency_threshold(self):
+        limiter = AIMDLimiter(8, latency_threshold=1)
+
+        limiter.observe(0.5, 200)
+        assert limiter.limit == 8
+        limiter.observe(2, 200)
+        assert limiter.limit == 4
+
+    @pytest.mark.asyncio
+    async def test_acquire_release(self):
+        limiter = AIMDLimiter(2)
+
+        await limiter.acquire()
+        await limiter.acquire()
+        assert limiter.locked()
+
+        task = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.waiting == 1
+        assert not task.done()
+
+        limiter.release()
+        assert await task
+        assert limiter.inflight == 2
+        assert not limiter.waiting
+
+    @pytest.mark.asyncio
+    async def test_acquire_nowait(self):
+        limiter = AIMDLimiter(1)
+
+        assert limiter.acquire_nowait()
+        assert not limiter.acquire_nowait()
+
+        task = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        limiter.release()
+        # waiters take precedence
+        assert not limiter.acquire_nowait()
+        assert await task
+        assert limiter.inflight == 1
+
+    @pytest.mark.asyncio
+    async def test_acquire_cancelled(self):
+        limiter = AIMDLimiter(1)
+        await limiter.acquire()
+
+        task = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert not limiter.waiting
+        limiter.release()
+        assert limiter.inflight == 0
+
+
+class TestEndpointLimiters:
+    def test_observe(self):
+        limiters = EndpointLimiters(10)
+        limiters.observe("http://eida.ethz.ch/fdsnws/station/1/query", 1, 503)
+
+        assert "eida.ethz.ch" in limiters
+        assert limiters.stats()["eida.ethz.ch"]["limit"] == 5
+
+
+class TestPool:
+    @pytest.mark.asyncio
+    async def test_limited(self):
+        limiters = EndpointLimiters(2)
+        running = {"a": 0, "b": 0}
+        max_running = {"a": 0, "b": 0}
+        done = []
+
+        async def worker(key, delay):
+            running[key] += 1
+            max_running[key] = max(max_running[key], running[key])
+            await asyncio.sleep(delay)
+            running[key] -= 1
+            done.append(key)
+
+        async with Pool(
+            worker_coro=worker, max_workers=4, limiters=limiters
+        ) as pool:
+            for _ in range(6):
+                await pool.submit("a", 0.02, key="a")
+            await pool.submit("b", 0, key="b")
+
+        assert max_running == {"a": 2, "b": 1}
+        assert len(done) == 7
+        # jobs for a saturated endpoint don't block others
+        assert done.index("b") < 2
+        assert limiters.get("a").inflight == 0
+
+    @pytest.mark.asyncio
+    async def test_timeout(self):
+        limiters = EndpointLimiters(1)
+
+        async def worker(delay):
+            await asyncio.sleep(delay)
+
+        with pytest.raises(asyncio.TimeoutError):
+            async with Pool(
+                worker_coro=worker,
+                max_workers=2,
+                timeout=0.05,
+                limiters=limiters,
+            ) as pool:
+                for _ in range(3):
+                    await pool.submit(1, key="a")
+
+        # slots of both processed and pending jobs are released
+        assert limiters.get("a").inflight == 0
+        assert not limiters.get("a").waiting
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+Executor related test facilities.
+"""
+
+import threading
+
+from eidaws.federator.utils.executor import FileIOExecutor, XMLExecutor
+
+
+class TestFileIOExecutor:
+    def test_stats(self):
+        event = threading.Event()
+
+        with FileIOExecutor(1) as executor:
+            futures = [executor.submit(event.wait) for _ in range(3)]
+            stats = executor.stats()
+            assert stats["pending"] == 3
+            assert stats["threads"] == 1
+
+            event.set()
+            for f in futures:
+                f.result()
+
+        stats = executor.stats()
+        assert stats["pending"] == 0
+        assert stats["max_pending"] == 3
+        assert stats["submitted"] == 3
+
+
+class TestXMLExecutor:
+    def test_bind(self):
+        executor = XMLExecutor(2)
+
+        with executor.bind() as a, executor.bind() as b:
+            # jobs are bound to the least loaded thread
+            assert a is not b
+            assert executor.stats()["bound"] == 2
+
+            with executor.bind() as c:
+                assert c in (a, b)
+                assert c.submit(threading.get_ident).result() == (
+                    c.submit(threading.get_ident).result()
+                )
+
+        assert executor.stats()["bound"] == 0
+        executor.shutdown()
@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+"""
+Hedged request related test facilities.
+"""
+
+import aiohttp
+import asyncio
+import functools
+import pytest
+
+from aiohttp import web
+
+from eidaws.federator.utils.hedge import HedgeBudget, Hedger, LatencyTracker
+
+
+class FakeResponse:
+    def __init__(self, name):
+        self.name = name
+        self.released = False
+
+    def release(self):
+        self.released = True
+
+
+def _make_coro_factory(*delays_or_errors):
+    """
+    Return a coroutine factory returning a :py:class:`FakeResponse` after the
+    delay configured per call. Exceptions configured are raised, instead.
+    """
+    calls = list(delays_or_errors)
+    responses = []
+
+    def make_coro():
+        delay = calls.pop(0)
+        name = len(responses)
+
+        async def coro():
+            if isinstance(delay, Exception):
+                raise delay
+            await asyncio.sleep(delay)
+            resp = FakeResponse(name)
+            responses.append(resp)
+            return resp
+
+        return coro()
+
+    return make_coro, responses
+
+
+def _make_hedger(budget=100, delay=0.01, **kwargs):
+    hedger = Hedger(budget, min_samples=1, **kwargs)
+    hedger.observe("key", delay)
+    return hedger
+
+
+class TestLatencyTracker:
+    def test_percentile(self):
+        tracker = LatencyTracker(window_size=100)
+        assert tracker.percentile(95) is None
+
+        for i in range(1, 101):
+            tracker.observe(i)
+
+        assert tracker.percentile(95) == 95
+        assert tracker.percentile(50) == 50
+        assert tracker.percentile(100) == 100
+
+    def test_window(self):
+        tracker = LatencyTracker(window_size=2)
+        for latency in (10, 1, 2):
+            tracker.observe(latency)
+
+        assert len(tracker) == 2
+        assert tracker.percentile(100) == 2
+
+
+class TestHedgeBudget:
+    def test_budget(self):
+        budget = HedgeBudget(50)
+
+        budget.deposit()
+        assert not budget.withdraw()
+        budget.deposit()
+        assert budget.withdraw()
+        assert not budget.withdraw()
+
+    def test_burst(self):
+        budget = HedgeBudget(100, burst=2)
+        for _ in range(5):
+            budget.deposit()
+
+        assert budget.withdraw()
+        assert budget.withdraw()
+        assert not budget.withdraw()
+
+
+class TestHedger:
+    @pytest.mark.asyncio
+    async def test_not_enough_samples(self):
+        hedger = Hedger(100, min_samples=2)
+        hedger.observe("key", 0.01)
+        make_coro, _ = _make_coro_factory(0.05)
+
+        resp = await hedger._race("key", make_coro)
+        assert resp.name == 0
+        assert not hedger.hedges
+
+    @pytest.mark.asyncio
+    async def test_fast(self):
+        hedger = _make_hedger(delay=0.1)
+        make_coro, _ = _make_coro_factory(0)
+
+        resp = await hedger._race("key", make_coro)
+        assert resp.name == 0
+        assert not hedger.hedges
+        assert hedger.requests == 1
+
+    @pytest.mark.asyncio
+    async def test_hedged(self):
+        hedger = _make_hedger()
+        make_coro, responses = _make_coro_factory(0.5, 0)
+
+        resp = await hedger._race("key", make_coro)
+        # the slow primary request is cancelled i.e. the only response
+        # returned is the hedged request's one
+        assert responses == [resp]
+        assert hedger.hedges == 1
+        assert hedger.wins == 1
+
+    @pytest.mark.asyncio
+    async def test_hedged_primary_wins(self):
+        hedger = _make_hedger()
+        make_coro, responses = _make_coro_factory(0.02, 0.5)
+
+        resp = await hedger._race("key", make_coro)
+        assert resp is responses[0]
+        assert hedger.hedges == 1
+        assert not hedger.wins
+
+    @pytest.mark.asyncio
+    async def test_hedged_error(self):
+        hedger = _make_hedger()
+        make_coro, _ = _make_coro_factory(0.05, aiohttp.ClientError())
+
+        # the failed hedged request is ignored
+        resp = await hedger._race("key", make_coro)
+        assert resp.name == 0
+
+        make_coro, _ = _make_coro_factory(
+            aiohttp.ClientError("primary"), aiohttp.ClientError("secondary")
+        )
+        with pytest.raises(aiohttp.ClientError, match="primary"):
+            await hedger._race("key", make_coro)
+
+    @pytest.mark.asyncio
+    async def test_budget_exceeded(self):
+        hedger = _make_hedger(budget=50)
+        make_coro, _ = _make_coro_factory(0.05)
+
+        await hedger._race("key", make_coro)
+        assert not hedger.hedges
+
+    async def test_wrap(self, aiohttp_client):
+        delays = [0.5, 0]
+
+        async def handler(request):
+            await asyncio.sleep(delays.pop(0))
+            return web.Response(text="foo")
+
+        app = web.Application()
+        app.router.add_get("/", handler)
+        client = await aiohttp_client(app)
+        url = str(client.make_url("/"))
+
+        hedger = Hedger(100, min_samples=1)
+        hedger.observe(client.make_url("/").raw_authority, 0.01)
+
+        async with aiohttp.ClientSession() as session:
+            req = hedger.wrap(functools.partial(session.get, url), url)
+            async with req() as resp:
+                assert resp.status == 200
+                assert await resp.text() == "foo"
+
+        assert hedger.hedges == 1
+        assert hedger.wins == 1
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+"""
+Metrics related test facilities.
+"""
+
+import asyncio
+import pytest
+import time
+
+from eidaws.federator.utils.metrics import EventLoopLagMonitor, TransferStats
+
+
+class TestEventLoopLagMonitor:
+    @pytest.mark.asyncio
+    async def test_lag(self):
+        monitor = EventLoopLagMonitor(0.01)
+        monitor.start()
+
+        await asyncio.sleep(0.05)
+        # block the event loop
+        time.sleep(0.1)
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+
+        stats = monitor.stats()
+        assert stats["samples"] > 1
+        assert stats["max_lag"] >= 0.05
+        assert stats["mean_lag"] < stats["max_lag"]
+
+
+class TestTransferStats:
+    def test_account(self):
+        stats = TransferStats()
+        assert not stats
+
+        stats.account("eida.ethz.ch", responses=1, bytes=1024, duration=2)
+        stats.account("eida.ethz.ch", responses=1, bytes=1024, duration=2)
+        stats.account("geofon.gfz-potsdam.de", flushed_bytes=512)
+
+        stats = stats.stats()
+        assert stats["eida.ethz.ch"]["responses"] == 2
+        assert stats["eida.ethz.ch"]["bytes"] == 2048
+        assert stats["eida.ethz.ch"]["throughput"] == 512
+        assert stats["eida.ethz.ch"]["flush_throughput"] is None
+        assert stats["geofon.gfz-potsdam.de"]["flushed_bytes"] == 512
+        assert stats["geofon.gfz-potsdam.de"]["bytes"] == 0
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""
+Pre-splitting related test facilities.
+"""
+
+import aioredis
+import datetime
+import logging
+import pytest
+
+from eidaws.federator.utils.mixin import PreSplittingMixin
+from eidaws.federator.utils.presplit import EpochDurationModel
+from eidaws.utils.sncl import Stream, StreamEpoch
+
+
+URL = "http://eida.ethz.ch/fdsnws/dataselect/1/query"
+ENDTIME = datetime.datetime(2020, 1, 1)
+
+
+@pytest.fixture
+async def redis():
+
+    DB = 15
+
+    try:
+        redis = await aioredis.create_redis_pool(
+            "redis://localhost:6379", db=DB, timeout=1
+        )
+    except (OSError, aioredis.RedisError) as err:
+        pytest.skip(str(err))
+
+    if await redis.dbsize():
+        raise EnvironmentError(
+            f"Redis database number {DB} is not empty, tests could harm "
+            f"your data."
+        )
+
+    yield redis
+
+    await redis.flushdb()
+    redis.close()
+    await redis.wait_closed()
+
+
+class _FailingRedis:
+    async def get(self, key):
+        raise aioredis.ConnectionClosedError("Connection closed")
+
+    async def set(self, key, value, **kwargs):
+        raise aioredis.ConnectionClosedError("Connection closed")
+
+
+class _CorruptedRedis:
+    async def get(self, key):
+        return b"invalid"
+
+
+class _Request:
+    def __init__(self, epoch_duration_model):
+        self.app = {"epoch_duration_model": epoch_duration_model}
+
+
+class _PreSplitter(PreSplittingMixin):
+    def __init__(self, epoch_duration_model):
+        self.request = _Request(epoch_duration_model)
+        self.logger = logging.getLogger(__name__)
+
+
+def _make_stream_epoch(cha="LHZ", days=8, endtime=True):
+    return StreamEpoch(
+        Stream(network="CH", station="HASLI", location="", channel=cha),
+        starttime=datetime.datetime(2019, 1, 1),
+        endtime=(
+            datetime.datetime(2019, 1, 1) + datetime.timedelta(days=days)
+            if endtime
+            else None
+        ),
+    )
+
+
+class TestEpochDurationModel:
+    @pytest.mark.asyncio
+    async def test_not_learned(self, redis):
+        model = EpochDurationModel(redis)
+        se = _make_stream_epoch()
+
+        assert await model.get(URL, se) is None
+        assert await model.split(URL, se, ENDTIME) == [se]
+
+    @pytest.mark.asyncio
+    async def test_learn(self, redis):
+        model = EpochDurationModel(redis)
+        se = _make_stream_epoch()
+
+        await model.learn(URL, se, 2, ENDTIME)
+        assert await model.get(URL, se) == 4 * 86400
+
+        # the smallest duration is kept
+        await model.learn(URL, _make_stream_epoch(days=16), 2, ENDTIME)
+        assert await model.get(URL, se) == 4 * 86400
+        await model.learn(URL, _make_stream_epoch(days=4), 2, ENDTIME)
+        assert await model.get(URL, se) == 2 * 86400
+
+        # shared by means of Redis
+        other = EpochDurationModel(redis)
+        assert await other.get(URL, se) == 2 * 86400
+        assert model.learned == 3
+
+    @pytest.mark.asyncio
+    async def test_band_code(self, redis):
+        model = EpochDurationModel(redis)
+
+        await model.learn(URL, _make_stream_epoch(cha="HHZ"), 2, ENDTIME)
+        assert await model.get(URL, _make_stream_epoch(cha="HHN")) is not None
+        assert await model.get(URL, _make_stream_epoch(cha="LHZ")) is None
+
+    @pytest.mark.asyncio
+    async def test_split(self, redis):
+        model = EpochDurationModel(redis)
+        await model.learn(URL, _make_stream_epoch(days=6), 2, ENDTIME)
+
+        se = _make_stream_epoch(days=3)
+        assert await model.split(URL, se, ENDTIME) == [se]
+
+        se = _make_stream_epoch(days=8)
+        splitted = await model.split(URL, se, ENDTIME)
+        assert len(splitted) == 3
+        assert splitted[0].starttime == se.starttime
+        assert splitted[-1].endtime == se.endtime
+        assert model.presplit == 1
+
+    @pytest.mark.asyncio
+    async def test_split_open_endtime(self, redis):
+        model = EpochDurationModel(redis)
+        se = _make_stream_epoch(endtime=False)
+        await model.learn(URL, se, 2, ENDTIME)
+
+        splitted = await model.split(URL, se, ENDTIME)
+        assert len(splitted) == 2
+        assert splitted[-1].endtime == ENDTIME
+
+    @pytest.mark.asyncio
+    async def test_ttl(self, redis):
+        model = EpochDurationModel(redis, ttl=60)
+        se = _make_stream_epoch()
+        await model.learn(URL, se, 2, ENDTIME)
+
+        ttl = await redis.ttl(model.make_key(URL, se))
+        assert 0 < ttl <= 60
+
+
+class TestPreSplittingMixin:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "faked_redis", [_FailingRedis(), _CorruptedRedis()]
+    )
+    async def test_error(self, faked_redis, caplog):
+        presplitter = _PreSplitter(EpochDurationModel(faked_redis))
+        se = _make_stream_epoch()
+
+        assert (
+            await presplitter.presplit_stream_epochs(URL, [se], ENDTIME)
+            is None
+        )
+        await presplitter.learn_epoch_duration(URL, se, 2, ENDTIME)
+        assert len(caplog.records) == 2
+
+    @pytest.mark.asyncio
+    async def test_not_configured(self):
+        presplitter = _PreSplitter(None)
+        se = _make_stream_epoch()
+
+        assert (
+            await presplitter.presplit_stream_epochs(URL, [se], ENDTIME)
+            is None
+        )
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Routing related test facilities.
+"""
+
+import aiohttp
+import datetime
+
+from aiohttp import web
+
+from eidaws.federator.utils.request import RoutingRequestHandler
+from eidaws.federator.utils.routing import RoutingCache, make_tableversion_url
+from eidaws.utils.sncl import StreamEpoch
+
+
+URL_ROUTING = "http://localhost/eidaws/routing/1/query"
+
+
+def _make_handler(stream_epochs, **query_params):
+    query_params.setdefault("service", "station")
+    return RoutingRequestHandler(
+        URL_ROUTING, stream_epochs, query_params, access="any"
+    )
+
+
+class TestRoutingCache:
+    def test_make_tableversion_url(self):
+        assert (
+            make_tableversion_url(URL_ROUTING)
+            == "http://localhost/eidaws/routing/1/tableversion"
+        )
+
+    def test_make_key(self):
+        se_0 = StreamEpoch.from_sncl(
+            net="CH", start=datetime.datetime(2020, 1, 1)
+        )
+        se_1 = StreamEpoch.from_sncl(
+            net="GR", start=datetime.datetime(2020, 1, 1)
+        )
+
+        key = RoutingCache.make_key(_make_handler([se_0, se_1]))
+        assert hash(key)
+        assert key == RoutingCache.make_key(_make_handler([se_1, se_0]))
+        assert key != RoutingCache.make_key(
+            _make_handler([se_0, se_1]), post=True
+        )
+        assert key != RoutingCache.make_key(
+            _make_handler([se_0, se_1], level="network")
+        )
+
+    def test_get_set(self):
+        cache = RoutingCache(ttl=60, maxsize=1024)
+
+        assert cache.set("key", "text")
+        assert cache.get("key") == "text"
+        assert cache.get("missing") is None
+
+    def test_update_version(self):
+        cache = RoutingCache(ttl=60, maxsize=1024)
+        cache.update_version("v0")
+        cache.set("key", "text", version="v0")
+
+        assert not cache.update_version("v0")
+        assert len(cache) == 1
+        assert cache.update_version("v1")
+        assert not len(cache)
+
+        # outdated responses are not cached
+        assert not cache.set("key", "text", version="v0")
+        assert cache.get("key") is None
+
+    async def test_check_version(self, aiohttp_client):
+        versions = ["v0", "v1"]
+
+        async def handler(request):
+            return web.Response(text=versions.pop(0) + "\n")
+
+        app = web.Application()
+        app.router.add_get("/eidaws/routing/1/tableversion", handler)
+        client = await aiohttp_client(app)
+
+        cache = RoutingCache(ttl=60, maxsize=1024)
+        url = client.make_url("/eidaws/routing/1/tableversion")
+
+        async with aiohttp.ClientSession() as session:
+            await cache._check_version(session, url)
+            assert cache.version == "v0"
+            cache.set("key", "text", version="v0")
+
+            await cache._check_version(session, url)
+            assert cache.version == "v1"
+            assert cache.get("key") is None
+
+            # version not available
+            await cache._check_version(session, url)
+            assert cache.version is None
@@ -6,8 +6,13 @@ Statistics related test facilities.
 import aioredis
 import asyncio
 import pytest
+import time
 
-from eidaws.federator.utils.stats import ResponseCodeTimeSeries
+from eidaws.federator.utils.stats import (
+    ResponseCodeCounters,
+    ResponseCodeStats,
+    ResponseCodeTimeSeries,
+)
 
 
 @pytest.fixture
@@ -107,3 +112,93 @@ class TestResponseCodeTimeSeries:
             await ts.append(c)
 
         assert await ts.get_error_ratio() == 0.5
+
+    @pytest.mark.asyncio
+    async def test_error_ratio_since(self, redis_connection):
+        ts = self.create_timeseries(redis_connection)
+
+        for c in [500, 503]:
+            await ts.append(c)
+        since = time.time()
+        for c in [200, 500]:
+            await ts.append(c)
+
+        assert await ts.get_error_ratio(since=since) == 0.5
+
+
+class TestResponseCodeCounters:
+    @staticmethod
+    def create_counters(*args, **kwargs):
+        return ResponseCodeCounters(*args, **kwargs)
+
+    @pytest.mark.asyncio
+    async def test_error_ratio(self, redis_connection):
+        counters = self.create_counters(redis_connection, bucket_size=60)
+        assert await counters.get_error_ratio() == 0
+
+        status_codes = [200, 500, 503, 204]
+        for c in status_codes:
+            await counters.append(c)
+
+        assert await counters.get_error_ratio() == 0.5
+        # the memory footprint doesn't depend on the number of codes
+        assert await redis_connection.hlen(counters.key) <= 4
+
+    @pytest.mark.asyncio
+    async def test_ttl(self, redis_connection):
+        counters = self.create_counters(
+            redis_connection, ttl=0.1, bucket_size=0.05
+        )
+
+        for c in [500, 503]:
+            await counters.append(c)
+
+        await asyncio.sleep(0.2)
+        await counters.append(200)
+        assert await counters.get_error_ratio() == 0
+
+    @pytest.mark.asyncio
+    async def test_error_ratio_since(self, redis_connection):
+        counters = self.create_counters(redis_connection, bucket_size=0.05)
+
+        for c in [500, 503]:
+            await counters.append(c)
+        since = time.time()
+        await asyncio.sleep(0.1)
+        for c in [200, 500]:
+            await counters.append(c)
+
+        assert await counters.get_error_ratio(since=since) == 0.5
+
+    @pytest.mark.asyncio
+    async def test_gc(self, redis_connection):
+        counters = self.create_counters(redis_connection, ttl=60)
+
+        outdated = counters._bucket(time.time() - 120)
+        await redis_connection.hset(counters.key, f"{outdated}:t", 1)
+        await redis_connection.hset(counters.key, f"{outdated}:e", 1)
+        await counters.append(200)
+
+        assert await redis_connection.hlen(counters.key) == 3
+        await counters.gc()
+        assert await redis_connection.hlen(counters.key) == 1
+
+
+class TestResponseCodeStats:
+    URL = "http://eida.ethz.ch/fdsnws/station/1/query"
+
+    def test_invalid_backend(self, redis_connection):
+        with pytest.raises(ValueError):
+            ResponseCodeStats(redis_connection, backend="foo")
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("backend", ["timeseries", "counters"])
+    async def test_error_ratio(self, redis_connection, backend):
+        stats = ResponseCodeStats(redis_connection, backend=backend)
+
+        for c in [200, 500, 503, 204]:
+            await stats.add(self.URL, c)
+
+        assert await stats.get_error_ratio(self.URL) == 0.5
+        await stats.gc(self.URL)
+        assert await stats.get_error_ratio(self.URL) == 0.5
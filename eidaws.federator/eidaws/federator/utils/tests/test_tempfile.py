@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+Spooled temporary file related test facilities.
+"""
+
+import pytest
+
+from eidaws.federator.utils.tempfile import AioSpooledTemporaryFile
+
+
+DATA = bytes(range(256)) * 4
+
+
+class TestAioSpooledTemporaryFile:
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("max_size", [0, 64])
+    async def test_chunks(self, max_size):
+        async with AioSpooledTemporaryFile(max_size=max_size) as buf:
+            await buf.write(DATA)
+            await buf.seek(0)
+            async with buf.chunks(100) as chunks:
+                chunks = [bytes(c) for c in chunks]
+
+        assert b"".join(chunks) == DATA
+        assert [len(c) for c in chunks] == [100] * 10 + [24]
+
+    @pytest.mark.asyncio
+    async def test_chunks_rolled(self):
+        async with AioSpooledTemporaryFile(max_size=64) as buf:
+            await buf.write(DATA)
+            await buf.seek(512)
+            async with buf.chunks() as chunks:
+                chunks = list(chunks)
+
+                assert len(chunks) == 1
+                assert isinstance(chunks[0], memoryview)
+                assert chunks[0] == DATA[512:]
+
+            # views referenced beyond the context don't prevent from closing
+            del chunks
+
+    @pytest.mark.asyncio
+    async def test_chunks_empty(self):
+        async with AioSpooledTemporaryFile(max_size=64) as buf:
+            await buf.write(DATA)
+            async with buf.chunks() as chunks:
+                assert list(chunks) == []
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("max_size", [0, 64])
+    async def test_chunks_boundaries(self, max_size):
+        async with AioSpooledTemporaryFile(max_size=max_size) as buf:
+            await buf.write(DATA)
+            await buf.seek(24)
+            async with buf.chunks(400, boundaries=[100, 900]) as chunks:
+                chunks = [bytes(c) for c in chunks]
+
+        assert b"".join(chunks) == DATA[24:]
+        assert [len(c) for c in chunks] == [100, 400, 400, 100]
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Worker related test facilities.
+"""
+
+import asyncio
+import pytest
+
+from eidaws.federator.utils.tempfile import AioSpooledTemporaryFile
+from eidaws.federator.utils.worker import BaseSplitAlignWorker, Drain
+
+
+class FakeDrain(Drain):
+    def __init__(self):
+        self.chunks = []
+
+    @property
+    def prepared(self):
+        return bool(self.chunks)
+
+    async def drain(self, chunk):
+        self.chunks.append(bytes(chunk))
+        # yield control such that flushing buffers may interleave
+        await asyncio.sleep(0)
+
+
+class _Worker(BaseSplitAlignWorker):
+    SERVICE_ID = "test"
+
+
+class _Request(dict):
+    def __init__(self, config_dict):
+        super().__init__()
+        self.app = {}
+        self.config_dict = config_dict
+
+
+def _make_worker(lock, flush_size):
+    worker = _Worker.__new__(_Worker)
+    worker.request = _Request(
+        {"config": {"test": {"buffer_flush_size": flush_size}}}
+    )
+    worker._lock = lock
+    return worker
+
+
+class TestBaseSplitAlignWorker:
+    @pytest.mark.asyncio
+    async def test_flush_interleaved(self):
+        lock = asyncio.Lock()
+        drain = FakeDrain()
+
+        async def flush(buf, data):
+            worker = _make_worker(lock, 2)
+            context = {"url": "http://eida.ethz.ch", "chunk_size": 2}
+            for i in range(0, len(data), 2):
+                await buf.write(data[i : i + 2])
+                worker._mark_boundary(context, i + 2)
+
+            await worker._flush(buf, drain, context)
+
+        async with AioSpooledTemporaryFile() as buf_a:
+            async with AioSpooledTemporaryFile() as buf_b:
+                await asyncio.gather(
+                    flush(buf_a, b"aaaaaa"), flush(buf_b, b"bbbbbb")
+                )
+
+        assert drain.chunks == [b"aa", b"bb"] * 3
+
+    @pytest.mark.asyncio
+    async def test_mark_boundary(self):
+        worker = _make_worker(asyncio.Lock(), 1000)
+        context = {"chunk_size": 512}
+
+        for offset in range(512, 4096, 512):
+            worker._mark_boundary(context, offset)
+
+        # aligned with the chunk size
+        assert context["boundaries"] == list(range(512, 4096, 512))
+
+        worker = _make_worker(asyncio.Lock(), 2048)
+        context = {"chunk_size": 512}
+        for offset in range(512, 4096, 512):
+            worker._mark_boundary(context, offset)
+
+        assert context["boundaries"] == [2048]
@@ -2,18 +2,27 @@
 
 import aiohttp
 import asyncio
+import contextlib
 import copy
 import datetime
 import functools
 import logging
 import sys
+import time
 import traceback
 
-from concurrent.futures import ThreadPoolExecutor
 from cached_property import cached_property
 
 from eidaws.federator.settings import FED_BASE_ID
-from eidaws.federator.utils.mixin import ClientRetryBudgetMixin, ConfigMixin
+from eidaws.federator.utils.mixin import (
+    ClientRetryBudgetMixin,
+    ConfigMixin,
+    EndpointConcurrencyMixin,
+    HedgingMixin,
+    PreSplittingMixin,
+    TaskBudgetMixin,
+    TransferStatsMixin,
+)
 from eidaws.federator.utils.misc import (
     _coroutine_or_raise,
     _serialize_query_params,
@@ -117,14 +126,70 @@ class QueueDrain(Drain):
         return True
 
     async def drain(self, chunk):
+        # chunks might be views onto buffers reused (or released) after
+        # draining
+        if isinstance(chunk, memoryview):
+            chunk = chunk.tobytes()
         await self._queue.put(chunk)
 
 
+class _BufferedContent:
+    """
+    Minimal :py:class:`aiohttp.StreamReader` like wrapper reading from a
+    buffer, optionally enclosed by ``prefix`` and ``suffix``.
+    """
+
+    def __init__(self, buf, prefix=b"", suffix=b""):
+        self._sources = [prefix, buf, suffix]
+
+    async def read(self, n=-1):
+        data = b""
+        while self._sources and (n < 0 or len(data) < n):
+            src = self._sources[0]
+            size = -1 if n < 0 else n - len(data)
+            if isinstance(src, bytes):
+                chunk = src if size < 0 else src[:size]
+                self._sources[0] = src[len(chunk) :]
+            else:
+                chunk = await src.read(size)
+
+            if not chunk:
+                self._sources.pop(0)
+                continue
+
+            data += chunk
+
+        return data
+
+    async def readexactly(self, n):
+        data = await self.read(n)
+        if len(data) < n:
+            raise asyncio.IncompleteReadError(data, n)
+        return data
+
+
+class _BufferedResponse:
+    """
+    Response like wrapper providing the content of a buffer.
+    """
+
+    def __init__(self, buf, prefix=b"", suffix=b""):
+        self.content = _BufferedContent(buf, prefix=prefix, suffix=suffix)
+
+
 class WorkerError(ErrorWithTraceback):
     """Base Worker error ({})."""
 
 
-class BaseWorker(ClientRetryBudgetMixin, ConfigMixin):
+class BaseWorker(
+    ClientRetryBudgetMixin,
+    EndpointConcurrencyMixin,
+    HedgingMixin,
+    PreSplittingMixin,
+    TaskBudgetMixin,
+    TransferStatsMixin,
+    ConfigMixin,
+):
     """
     Abstract base class for worker implementations.
     """
@@ -191,6 +256,15 @@ class BaseWorker(ClientRetryBudgetMixin, ConfigMixin):
     def create_job_context(self, *routes):
         return create_job_context(self.request, *routes)
 
+    def _create_buffer(self, executor=None):
+        req_id = get_req_config(self.request, KEY_REQUEST_ID)
+        return AioSpooledTemporaryFile(
+            max_size=self.config["buffer_rollover_size"],
+            prefix=str(req_id) + ".",
+            dir=self.config["tempdir"],
+            executor=executor,
+        )
+
     def _log_request(self, req_handler, method, logger=None):
         logger = logger or self.logger
         logger.debug(f"Request ({method}): {req_handler!r}")
@@ -203,6 +277,12 @@ class BaseSplitAlignWorker(BaseWorker):
     """
 
     _CHUNK_SIZE = 4096
+    # byte sequences a response is enclosed by which are not buffered (see
+    # also :py:meth:`_buffer_response`)
+    _RESPONSE_PREFIX = b""
+    _RESPONSE_SUFFIX = b""
+    # byte sequence written in between buffers flushed
+    _FLUSH_SEPARATOR = b""
 
     def __init__(
         self, request, session, drain, lock=None, **kwargs,
@@ -227,10 +307,18 @@ class BaseSplitAlignWorker(BaseWorker):
 
         url = route.url
         _sorted = sorted(route.stream_epochs)
+        presplit = await self.presplit_stream_epochs(
+            url, _sorted, default_endtime=self._endtime
+        )
+        num_stream_epochs = len(_sorted)
+        if presplit:
+            _sorted = presplit
 
         context = context or {}
+        context["url"] = url
         context["chunk_size"] = self._CHUNK_SIZE
         context["stream_epochs_record"] = copy.deepcopy(_sorted)
+        context["boundaries"] = []
 
         # context logging
         try:
@@ -240,35 +328,35 @@ class BaseSplitAlignWorker(BaseWorker):
         finally:
             context["logger"] = logger
 
-        with ThreadPoolExecutor(max_workers=1) as executor:
-            assert route_with_single_stream(
-                route
-            ), "Cannot handle multiple streams within a single route."
-
-            req_id = get_req_config(self.request, KEY_REQUEST_ID)
-            async with AioSpooledTemporaryFile(
-                max_size=self.config["buffer_rollover_size"],
-                prefix=str(req_id) + ".",
-                dir=self.config["tempdir"],
-                executor=executor,
-            ) as buf:
-
-                await self._run(
-                    url,
-                    _sorted,
-                    req_method=req_method,
-                    buf=buf,
-                    splitting_factor=self.config["splitting_factor"],
-                    context=context,
-                    **req_kwargs,
-                )
+        # file I/O is delegated to the executor shared application-wide
+        executor = self.request.app.get("file_io_executor")
+        assert route_with_single_stream(
+            route
+        ), "Cannot handle multiple streams within a single route."
+
+        context["executor"] = executor
+        async with self.acquire_task_budget(
+            url
+        ), self._create_buffer(executor) as buf:
+
+            # pre-split stream epochs are treated as if split after
+            # HTTP status code 413
+            run = self._run
+            if len(_sorted) > num_stream_epochs:
+                run = self._get_split_runner(len(_sorted))
+
+            await run(
+                url,
+                _sorted,
+                req_method=req_method,
+                buf=buf,
+                splitting_factor=self.config["splitting_factor"],
+                context=context,
+                **req_kwargs,
+            )
 
-                if await buf.tell():
-                    async with self._lock:
-                        append = self._drain.prepared or False
-                        await self._flush(
-                            buf, self._drain, context, append=append,
-                        )
+            if await buf.tell():
+                await self._flush(buf, self._drain, context)
 
         await self.finalize()
 
@@ -282,6 +370,13 @@ class BaseSplitAlignWorker(BaseWorker):
         context,
         **req_kwargs,
     ):
+        """
+        Download ``stream_epochs`` sequentially into ``buf``.
+
+        :returns: ``False`` if downloading was aborted due to an error, else
+            ``True``
+        :rtype: bool
+        """
         logger = context.get("logger") or self.logger
 
         for se in stream_epochs:
@@ -296,8 +391,12 @@ class BaseSplitAlignWorker(BaseWorker):
 
             self._log_request(req_handler, req_method, logger=logger)
             resp_status = None
+            latency = None
+            started = time.monotonic()
+            sent_at = time.time()
             try:
                 async with req(**req_kwargs) as resp:
+                    latency = time.monotonic() - started
                     resp.raise_for_status()
 
                     resp_status = resp.status
@@ -313,7 +412,7 @@ class BaseSplitAlignWorker(BaseWorker):
                         logger.info(msg)
                     else:
                         await self.handle_error(msg=msg, context=context)
-                        break
+                        return False
 
             except aiohttp.ClientResponseError as err:
                 resp_status = err.status
@@ -338,7 +437,7 @@ class BaseSplitAlignWorker(BaseWorker):
                     logger.info(msg)
                 else:
                     await self.handle_error(msg=msg, context=context)
-                    break
+                    return False
 
             except (aiohttp.ClientError, asyncio.TimeoutError) as err:
                 resp_status = 503
@@ -349,14 +448,21 @@ class BaseSplitAlignWorker(BaseWorker):
                 if isinstance(err, aiohttp.ClientOSError):
                     msg += f", errno={err.errno}"
                 await self.handle_error(msg=msg, context=context)
-                break
+                return False
 
             finally:
                 if resp_status is not None:
                     await self.update_cretry_budget(
-                        req_handler.url, resp_status
+                        req_handler.url, resp_status, sent_at=sent_at
+                    )
+                    if latency is None:
+                        latency = time.monotonic() - started
+                    self.observe_endpoint(
+                        req_handler.url, latency, resp_status
                     )
 
+        return True
+
     async def handle_413(self, url, stream_epoch, context=None, **kwargs):
 
         assert (
@@ -374,6 +480,13 @@ class BaseSplitAlignWorker(BaseWorker):
         logger = context.get("logger", self._logger)
         stream_epochs_record = context.get("stream_epochs_record")
 
+        await self.learn_epoch_duration(
+            url,
+            stream_epoch,
+            num=splitting_factor,
+            default_endtime=self._endtime,
+        )
+
         splitted = sorted(
             _split_stream_epoch(
                 stream_epoch,
@@ -394,7 +507,7 @@ class BaseSplitAlignWorker(BaseWorker):
                 f"Stream epochs after splitting: {stream_epochs_record!r}"
             )
 
-        await self._run(
+        await self._get_split_runner(len(splitted))(
             url,
             splitted,
             req_method=kwargs["req_method"],
@@ -404,25 +517,190 @@ class BaseSplitAlignWorker(BaseWorker):
             **req_kwargs,
         )
 
+    def _get_split_runner(self, num):
+        """
+        Return the coroutine function downloading ``num`` stream epochs
+        resulting from splitting.
+        """
+        concurrency = min(self.config["splitting_concurrency"], num)
+        if concurrency > 1:
+            return functools.partial(
+                self._run_concurrently, concurrency=concurrency
+            )
+        return self._run
+
+    async def _run_concurrently(
+        self,
+        url,
+        stream_epochs,
+        req_method,
+        buf,
+        splitting_factor,
+        context,
+        concurrency,
+        **req_kwargs,
+    ):
+        """
+        Download ``stream_epochs`` concurrently (at most ``concurrency``
+        stream epochs at a time) into separate buffers. Buffers are appended
+        to ``buf`` in order (including aligning) as soon as the buffers of
+        the preceding stream epochs are appended.
+
+        The job's task budget and endpoint concurrency slots are lent to a
+        single stream epoch at a time. Further stream epochs are downloaded
+        concurrently only if additional slots are available right away.
+
+        :returns: ``False`` if downloading was aborted due to an error, else
+            ``True``
+        :rtype: bool
+        """
+        sem = asyncio.Semaphore(concurrency)
+        lent = asyncio.Lock()
+        appended = [asyncio.Event() for _ in stream_epochs]
+        # index of the first stream epoch failed to be downloaded
+        failed = len(stream_epochs)
+
+        @contextlib.asynccontextmanager
+        async def acquire_slot():
+            async with self.acquire_task_budget_nowait(url) as acquired:
+                if acquired:
+                    with self.acquire_endpoint_nowait(url) as acquired:
+                        if acquired:
+                            yield
+                            return
+
+            async with lent:
+                yield
+
+        async def run(i, stream_epoch):
+            nonlocal failed
+
+            # the semaphore is acquired in order; hence, the buffers of the
+            # preceding stream epochs are appended eventually
+            async with sem, self._create_buffer(
+                context.get("executor")
+            ) as piece:
+                if i < failed:
+                    async with acquire_slot():
+                        ok = await self._run(
+                            url,
+                            [stream_epoch],
+                            req_method=req_method,
+                            buf=piece,
+                            splitting_factor=splitting_factor,
+                            context=self._create_piece_context(context),
+                            **req_kwargs,
+                        )
+                    if not ok:
+                        failed = min(failed, i)
+
+                if i:
+                    await appended[i - 1].wait()
+
+                # discard the stream epochs following a failed one, as if
+                # downloaded sequentially
+                if i <= failed and await piece.tell():
+                    await piece.seek(0)
+                    await self._buffer_response(
+                        _BufferedResponse(
+                            piece,
+                            prefix=self._RESPONSE_PREFIX,
+                            suffix=self._RESPONSE_SUFFIX,
+                        ),
+                        buf,
+                        context=context,
+                    )
+
+                appended[i].set()
+
+        tasks = [
+            asyncio.ensure_future(run(i, se))
+            for i, se in enumerate(stream_epochs)
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        return failed == len(stream_epochs)
+
+    def _create_piece_context(self, context):
+        """
+        Return the context used when downloading into a separate buffer. The
+        aligning state is kept per buffer.
+        """
+        piece_context = dict(context)
+        piece_context["boundaries"] = []
+        return piece_context
+
     async def _buffer_response(self, resp, buf, context, **kwargs):
         """
         Template coro.
         """
         raise NotImplementedError
 
-    async def _flush(self, buf, drain, context, append=True):
+    def _get_flush_size(self, context):
         """
-        Write ``buf`` to ``drain``.
+        Return the size of chunks buffers are flushed with, i.e. the largest
+        multiple of the chunk size not exceeding the flush size configured.
         """
-        await buf.seek(0)
+        chunk_size = context.get("chunk_size", -1)
+        flush_size = self.config.get("buffer_flush_size")
+        if chunk_size <= 0 or not flush_size:
+            return chunk_size
 
-        while True:
-            chunk = await buf.read(context.get("chunk_size", -1))
+        return max(chunk_size, flush_size - flush_size % chunk_size)
 
-            if not chunk:
-                break
+    def _mark_boundary(self, context, offset):
+        """
+        Mark ``offset`` as a boundary (e.g. the end of a miniseed record) the
+        buffer may be sliced at when being flushed. Boundaries are marked
+        at most every flush size bytes.
+        """
+        boundaries = context.setdefault("boundaries", [])
+        last = boundaries[-1] if boundaries else 0
+        if offset - last >= self._get_flush_size(context):
+            boundaries.append(offset)
 
-            await drain.drain(chunk)
+    async def _flush(self, buf, drain, context):
+        """
+        Write ``buf`` to ``drain``.
+
+        ``buf`` is written in slices delimited by the boundaries marked while
+        buffering. The lock is acquired per slice, only. Since waiters
+        acquire the lock in FIFO order, buffers flushed concurrently are
+        written interleaved (slice by slice) instead of blocking each other
+        until completely written.
+        """
+        start = time.monotonic()
+        # the position is not necessarily at the end (e.g. after truncating)
+        size = await buf.seek(0, 2)
+        await buf.seek(0)
+
+        boundaries = [b for b in context.get("boundaries", []) if b < size]
+        async with buf.chunks(
+            self._get_flush_size(context), boundaries=boundaries
+        ) as chunks:
+            chunks = iter(chunks)
+            pos = 0
+            for i, boundary in enumerate(boundaries + [size]):
+                async with self._lock:
+                    if i == 0 and self._FLUSH_SEPARATOR and drain.prepared:
+                        await drain.drain(self._FLUSH_SEPARATOR)
+
+                    while pos < boundary:
+                        chunk = next(chunks)
+                        pos += len(chunk)
+                        await drain.drain(chunk)
+
+        self.account_transfer(
+            context["url"],
+            flushed_bytes=size,
+            flush_duration=time.monotonic() - start,
+        )
 
 
 class NetworkLevelMixin:
@@ -448,64 +726,79 @@ class NetworkLevelMixin:
         )
         req_handler.format = self.format
 
-        req = getattr(req_handler, req_method.lower())(self._session)
+        req = self.hedge(
+            getattr(req_handler, req_method.lower())(self._session),
+            req_handler.url,
+        )
 
-        self._log_request(req_handler, req_method, logger=logger)
-        resp_status = None
+        async with self.acquire_task_budget(req_handler.url):
+            self._log_request(req_handler, req_method, logger=logger)
+            resp_status = None
+            latency = None
+            started = time.monotonic()
+            sent_at = time.time()
 
-        try:
-            async with req(**kwargs) as resp:
-                resp_status = resp.status
-                resp.raise_for_status()
+            try:
+                async with req(**kwargs) as resp:
+                    latency = time.monotonic() - started
+                    resp_status = resp.status
+                    resp.raise_for_status()
 
-                msg = (
-                    f"Response: {resp.reason}: resp.status={resp_status}, "
-                    f"resp.request_info={resp.request_info}, "
-                    f"resp.url={resp.url}, resp.headers={resp.headers}"
-                )
-                if resp_status != 200:
-                    if resp_status in FDSNWS_NO_CONTENT_CODES:
-                        logger.info(msg)
-                    else:
-                        await self.handle_error(msg=msg, context=context)
+                    msg = (
+                        f"Response: {resp.reason}: resp.status={resp_status}, "
+                        f"resp.request_info={resp.request_info}, "
+                        f"resp.url={resp.url}, resp.headers={resp.headers}"
+                    )
+                    if resp_status != 200:
+                        if resp_status in FDSNWS_NO_CONTENT_CODES:
+                            logger.info(msg)
+                        else:
+                            await self.handle_error(msg=msg, context=context)
 
-                    return route, None
+                        return route, None
 
-                logger.debug(msg)
-                if parser_cb is None:
-                    return route, await resp.read()
+                    logger.debug(msg)
+                    if parser_cb is None:
+                        return route, await resp.read()
 
-                return route, await parser_cb(resp)
+                    return route, await parser_cb(resp)
 
-        except aiohttp.ClientResponseError as err:
-            resp_status = err.status
-            msg = (
-                f"Error while executing request: {err.message}: "
-                f"error={type(err)}, resp.status={resp_status}, "
-                f"resp.request_info={err.request_info}, "
-                f"resp.headers={err.headers}"
-            )
+            except aiohttp.ClientResponseError as err:
+                resp_status = err.status
+                msg = (
+                    f"Error while executing request: {err.message}: "
+                    f"error={type(err)}, resp.status={resp_status}, "
+                    f"resp.request_info={err.request_info}, "
+                    f"resp.headers={err.headers}"
+                )
 
-            if resp_status == 413:
-                await self.handle_413(context=context)
-            elif resp_status in FDSNWS_NO_CONTENT_CODES:
-                logger.info(msg)
-            else:
-                await self.handle_error(msg=msg, context=context)
+                if resp_status == 413:
+                    await self.handle_413(context=context)
+                elif resp_status in FDSNWS_NO_CONTENT_CODES:
+                    logger.info(msg)
+                else:
+                    await self.handle_error(msg=msg, context=context)
 
-            return route, None
+                return route, None
 
-        except (aiohttp.ClientError, asyncio.TimeoutError) as err:
-            msg = (
-                f"Error while executing request: error={type(err)}, "
-                f"req_handler={req_handler!r}, method={req_method}"
-            )
-            if isinstance(err, aiohttp.ClientOSError):
-                msg += f", errno={err.errno}"
-            await self.handle_error(msg=msg, context=context)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                msg = (
+                    f"Error while executing request: error={type(err)}, "
+                    f"req_handler={req_handler!r}, method={req_method}"
+                )
+                if isinstance(err, aiohttp.ClientOSError):
+                    msg += f", errno={err.errno}"
+                await self.handle_error(msg=msg, context=context)
 
-            resp_status = 503
-            return route, None
-        finally:
-            if resp_status is not None:
-                await self.update_cretry_budget(req_handler.url, resp_status)
+                resp_status = 503
+                return route, None
+            finally:
+                if resp_status is not None:
+                    await self.update_cretry_budget(
+                        req_handler.url, resp_status, sent_at=sent_at
+                    )
+                    if latency is None:
+                        latency = time.monotonic() - started
+                    self.observe_endpoint(
+                        req_handler.url, latency, resp_status
+                    )
@@ -6,7 +6,7 @@ DB query facilities for eidaws-stationlite
 import collections
 import logging
 
-from sqlalchemy import or_
+from sqlalchemy import func, or_
 
 from eidaws.stationlite.engine import orm
 from eidaws.utils.misc import Route
@@ -26,6 +26,31 @@ logger = logging.getLogger("eidaws.stationlite.engine.db_query")
 
 
 # ----------------------------------------------------------------------------
+def find_routing_table_version(session):
+    """
+    Return the routing table version i.e. the most recent ``lastseen``
+    timestamp. Since harvesting updates the ``lastseen`` timestamp of all
+    entries harvested, the version changes with every harvesting run.
+
+    :returns: The routing table version or ``None`` if the routing table is
+        empty.
+    :rtype: :py:class:`datetime.datetime`
+    """
+    timestamps = [
+        session.query(func.max(m.lastseen)).scalar()
+        for m in (
+            orm.NetworkEpoch,
+            orm.StationEpoch,
+            orm.ChannelEpoch,
+            orm.Routing,
+            orm.StreamEpoch,
+        )
+    ]
+    timestamps = [t for t in timestamps if t is not None]
+
+    return max(timestamps) if timestamps else None
+
+
 def resolve_vnetwork(session, stream_epoch, like_escape="/"):
     """
     Resolve a stream epoch regarding virtual networks.
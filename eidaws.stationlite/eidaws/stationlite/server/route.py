@@ -6,10 +6,12 @@ from eidaws.stationlite.server.view import (
     StationLiteVersionResource,
     StationLiteWadlResource,
     StationLiteQueryResource,
+    StationLiteRoutingTableVersionResource,
 )
 from eidaws.utils.settings import (
     EIDAWS_ROUTING_PATH,
     EIDAWS_ROUTING_PATH_QUERY,
+    EIDAWS_ROUTING_PATH_TABLEVERSION,
 )
 
 
@@ -25,5 +27,9 @@ def setup_routes(app):
         "/".join([EIDAWS_ROUTING_PATH, "application.wadl"]),
     )
     api.add_resource(StationLiteQueryResource, EIDAWS_ROUTING_PATH_QUERY)
+    api.add_resource(
+        StationLiteRoutingTableVersionResource,
+        EIDAWS_ROUTING_PATH_TABLEVERSION,
+    )
 
     return api
@@ -120,6 +120,13 @@ class TestStationLiteServer:
         assert resp.headers["Content-Type"] == "text/plain; charset=utf-8"
         assert __version__.encode("utf-8") == resp.data
 
+    def test_tableversion(self, client):
+        resp = client.get("eidaws/routing/1/tableversion")
+
+        assert resp.status_code == 200
+        assert resp.headers["Content-Type"] == "text/plain; charset=utf-8"
+        assert resp.data
+
     def test_wadl(self, client):
         resp = client.get("eidaws/routing/1/application.wadl")
 
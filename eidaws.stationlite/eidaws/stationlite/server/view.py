@@ -27,6 +27,7 @@ from eidaws.utils.misc import Route
 
 from eidaws.stationlite.engine.db_query import (
     resolve_vnetwork,
+    find_routing_table_version,
     find_streamepochs_and_routes,
 )
 from eidaws.stationlite.server.db import db
@@ -65,6 +66,25 @@ class StationLiteWadlResource(Resource):
     post = get
 
 
+class StationLiteRoutingTableVersionResource(Resource):
+    """
+    ``tableversion`` resource implementation for eidaws-stationlite. The
+    routing table version changes whenever the routing table is updated.
+    Clients may use the version in order to invalidate cached routes.
+    """
+
+    def get(self):
+        version = find_routing_table_version(db.session)
+        if version is None:
+            raise FDSNHTTPError.create(FDSNWS_DEFAULT_NO_CONTENT_ERROR_CODE)
+
+        return make_response(
+            version.isoformat(), {"Content-Type": "text/plain; charset=utf-8"}
+        )
+
+    post = get
+
+
 class StationLiteQueryResource(Resource):
     """
     ``query`` resource implementation for eidaws-stationlite
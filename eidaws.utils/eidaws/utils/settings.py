@@ -38,6 +38,10 @@ EIDAWS_ROUTING_PATH = "/eidaws/routing/1"
 EIDAWS_ROUTING_PATH_QUERY = "/".join(
     [EIDAWS_ROUTING_PATH, FDSNWS_QUERY_METHOD_TOKEN]
 )
+EIDAWS_ROUTING_TABLEVERSION_METHOD_TOKEN = "tableversion"
+EIDAWS_ROUTING_PATH_TABLEVERSION = "/".join(
+    [EIDAWS_ROUTING_PATH, EIDAWS_ROUTING_TABLEVERSION_METHOD_TOKEN]
+)
 
 FDSNWS_DEFAULT_NO_CONTENT_ERROR_CODE = 204
 FDSNWS_NO_CONTENT_CODES = (FDSNWS_DEFAULT_NO_CONTENT_ERROR_CODE, 404)